@@ -0,0 +1,114 @@
+"""
+Mide el tiempo de arranque de la ventana principal: desde que se lanza el programa hasta que
+la ventana se dibuja por primera vez ("ventana") y hasta que terminan de importarse pandas y
+los módulos de limpieza en segundo plano ("modulos").
+
+El programa anota esos hitos en el archivo indicado en la variable de entorno LEADS_MEDIR_ARRANQUE
+(ver index.al_dibujar_ventana) y se cierra solo; este script lo lanza varias veces y toma los
+tiempos cuando cada hito aparece en el archivo. La primera repetición suele ser un arranque en frío
+(archivos fuera de la caché del sistema operativo), así que se informa aparte.
+
+Sin --ejecutable se mide `python index.py`; para el ejecutable de PyInstaller:
+    python benchmarks/arranque.py --ejecutable dist/index/index.exe
+
+El programa termina con código 1 si la mediana del tiempo hasta la ventana supera el objetivo.
+
+Uso:
+    python benchmarks/arranque.py [--ejecutable RUTA] [--repeticiones 5] [--objetivo 1.0] [--json resultados.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CARPETA_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Debe coincidir con index.VARIABLE_MEDIR_ARRANQUE (no se importa index para no medir su importación aquí)
+VARIABLE_MEDIR_ARRANQUE = "LEADS_MEDIR_ARRANQUE"
+
+HITOS = ("ventana", "modulos")
+
+# Objetivo de tiempo hasta la primera ventana, en segundos
+OBJETIVO = 1.0
+
+# Tiempo máximo de espera por arranque y cada cuánto se revisa el archivo de hitos
+TIEMPO_MAXIMO = 120
+INTERVALO_REVISION = 0.005
+
+
+def medir_arranque(comando):
+    """
+    Lanza el programa una vez y espera a que anote todos los hitos.
+
+    :param comando: Lista con el comando que abre la ventana.
+    :return: Diccionario {hito: segundos desde el lanzamiento}.
+    """
+    descriptor, ruta = tempfile.mkstemp(prefix="arranque_", suffix=".txt")
+    os.close(descriptor)
+    entorno = dict(os.environ, **{VARIABLE_MEDIR_ARRANQUE: ruta})
+    tiempos = {}
+    try:
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(comando, env=entorno, cwd=CARPETA_REPO)
+        while len(tiempos) < len(HITOS):
+            with open(ruta, encoding="utf-8") as archivo:
+                anotados = archivo.read().split()
+            ahora = time.perf_counter() - inicio
+            for hito in anotados:
+                if hito.startswith("error"):
+                    raise RuntimeError(f"El programa no pudo importar sus módulos: {anotados}")
+                tiempos.setdefault(hito, ahora)
+            if proceso.poll() is not None and len(tiempos) < len(HITOS):
+                raise RuntimeError(f"El programa terminó (código {proceso.returncode}) sin anotar todos los hitos.")
+            if ahora > TIEMPO_MAXIMO:
+                proceso.kill()
+                raise RuntimeError(f"El programa no terminó de arrancar en {TIEMPO_MAXIMO} s.")
+            time.sleep(INTERVALO_REVISION)
+        proceso.wait(timeout=TIEMPO_MAXIMO)
+    finally:
+        os.remove(ruta)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo hasta que se muestra la ventana principal.")
+    parser.add_argument("--ejecutable", default=None, help="Ejecutable empaquetado (por defecto, python index.py).")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Número de arranques.")
+    parser.add_argument("--objetivo", type=float, default=OBJETIVO, help="Segundos máximos hasta la primera ventana.")
+    parser.add_argument("--json", default=None, help="Guardar los resultados en un archivo JSON.")
+    args = parser.parse_args()
+
+    comando = [args.ejecutable] if args.ejecutable else [sys.executable, os.path.join(CARPETA_REPO, "index.py")]
+    arranques = []
+    for numero in range(1, args.repeticiones + 1):
+        tiempos = medir_arranque(comando)
+        arranques.append(tiempos)
+        print(f"Arranque {numero}: ventana {tiempos['ventana']:.3f} s | módulos {tiempos['modulos']:.3f} s")
+
+    # La mediana se calcula sin el primer arranque (en frío) si hay más de uno
+    calientes = arranques[1:] or arranques
+    mediana = {hito: statistics.median(t[hito] for t in calientes) for hito in HITOS}
+    print(
+        f"En frío: ventana {arranques[0]['ventana']:.3f} s | "
+        f"mediana: ventana {mediana['ventana']:.3f} s, módulos {mediana['modulos']:.3f} s "
+        f"(objetivo: ventana en menos de {args.objetivo:.1f} s)"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "comando": comando, "objetivo": args.objetivo, "arranques": arranques,
+                "en_frio": arranques[0], "mediana": mediana,
+            }, archivo, ensure_ascii=False, indent=2)
+
+    if mediana["ventana"] > args.objetivo:
+        print("El tiempo hasta la primera ventana supera el objetivo.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
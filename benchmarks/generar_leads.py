@@ -0,0 +1,214 @@
+"""
+Genera archivos de leads sintéticos (CSV o XLSX) para los benchmarks.
+
+Los archivos mezclan teléfonos válidos e inválidos de Norteamérica en varios formatos
+(incluidos números de 11 dígitos con '1' inicial), emails vacíos o mal escritos y,
+según la variante, archivos sin encabezados o con muchas columnas del proveedor.
+Con la misma semilla el contenido generado es siempre el mismo.
+
+Variantes:
+    estandar          8 columnas con encabezados
+    sin_encabezados   las mismas 8 columnas, sin fila de encabezados
+    ancho             48 columnas con encabezados; teléfono y email en medio de las columnas del proveedor
+
+Uso:
+    python benchmarks/generar_leads.py SALIDA.csv --filas 1000000 [--variante ancho] [--semilla 0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigosArea import CODIGOS_AREA_VALIDOS  # noqa: E402
+
+VARIANTES = ("estandar", "sin_encabezados", "ancho")
+
+# Filas que se generan y escriben a la vez
+FILAS_POR_BLOQUE = 100_000
+
+# Límite de filas de una hoja de Excel (sin contar los encabezados)
+MAX_FILAS_XLSX = 1_048_575
+
+NOMBRES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "José", "María",
+           "David", "Elizabeth", "Luis", "Ana", "Daniel", "Sofía", "Kevin", "Nancy", "Carlos", "Lucía"]
+APELLIDOS = ["Smith", "Johnson", "Williams", "Brown", "Jones", "García", "Miller", "Davis", "Rodríguez",
+             "Martínez", "Hernández", "López", "Wilson", "Anderson", "O'Neil", "Taylor", "Moore", "Lee"]
+DOMINIOS = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "icloud.com"]
+CIUDADES = ["Houston", "Phoenix", "Chicago", "Miami", "Dallas", "Denver", "Atlanta", "Seattle"]
+ESTADOS = ["TX", "AZ", "IL", "FL", "TX", "CO", "GA", "WA"]
+FUENTES = ["facebook", "google", "referido", "landing", "feria"]
+
+AREAS_VALIDAS = np.array(sorted(CODIGOS_AREA_VALIDOS))
+AREAS_INVALIDAS = np.array(["000", "111", "123", "555", "999"])
+
+# Proporciones de los formatos de teléfono
+FORMATOS_TELEFONO = {
+    "diez_digitos": 0.30,        # 2015551234
+    "parentesis": 0.20,          # (201) 555-1234
+    "guiones": 0.15,             # 201-555-1234
+    "uno_inicial": 0.12,         # 12015551234
+    "internacional": 0.08,       # +1 201 555 1234
+    "corto": 0.07,               # 555-1234 (inválido)
+    "vacio": 0.08,
+}
+PROPORCION_AREA_INVALIDA = 0.05
+PROPORCION_EMAIL_VACIO = 0.25
+PROPORCION_EMAIL_INVALIDO = 0.02
+
+# Columnas extra del proveedor en la variante "ancho" y posiciones del teléfono y del email
+COLUMNAS_PROVEEDOR = 40
+POSICION_TELEFONO_ANCHO = 17
+POSICION_EMAIL_ANCHO = 31
+
+FECHAS = pd.date_range("2024-01-01", periods=366).strftime("%Y-%m-%d").to_numpy(dtype=object)
+
+COLUMNAS_ESTANDAR = ["First Name", "Last Name", "Phone", "Email", "City", "State", "Zip", "Source"]
+
+
+def columnas_variante(variante):
+    """
+    Devuelve los encabezados de la variante y las posiciones de las columnas de nombre, teléfono y email.
+
+    :return: Tupla (encabezados, posiciones) con posiciones = {"nombre": [i, j], "telefono": i, "email": i}.
+    """
+    if variante == "ancho":
+        proveedor = [f"Vendor Field {i:02d}" for i in range(1, COLUMNAS_PROVEEDOR + 1)]
+        encabezados = ["First Name", "Last Name"] + proveedor + ["City", "State", "Zip", "Source"]
+        encabezados.insert(POSICION_TELEFONO_ANCHO, "Phone")
+        encabezados.insert(POSICION_EMAIL_ANCHO, "Email")
+    elif variante in VARIANTES:
+        encabezados = list(COLUMNAS_ESTANDAR)
+    else:
+        raise ValueError(f"Variante desconocida: {variante}")
+    posiciones = {"nombre": [0, 1], "telefono": encabezados.index("Phone"), "email": encabezados.index("Email")}
+    return encabezados, posiciones
+
+
+def _texto(valores):
+    return pd.Series(valores).astype(str)
+
+
+def _telefonos(rng, filas):
+    areas = rng.choice(AREAS_VALIDAS, filas)
+    invalidas = rng.random(filas) < PROPORCION_AREA_INVALIDA
+    areas[invalidas] = rng.choice(AREAS_INVALIDAS, int(invalidas.sum()))
+    area = _texto(areas)
+    linea = _texto(rng.integers(2_000_000, 10_000_000, filas))
+    tres, cuatro = linea.str.slice(0, 3), linea.str.slice(3)
+
+    formatos = {
+        "diez_digitos": area + linea,
+        "parentesis": "(" + area + ") " + tres + "-" + cuatro,
+        "guiones": area + "-" + tres + "-" + cuatro,
+        "uno_inicial": "1" + area + linea,
+        "internacional": "+1 " + area + " " + tres + " " + cuatro,
+        "corto": tres + "-" + cuatro,
+        "vacio": pd.Series("", index=area.index),
+    }
+    eleccion = rng.choice(len(formatos), filas, p=list(FORMATOS_TELEFONO.values()))
+    opciones = np.stack([formatos[nombre].to_numpy(dtype=object) for nombre in FORMATOS_TELEFONO])
+    return opciones[eleccion, np.arange(filas)]
+
+
+def _emails(rng, nombres, apellidos, filas):
+    usuario = _texto(nombres).str.lower() + "." + _texto(apellidos).str.lower().str.replace("'", "")
+    emails = usuario + _texto(rng.integers(1, 1000, filas)) + "@" + _texto(rng.choice(DOMINIOS, filas))
+    emails = emails.to_numpy(dtype=object)
+
+    mayusculas = rng.random(filas) < 0.03
+    emails[mayusculas] = np.char.upper(emails[mayusculas].astype(str)).astype(object)
+    invalidos = rng.random(filas) < PROPORCION_EMAIL_INVALIDO
+    emails[invalidos] = np.char.replace(emails[invalidos].astype(str), "@", " at ").astype(object)
+    emails[rng.random(filas) < PROPORCION_EMAIL_VACIO] = ""
+    return emails
+
+
+def generar_bloques(filas, variante="estandar", semilla=0, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera las filas del archivo sintético por bloques.
+
+    :param filas: Número total de filas de datos.
+    :param variante: "estandar", "sin_encabezados" o "ancho".
+    :param semilla: Semilla del generador aleatorio.
+    :return: Generador de DataFrames con las columnas de la variante.
+    """
+    encabezados, _ = columnas_variante(variante)
+    rng = np.random.default_rng(semilla)
+    for inicio in range(0, filas, filas_por_bloque):
+        n = min(filas_por_bloque, filas - inicio)
+        nombres, apellidos = rng.choice(NOMBRES, n), rng.choice(APELLIDOS, n)
+        ciudad = rng.integers(0, len(CIUDADES), n)
+        datos = {
+            "First Name": nombres,
+            "Last Name": apellidos,
+            "Phone": _telefonos(rng, n),
+            "Email": _emails(rng, nombres, apellidos, n),
+            "City": np.array(CIUDADES)[ciudad],
+            "State": np.array(ESTADOS)[ciudad],
+            "Zip": _texto(rng.integers(10_000, 100_000, n)).to_numpy(dtype=object),
+            "Source": rng.choice(FUENTES, n),
+        }
+        for columna in encabezados:
+            if columna.startswith("Vendor Field"):
+                # Columnas del proveedor: códigos, montos y fechas sin relación con el lead
+                numero = int(columna[-2:])
+                if numero % 3 == 0:
+                    datos[columna] = rng.integers(0, 10 ** 6, n)
+                elif numero % 3 == 1:
+                    datos[columna] = np.round(rng.random(n) * 1000, 2)
+                else:
+                    datos[columna] = FECHAS[rng.integers(0, len(FECHAS), n)]
+        yield pd.DataFrame({columna: datos[columna] for columna in encabezados})
+
+
+def generar_archivo(ruta, filas, variante="estandar", semilla=0):
+    """
+    Escribe un archivo de leads sintético en CSV o XLSX (según la extensión).
+    Los XLSX se limitan a las filas que caben en una hoja.
+
+    :return: Número de filas de datos escritas.
+    """
+    encabezados, _ = columnas_variante(variante)
+    con_encabezados = variante != "sin_encabezados"
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+
+    if ruta.endswith(".xlsx"):
+        from openpyxl import Workbook
+
+        filas = min(filas, MAX_FILAS_XLSX)
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet()
+        if con_encabezados:
+            hoja.append(encabezados)
+        for bloque in generar_bloques(filas, variante, semilla):
+            for fila in bloque.itertuples(index=False, name=None):
+                hoja.append(fila)
+        libro.save(ruta)
+        return filas
+
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        for numero, bloque in enumerate(generar_bloques(filas, variante, semilla)):
+            bloque.to_csv(archivo, index=False, header=con_encabezados and numero == 0)
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un archivo de leads sintético para los benchmarks.")
+    parser.add_argument("salida", help="Archivo de salida (.csv o .xlsx).")
+    parser.add_argument("--filas", type=int, default=10_000, help="Número de filas de datos.")
+    parser.add_argument("--variante", choices=VARIANTES, default="estandar", help="Estructura del archivo.")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador aleatorio.")
+    args = parser.parse_args()
+
+    filas = generar_archivo(args.salida, args.filas, args.variante, args.semilla)
+    print(f"Archivo generado: {args.salida} ({filas:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compara los motores de lectura de Excel (openpyxl en modo streaming y calamine) sobre
+libros reales, leyendo todas las columnas y solo las seleccionadas (usecols).
+
+Uso:
+    python benchmarks/motores_excel.py LIBRO.xlsx [LIBRO2.xlsx ...] [--columnas 0 3 5] [--repeticiones 3]
+                                       [--json resultados.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from encabezados import iterar_bloques_excel  # noqa: E402
+from procesarArchivo import TAMANO_BLOQUE  # noqa: E402
+
+MOTORES = ("openpyxl", "calamine")
+
+
+def medir(archivo, motor, usecols, repeticiones):
+    """
+    Lee el libro completo por bloques y devuelve el mejor tiempo de las repeticiones.
+
+    :return: Tupla (segundos, filas leídas).
+    """
+    mejor, filas = None, 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        bloques = iterar_bloques_excel(archivo, TAMANO_BLOQUE, usecols=usecols, motor=motor, cache=False)
+        filas = sum(len(bloque) for bloque in bloques)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los motores de lectura de Excel.")
+    parser.add_argument("libros", nargs="+", help="Libros de Excel a leer.")
+    parser.add_argument("--columnas", type=int, nargs="*", default=None, help="Posiciones de las columnas a leer.")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por medición (se toma la mejor).")
+    parser.add_argument("--json", default=None, help="Guardar los resultados en un archivo JSON.")
+    args = parser.parse_args()
+
+    resultados = []
+    for libro in args.libros:
+        for motor in MOTORES:
+            for usecols in (None, args.columnas) if args.columnas else (None,):
+                try:
+                    segundos, filas = medir(libro, motor, usecols, args.repeticiones)
+                except ImportError as e:
+                    print(f"{motor}: no disponible ({e})")
+                    break
+                resultados.append({
+                    "libro": os.path.basename(libro), "motor": motor,
+                    "columnas": "todas" if usecols is None else usecols,
+                    "filas": filas, "segundos": round(segundos, 3),
+                    "filas_por_segundo": round(filas / segundos) if segundos else None,
+                })
+                print(
+                    f"{os.path.basename(libro)} | {motor:<9} | columnas: {resultados[-1]['columnas']} | "
+                    f"{filas:,} filas en {segundos:.2f} s"
+                )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Suite de benchmarks de la limpieza de leads.
+
+Genera (o reutiliza) archivos sintéticos con generar_leads.py y mide el tiempo y el pico de memoria de:
+    obtener_vista_previa, detectar_columna_telefonos, detectar_columna_emails, normalizar_telefonos,
+    concatenar_dos_columnas y el procesamiento completo (leer, limpiar, deduplicar y exportar a CSV).
+
+normalizar_telefonos también se compara con la limpieza fila por fila que reemplazó
+(telefonos_fila_por_fila): con OBJETIVO_FILAS filas o más debe ser al menos OBJETIVO_TELEFONOS
+veces más rápida, y si no lo es el programa termina con código 1.
+
+Cada medición se ejecuta en un proceso nuevo, para que la memoria de una prueba no afecte a la
+siguiente. La memoria es el pico de memoria residente (RSS) durante la prueba, menos la memoria
+que el proceso ya usaba al empezarla (con los datos de entrada ya cargados).
+Las pruebas sobre un DataFrame en memoria solo se ejecutan con los CSV (los datos son los mismos
+que en los XLSX) y sobre a lo sumo FILAS_EN_MEMORIA filas.
+
+Los resultados se guardan en JSON; con --comparar se comparan con una ejecución anterior
+y el programa termina con código 1 si alguna prueba es más lenta que la tolerancia.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 10k 1M 10M] [--formatos csv xlsx] [--variantes estandar ancho]
+                               [--repeticiones 3] [--salida resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import tempfile
+import threading
+import time
+
+CARPETA_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CARPETA_REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generar_leads import VARIANTES, MAX_FILAS_XLSX, columnas_variante, generar_archivo  # noqa: E402
+from registro import memoria_actual  # noqa: E402
+
+TAMANOS_POR_DEFECTO = ["10k", "1M"]
+
+# Filas máximas que se cargan en memoria para las pruebas de detección y concatenación
+FILAS_EN_MEMORIA = 1_000_000
+
+# Proporción de tiempo extra a partir de la cual una prueba se considera más lenta
+TOLERANCIA = 0.20
+
+CARPETA_DATOS = os.path.join(tempfile.gettempdir(), "cleaning_leads_benchmarks")
+
+# Objetivo de normalizar_telefonos: veces más rápida que la limpieza fila por fila, a partir de OBJETIVO_FILAS filas
+OBJETIVO_TELEFONOS = 10
+OBJETIVO_FILAS = 1_000_000
+
+
+def _filas(texto):
+    """
+    Convierte '10k', '1M' o '10000' en un número de filas.
+    """
+    texto = str(texto).strip().lower()
+    multiplicador = {"k": 1_000, "m": 1_000_000}.get(texto[-1], 1)
+    return int(float(texto.rstrip("km")) * multiplicador)
+
+
+class MedidorMemoria:
+    """
+    Mide el pico de memoria residente mientras se ejecuta un bloque 'with', revisándola
+    cada INTERVALO segundos desde un hilo aparte.
+    """
+
+    INTERVALO = 0.005
+
+    def __init__(self):
+        self.inicial = None
+        self.pico = None
+        self._terminar = threading.Event()
+        self._hilo = threading.Thread(target=self._revisar, daemon=True)
+
+    def _revisar(self):
+        while not self._terminar.wait(self.INTERVALO):
+            memoria = memoria_actual()
+            if memoria is not None:
+                self.pico = max(self.pico or 0, memoria)
+
+    def __enter__(self):
+        self.inicial = memoria_actual()
+        self.pico = self.inicial
+        if self.inicial is not None:
+            self._hilo.start()
+        return self
+
+    def __exit__(self, *excepcion):
+        self._terminar.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
+        final = memoria_actual()
+        if final is not None:
+            self.pico = max(self.pico or 0, final)
+
+    def aumento_mb(self):
+        if self.inicial is None:
+            return None
+        return round((self.pico - self.inicial) / 1024 ** 2, 1)
+
+
+def _columnas_archivo(archivo, variante):
+    """
+    Lee la vista previa del archivo y devuelve sus columnas y las de nombre, teléfono y email.
+    Los nombres se toman de la vista previa porque la detección de encabezados puede tomar
+    la primera fila de un archivo sin encabezados como encabezados.
+
+    :return: Tupla (encabezados_detectados, columnas, [nombre1, nombre2], teléfono, email).
+    """
+    from encabezados import obtener_vista_previa
+
+    _, posiciones = columnas_variante(variante)
+    encabezados, vista_previa = obtener_vista_previa(archivo)
+    columnas = list(vista_previa.columns)
+    nombre = [columnas[i] for i in posiciones["nombre"]]
+    return encabezados, columnas, nombre, columnas[posiciones["telefono"]], columnas[posiciones["email"]]
+
+
+def _cargar(archivo, variante):
+    import pandas as pd
+    from procesarArchivo import leer_bloques
+
+    encabezados, columnas, _, _, _ = _columnas_archivo(archivo, variante)
+    bloques, filas = [], 0
+    for bloque in leer_bloques(archivo, encabezados, columnas):
+        bloques.append(bloque)
+        filas += len(bloque)
+        if filas >= FILAS_EN_MEMORIA:
+            break
+    return pd.concat(bloques, ignore_index=True).head(FILAS_EN_MEMORIA)
+
+
+def _preparar_vista_previa(archivo, variante, carpeta):
+    from encabezados import obtener_vista_previa
+
+    return lambda: obtener_vista_previa(archivo)
+
+
+def _preparar_telefonos(archivo, variante, carpeta):
+    from seleccionarCols import detectar_columna_telefonos
+
+    df = _cargar(archivo, variante)
+    return lambda: detectar_columna_telefonos(df.copy(deep=False))
+
+
+def _preparar_emails(archivo, variante, carpeta):
+    from seleccionarCols import detectar_columna_emails
+
+    df = _cargar(archivo, variante)
+    return lambda: detectar_columna_emails(df.copy(deep=False))
+
+
+def _preparar_normalizar_telefonos(archivo, variante, carpeta):
+    from seleccionarCols import normalizar_telefonos
+
+    df = _cargar(archivo, variante)
+    telefono = _columnas_archivo(archivo, variante)[3]
+    return lambda: normalizar_telefonos(df[telefono])
+
+
+def _telefonos_fila_por_fila(serie, codigos_area):
+    """
+    Limpieza de teléfonos anterior a normalizar_telefonos: re.sub y búsqueda del código de área
+    en un conjunto, fila por fila. Se conserva solo como referencia del objetivo de rendimiento.
+    """
+    def procesar_numero(valor):
+        valor = re.sub(r"\D", "", valor)
+        if len(valor) == 11 and valor.startswith("1"):
+            return valor[1:] if valor[1:4] in codigos_area else None
+        if len(valor) == 10 and valor[:3] in codigos_area:
+            return valor
+        return None
+
+    # Con pandas anteriores a 3.0, astype(str) convertía los nulos en 'nan'
+    return serie.fillna("nan").astype(str).apply(procesar_numero)
+
+
+def _preparar_telefonos_fila_por_fila(archivo, variante, carpeta):
+    from codigosArea import CODIGOS_AREA_VALIDOS
+
+    df = _cargar(archivo, variante)
+    telefono = _columnas_archivo(archivo, variante)[3]
+    return lambda: _telefonos_fila_por_fila(df[telefono], CODIGOS_AREA_VALIDOS)
+
+
+def _preparar_concatenar(archivo, variante, carpeta):
+    from concatColumnas import concatenar_dos_columnas
+
+    df = _cargar(archivo, variante)
+    _, _, (columna1, columna2), _, _ = _columnas_archivo(archivo, variante)
+    return lambda: concatenar_dos_columnas(df.copy(deep=False), columna1, columna2)
+
+
+def _preparar_completo(archivo, variante, carpeta):
+    from encabezados import obtener_vista_previa
+    from procesarArchivo import pasos_desde_mapeo, procesar_en_bloques
+    from deduplicar import Deduplicador
+    from exportar import exportar_bloques
+
+    _, _, nombre, telefono, email = _columnas_archivo(archivo, variante)
+    mapeo = {"nombre": nombre, "columnas": nombre + [telefono, email], "telefono": telefono, "email": email}
+    salida = os.path.join(carpeta, "leads.csv")
+
+    def ejecutar():
+        encabezados, vista_previa = obtener_vista_previa(archivo)
+        pasos = pasos_desde_mapeo(mapeo, vista_previa)
+        bloques = procesar_en_bloques(
+            archivo, encabezados, list(vista_previa.columns), pasos, deduplicador=Deduplicador()
+        )
+        return exportar_bloques(bloques, salida)
+
+    return ejecutar
+
+
+# Pruebas: nombre -> (función que prepara los datos y devuelve la función a medir, solo con CSV).
+# La función recibe el archivo, la variante y una carpeta temporal para los archivos que escribe la prueba
+PRUEBAS = {
+    "obtener_vista_previa": (_preparar_vista_previa, False),
+    "detectar_columna_telefonos": (_preparar_telefonos, True),
+    "detectar_columna_emails": (_preparar_emails, True),
+    "normalizar_telefonos": (_preparar_normalizar_telefonos, True),
+    "telefonos_fila_por_fila": (_preparar_telefonos_fila_por_fila, True),
+    "concatenar_dos_columnas": (_preparar_concatenar, True),
+    "procesar_completo": (_preparar_completo, False),
+}
+
+
+def medir(prueba, archivo, variante, repeticiones):
+    """
+    Ejecuta una prueba en el proceso actual (se llama desde un proceso nuevo por prueba).
+
+    :return: Diccionario con el mejor tiempo, el tiempo medio y el aumento del pico de memoria.
+    """
+    import cacheArchivos
+
+    # Medir siempre la lectura real del archivo, no la caché de hojas de Excel
+    cacheArchivos.CACHE_ACTIVA = False
+
+    # Los archivos que escriben las pruebas se borran al terminar, aunque la prueba falle
+    with tempfile.TemporaryDirectory(prefix="bench_leads_") as carpeta, contextlib.redirect_stdout(io.StringIO()):
+        ejecutar = PRUEBAS[prueba][0](archivo, variante, carpeta)
+
+        # La memoria se mide en una ejecución aparte, antes de las medidas de tiempo: así la revisión
+        # no afecta los tiempos y la memoria liberada por otras ejecuciones no oculta el pico
+        with MedidorMemoria() as medidor:
+            ejecutar()
+
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            ejecutar()
+            tiempos.append(time.perf_counter() - inicio)
+
+    return {
+        "segundos": round(min(tiempos), 4),
+        "segundos_medio": round(sum(tiempos) / len(tiempos), 4),
+        "memoria_pico_mb": medidor.aumento_mb(),
+    }
+
+
+def _medir_en_proceso(prueba, archivo, variante, repeticiones):
+    # "spawn" en todos los sistemas, para que cada prueba empiece con la memoria de un proceso nuevo
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(1) as pool:
+        return pool.apply(medir, (prueba, archivo, variante, repeticiones))
+
+
+def preparar_archivo(filas, formato, variante, semilla, carpeta=CARPETA_DATOS):
+    """
+    Devuelve la ruta del archivo sintético, generándolo solo si no existe.
+    """
+    if formato == "xlsx":
+        filas = min(filas, MAX_FILAS_XLSX)
+    ruta = os.path.join(carpeta, f"leads_{variante}_{filas}_s{semilla}.{formato}")
+    if not os.path.exists(ruta):
+        print(f"Generando {ruta} ...")
+        temporal = ruta + ".tmp." + formato
+        generar_archivo(temporal, filas, variante, semilla)
+        os.replace(temporal, ruta)
+    return ruta, filas
+
+
+def comparar(resultados, anteriores, tolerancia=TOLERANCIA):
+    """
+    Compara los tiempos con los de una ejecución anterior.
+
+    :return: Lista de textos con las pruebas más lentas que la tolerancia.
+    """
+    def clave(r):
+        return r["prueba"], r["formato"], r["variante"], r["filas"]
+
+    previos = {clave(r): r for r in anteriores["resultados"]}
+    regresiones = []
+    for resultado in resultados:
+        previo = previos.get(clave(resultado))
+        if previo is None or not previo["segundos"]:
+            continue
+        cambio = resultado["segundos"] / previo["segundos"] - 1
+        texto = (
+            f"{resultado['prueba']} [{resultado['formato']}, {resultado['variante']}, {resultado['filas']:,} filas]: "
+            f"{previo['segundos']:.3f} s -> {resultado['segundos']:.3f} s ({cambio:+.0%})"
+        )
+        print(texto)
+        if cambio > tolerancia:
+            regresiones.append(texto)
+    return regresiones
+
+
+def revisar_objetivo(resultados, objetivo=OBJETIVO_TELEFONOS, filas_minimas=OBJETIVO_FILAS):
+    """
+    Compara normalizar_telefonos con la limpieza fila por fila medida sobre el mismo archivo.
+
+    :return: Tupla (lista de factores por archivo, textos de los archivos que no cumplen el objetivo).
+    """
+    def clave(r):
+        return r["formato"], r["variante"], r["filas"]
+
+    base = {clave(r): r for r in resultados if r["prueba"] == "telefonos_fila_por_fila"}
+    factores, incumplidos = [], []
+    for resultado in resultados:
+        referencia = base.get(clave(resultado))
+        if resultado["prueba"] != "normalizar_telefonos" or referencia is None or not resultado["segundos"]:
+            continue
+        factor = referencia["segundos"] / resultado["segundos"]
+        factores.append({"formato": resultado["formato"], "variante": resultado["variante"],
+                         "filas": resultado["filas"], "factor": round(factor, 1)})
+        texto = (
+            f"normalizar_telefonos [{resultado['formato']}, {resultado['variante']}, {resultado['filas']:,} filas]: "
+            f"{referencia['segundos']:.3f} s fila por fila -> {resultado['segundos']:.3f} s ({factor:.1f} veces)"
+        )
+        print(texto)
+        if resultado["filas"] >= filas_minimas and factor < objetivo:
+            incumplidos.append(texto)
+    return factores, incumplidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo y la memoria de la limpieza de leads.")
+    parser.add_argument("--tamanos", nargs="+", default=TAMANOS_POR_DEFECTO, help="Filas por archivo (10k, 1M, 10M...).")
+    parser.add_argument("--formatos", nargs="+", choices=["csv", "xlsx"], default=["csv", "xlsx"])
+    parser.add_argument("--variantes", nargs="+", choices=VARIANTES, default=list(VARIANTES))
+    parser.add_argument("--pruebas", nargs="+", choices=list(PRUEBAS), default=list(PRUEBAS))
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por prueba (se guarda la mejor).")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de los archivos sintéticos.")
+    parser.add_argument("--datos", default=CARPETA_DATOS, help="Carpeta donde se generan los archivos sintéticos.")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados (por defecto, con la fecha).")
+    parser.add_argument("--comparar", default=None, help="Archivo JSON de una ejecución anterior.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Tiempo extra tolerado (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    resultados = []
+    for tamano in args.tamanos:
+        for formato in args.formatos:
+            for variante in args.variantes:
+                archivo, filas = preparar_archivo(_filas(tamano), formato, variante, args.semilla, args.datos)
+                for prueba in args.pruebas:
+                    if PRUEBAS[prueba][1] and formato != "csv":
+                        continue
+                    medicion = _medir_en_proceso(prueba, archivo, variante, args.repeticiones)
+                    resultados.append({
+                        "prueba": prueba, "formato": formato, "variante": variante, "filas": filas, **medicion,
+                    })
+                    print(
+                        f"{prueba:<28} {formato:<5} {variante:<16} {filas:>12,} filas  "
+                        f"{medicion['segundos']:>9.3f} s  {medicion['memoria_pico_mb']} MB"
+                    )
+
+    factores, incumplidos = revisar_objetivo(resultados)
+
+    ejecucion = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "sistema": platform.platform(),
+        "procesador": platform.processor(),
+        "repeticiones": args.repeticiones,
+        "resultados": resultados,
+        "factores_telefonos": factores,
+    }
+    salida = args.salida or f"benchmark_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(ejecucion, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en: {salida}")
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            regresiones = comparar(resultados, json.load(archivo), args.tolerancia)
+        if regresiones:
+            print(f"\nPruebas más lentas que la tolerancia ({args.tolerancia:.0%}):")
+            for texto in regresiones:
+                print(f"  {texto}")
+    if incumplidos:
+        print(f"\nnormalizar_telefonos no llega a {OBJETIVO_TELEFONOS} veces la limpieza fila por fila:")
+        for texto in incumplidos:
+            print(f"  {texto}")
+    if regresiones or incumplidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Caché local de las hojas de Excel ya leídas.
+
+La primera vez que una hoja se lee completa, sus filas (sin procesar, como texto) se guardan
+en un archivo Arrow/Feather dentro de RUTA_CACHE. Las siguientes lecturas del mismo archivo
+abren ese archivo con memory-map en lugar de volver a leer el Excel.
+
+La clave de la caché combina la ruta, el tamaño, la fecha de modificación y un hash del
+principio y el final del archivo, además del nombre de la hoja. La caché tiene un tamaño máximo;
+al superarlo se eliminan primero los archivos usados hace más tiempo.
+
+Uso:
+    python cacheArchivos.py info
+    python cacheArchivos.py limpiar
+"""
+import argparse
+import hashlib
+import logging
+import os
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow es opcional: sin él no se usa la caché
+    pa = None
+
+log = logging.getLogger(__name__)
+
+# False para leer siempre del Excel (por ejemplo, al medir el tiempo de lectura en los benchmarks)
+CACHE_ACTIVA = True
+
+# Carpeta de la caché, junto al historial de leads exportados
+RUTA_CACHE = os.path.join(os.path.expanduser("~"), ".cleaning_leads", "cache")
+
+# Tamaño máximo de la caché en bytes
+TAMANO_MAXIMO_CACHE = 2 * 1024 ** 3
+
+EXTENSION_CACHE = ".arrow"
+
+# Bytes del principio y del final del archivo que entran en el hash de la clave. No se lee el archivo
+# completo: calcular la clave no debe depender del tamaño del archivo
+TAMANO_MUESTRA_HASH = 64 * 1024
+
+
+def cache_disponible():
+    return CACHE_ACTIVA and pa is not None
+
+
+def clave_cache(archivo, hoja=None):
+    """
+    Calcula la clave de la caché de una hoja a partir de la ruta, el tamaño, la fecha de
+    modificación y el hash de los primeros y los últimos TAMANO_MUESTRA_HASH bytes del archivo.
+    """
+    estado = os.stat(archivo)
+    contenido = hashlib.blake2b(digest_size=16)
+    with open(archivo, "rb") as manejador:
+        contenido.update(manejador.read(TAMANO_MUESTRA_HASH))
+        if estado.st_size > 2 * TAMANO_MUESTRA_HASH:
+            manejador.seek(-TAMANO_MUESTRA_HASH, os.SEEK_END)
+        contenido.update(manejador.read(TAMANO_MUESTRA_HASH))
+
+    clave = hashlib.blake2b(digest_size=16)
+    for dato in (os.path.abspath(archivo), estado.st_size, estado.st_mtime_ns, hoja or "", contenido.hexdigest()):
+        clave.update(f"{dato}\0".encode("utf-8"))
+    return clave.hexdigest()
+
+
+def ruta_en_cache(clave, carpeta=RUTA_CACHE):
+    return os.path.join(carpeta, clave + EXTENSION_CACHE)
+
+
+def buscar_en_cache(clave, carpeta=RUTA_CACHE):
+    """
+    Devuelve la ruta del archivo en caché para la clave, o None si no existe.
+    Marca el archivo como usado recientemente.
+    """
+    ruta = ruta_en_cache(clave, carpeta)
+    if not os.path.exists(ruta):
+        return None
+    os.utime(ruta)  # La fecha de modificación indica el último uso (para la expulsión LRU)
+    return ruta
+
+
+def leer_de_cache(ruta, tamano_bloque, saltar_filas=0, usecols=None, progreso=None):
+    """
+    Lee por bloques una hoja guardada en la caché, sin copiarla completa a memoria.
+
+    :param ruta: Ruta del archivo en caché.
+    :param tamano_bloque: Número máximo de filas por bloque.
+    :param saltar_filas: Filas iniciales que se omiten.
+    :param usecols: Posiciones de las columnas a leer (None para todas).
+    :param progreso: Diccionario opcional donde se guarda 'filas_totales'.
+    :return: Generador de DataFrames sin encabezados.
+    """
+    with pa.memory_map(ruta) as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+        if progreso is not None:
+            progreso["filas_totales"] = tabla.num_rows
+        if usecols is not None:
+            tabla = tabla.select([i for i in usecols if i < tabla.num_columns])
+        tabla = tabla.slice(saltar_filas)
+        for inicio in range(0, tabla.num_rows, tamano_bloque):
+            bloque = tabla.slice(inicio, tamano_bloque).to_pandas()
+            bloque.columns = range(bloque.shape[1])
+            yield bloque
+
+
+def _como_texto(bloque):
+    """
+    Convierte las columnas de un bloque a texto de Arrow, conservando las celdas vacías como nulos.
+    """
+    arreglos = []
+    for _, serie in bloque.items():
+        texto = serie.astype(str).astype(object)
+        texto[serie.isna().to_numpy()] = None
+        arreglos.append(pa.array(texto.to_numpy(), type=pa.string()))
+    return pa.RecordBatch.from_arrays(arreglos, names=[str(i) for i in range(len(arreglos))])
+
+
+def guardar_en_cache(clave, bloques, carpeta=RUTA_CACHE, tamano_maximo=TAMANO_MAXIMO_CACHE):
+    """
+    Guarda los bloques en la caché mientras los devuelve ya convertidos a texto,
+    igual que se devolverán en las lecturas siguientes desde la caché.
+    La hoja solo queda en la caché si los bloques se recorren completos; si la lectura
+    se interrumpe (por ejemplo, al leer solo la vista previa), el archivo parcial se descarta.
+
+    :param clave: Clave calculada con clave_cache.
+    :param bloques: Generador de DataFrames sin encabezados con todas las columnas de la hoja.
+    :return: Generador de DataFrames con columnas de texto.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = ruta_en_cache(clave, carpeta)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    escritor, esquema = None, None
+    valido, completo = True, False
+    try:
+        for bloque in bloques:
+            lote = _como_texto(bloque)
+            if escritor is None:
+                esquema = lote.schema
+                escritor = pa.ipc.new_file(temporal, esquema)
+            if valido and not lote.schema.equals(esquema):
+                log.warning("La hoja no tiene el mismo número de columnas en todas las filas; no se guardará en caché.")
+                valido = False
+            if valido:
+                escritor.write_batch(lote)
+            bloque = lote.to_pandas()
+            bloque.columns = range(bloque.shape[1])
+            yield bloque
+        completo = valido and escritor is not None
+    finally:
+        if escritor is not None:
+            escritor.close()
+        if completo:
+            os.replace(temporal, ruta)
+            expulsar(carpeta, tamano_maximo, conservar=ruta)
+        elif os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _archivos_en_cache(carpeta=RUTA_CACHE):
+    if not os.path.isdir(carpeta):
+        return []
+    return [
+        entrada for entrada in os.scandir(carpeta)
+        if entrada.is_file() and entrada.name.endswith(EXTENSION_CACHE)
+    ]
+
+
+def expulsar(carpeta=RUTA_CACHE, tamano_maximo=TAMANO_MAXIMO_CACHE, conservar=None):
+    """
+    Elimina los archivos usados hace más tiempo hasta que la caché no supere el tamaño máximo.
+
+    :param conservar: Ruta que no se elimina (la que se acaba de guardar).
+    """
+    archivos = sorted(
+        (entrada.stat().st_mtime, entrada.stat().st_size, entrada.path) for entrada in _archivos_en_cache(carpeta)
+    )
+    total = sum(tamano for _, tamano, _ in archivos)
+    for _, tamano, ruta in archivos:
+        if total <= tamano_maximo:
+            break
+        if conservar and os.path.abspath(ruta) == os.path.abspath(conservar):
+            continue
+        try:
+            os.remove(ruta)
+            total -= tamano
+        except OSError as e:  # En Windows no se puede borrar un archivo abierto en otro proceso
+            log.warning(f"No se pudo eliminar {ruta} de la caché: {e}")
+
+
+def limpiar_cache(carpeta=RUTA_CACHE):
+    """
+    Elimina todos los archivos de la caché.
+
+    :return: Tupla (archivos eliminados, bytes liberados).
+    """
+    eliminados, liberados = 0, 0
+    for entrada in _archivos_en_cache(carpeta):
+        tamano = entrada.stat().st_size
+        try:
+            os.remove(entrada.path)
+        except OSError as e:
+            log.warning(f"No se pudo eliminar {entrada.path} de la caché: {e}")
+            continue
+        eliminados += 1
+        liberados += tamano
+    return eliminados, liberados
+
+
+def info_cache(carpeta=RUTA_CACHE):
+    """
+    :return: Tupla (número de archivos, bytes usados) de la caché.
+    """
+    archivos = _archivos_en_cache(carpeta)
+    return len(archivos), sum(entrada.stat().st_size for entrada in archivos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Administra la caché de hojas de Excel ya leídas.")
+    parser.add_argument("comando", choices=["info", "limpiar"], help="'info' muestra el tamaño, 'limpiar' la vacía.")
+    args = parser.parse_args()
+
+    if args.comando == "limpiar":
+        eliminados, liberados = limpiar_cache()
+        print(f"Archivos eliminados: {eliminados} ({liberados / 1024 ** 2:.1f} MB)")
+    else:
+        archivos, usados = info_cache()
+        print(f"Caché: {RUTA_CACHE}")
+        print(f"Archivos: {archivos} ({usados / 1024 ** 2:.1f} MB de {TAMANO_MAXIMO_CACHE / 1024 ** 2:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import csv
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Archivo con los códigos de área del plan de numeración de Norteamérica (NANP):
+# codigo_area, region (estado, provincia o país), pais y zona_horaria (IANA).
+# Los códigos no geográficos (números gratuitos, servicios) tienen región y zona vacías.
+# En el ejecutable de PyInstaller los datos se copian junto al programa con
+# --add-data "datos;datos" y se buscan en la carpeta temporal sys._MEIPASS
+CARPETA_DATOS = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "datos")
+RUTA_CODIGOS_AREA = os.path.join(CARPETA_DATOS, "codigos_area.csv")
+
+# Los números se guardan como enteros de 10 dígitos: AAA CCC LLLL
+# (código de área, código de central y número de línea)
+DIVISOR_AREA = 10_000_000
+DIVISOR_CENTRAL = 10_000
+
+
+def _cargar_codigos_area(ruta=RUTA_CODIGOS_AREA):
+    """
+    Lee el archivo de códigos de área y arma las tablas de búsqueda indexadas por el código como entero.
+
+    :return: Tupla (códigos como texto, tabla de validez, códigos de región, regiones, códigos de zona, zonas).
+    """
+    codigos = set()
+    valida = np.zeros(1000, dtype=bool)
+    # -1 en las tablas de región y zona es "sin dato" (nulo en la categoría)
+    region = np.full(1000, -1, dtype=np.int16)
+    zona = np.full(1000, -1, dtype=np.int16)
+    regiones = {}
+    zonas = {}
+
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        for fila in csv.DictReader(archivo):
+            codigo = int(fila["codigo_area"])
+            codigos.add(fila["codigo_area"])
+            valida[codigo] = True
+            if fila["region"]:
+                region[codigo] = regiones.setdefault(fila["region"], len(regiones))
+            if fila["zona_horaria"]:
+                zona[codigo] = zonas.setdefault(fila["zona_horaria"], len(zonas))
+
+    return codigos, valida, region, list(regiones), zona, list(zonas)
+
+
+CODIGOS_AREA_VALIDOS, AREA_VALIDA, AREA_REGION, REGIONES, AREA_ZONA, ZONAS = _cargar_codigos_area()
+
+# Nombres completos de los estados de EE. UU. (las regiones del archivo son los códigos de dos letras)
+NOMBRES_ESTADOS = (
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+    "District of Columbia", "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas",
+    "Kentucky", "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota", "Mississippi",
+    "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey", "New Mexico", "New York",
+    "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon", "Pennsylvania", "Puerto Rico",
+    "Rhode Island", "South Carolina", "South Dakota", "Tennessee", "Texas", "Utah", "Vermont", "Virginia",
+    "Washington", "West Virginia", "Wisconsin", "Wyoming",
+)
+
+# Tabla de códigos de central (los 3 dígitos después del código de área).
+# No son válidos los que empiezan con 0 o 1 ni los N11 (211, 311, ..., 911), reservados para servicios
+CENTRAL_VALIDA = np.ones(1000, dtype=bool)
+CENTRAL_VALIDA[:200] = False
+CENTRAL_VALIDA[211::100] = False
+
+# 555-0100 a 555-0199: números ficticios reservados para películas y ejemplos
+CENTRAL_FICTICIA = 555
+LINEAS_FICTICIAS = range(100, 200)
+
+
+def numeros_validos(numeros):
+    """
+    Valida números de 10 dígitos con las reglas del NANP, con búsquedas en tablas indexadas por entero:
+    código de área existente, código de central que no empiece con 0 o 1 ni sea N11,
+    y que no sea uno de los números ficticios 555-01xx.
+
+    :param numeros: Arreglo int64 de números de 10 dígitos.
+    :return: Arreglo booleano del mismo tamaño.
+    """
+    area, resto = np.divmod(numeros, DIVISOR_AREA)
+    central, linea = np.divmod(resto, DIVISOR_CENTRAL)
+    ficticio = (central == CENTRAL_FICTICIA) & (linea >= LINEAS_FICTICIAS.start) & (linea < LINEAS_FICTICIAS.stop)
+    return AREA_VALIDA[area] & CENTRAL_VALIDA[central] & ~ficticio
+
+
+def _codigos_area(telefonos):
+    """
+    Código de área de cada teléfono como entero; 0 (sin región ni zona) donde no hay número.
+    """
+    if not pd.api.types.is_integer_dtype(telefonos.dtype):
+        return np.zeros(len(telefonos), dtype=np.int64)
+    return telefonos.fillna(0).to_numpy(dtype=np.int64) // DIVISOR_AREA
+
+
+def estados(telefonos):
+    """
+    Estado, provincia o país de cada teléfono según su código de área
+    (código de dos letras para EE. UU. y Canadá, ISO de tres letras para el resto del NANP).
+
+    :param telefonos: Serie Int64 con los números normalizados (ver normalizar_telefonos).
+    :return: Serie categórica; nula donde no hay número o el código no es geográfico.
+    """
+    codigos = AREA_REGION[_codigos_area(telefonos)]
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=REGIONES), index=telefonos.index)
+
+
+def zonas_horarias(telefonos):
+    """
+    Zona horaria (IANA) predominante del código de área de cada teléfono.
+
+    :param telefonos: Serie Int64 con los números normalizados (ver normalizar_telefonos).
+    :return: Serie categórica; nula donde no hay número o el código no es geográfico.
+    """
+    codigos = AREA_ZONA[_codigos_area(telefonos)]
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=ZONAS), index=telefonos.index)
+
+
+def enriquecer_leads(df):
+    """
+    Agrega las columnas 'state' y 'timezone' a partir de la columna 'phone'.
+    Si no hay teléfonos, las columnas quedan vacías.
+
+    :param df: DataFrame con la columna 'phone' normalizada.
+    :return: DataFrame con las columnas nuevas.
+    """
+    return df.assign(state=estados(df['phone']), timezone=zonas_horarias(df['phone']))
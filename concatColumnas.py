@@ -1,4 +1,9 @@
-import pandas as pd
+import logging
+
+from seleccionarCols import TIPO_TEXTO
+
+log = logging.getLogger(__name__)
+
 
 def usar_una_columna_para_nombre(df, columna):
     """
@@ -14,11 +19,12 @@ def usar_una_columna_para_nombre(df, columna):
         if columna not in df.columns:
             raise ValueError(f"La columna '{columna}' no existe en el archivo.")
         
-        # Renombrar la columna
+        # Renombrar la columna y guardarla como texto compacto
         df = df.rename(columns={columna: "name"})
+        df["name"] = df["name"].astype(TIPO_TEXTO)
         return df
     except Exception as e:
-        print(f"Error al procesar la columna: {e}")
+        log.error(f"Error al procesar la columna: {e}")
         return None
 
 
@@ -38,8 +44,15 @@ def concatenar_dos_columnas(df, columna1, columna2):
             raise ValueError(f"Una o ambas columnas seleccionadas no existen: {columna1}, {columna2}")
         
         # Concatenar las dos columnas con un espacio en medio
-        df["name"] = df[columna1].astype(str) + " " + df[columna2].astype(str)
+        df["name"] = concatenar_series(df[columna1], df[columna2])
         return df
     except Exception as e:
-        print(f"Error al concatenar columnas: {e}")
+        log.error(f"Error al concatenar columnas: {e}")
         return None
+
+
+def concatenar_series(serie1, serie2):
+    """
+    Une dos series de valores con un espacio en medio.
+    """
+    return (serie1.astype(str) + " " + serie2.astype(str)).astype(TIPO_TEXTO)
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from seleccionarCols import telefonos_como_texto
+
+# Valores de relleno que no identifican a un lead y no se usan como clave
+MARCADORES = {"No hay registro", "No hay telefono", "No hay email"}
+
+# Claves de hash distintas para que un teléfono y un email nunca compartan clave
+HASH_TELEFONO = "telefono-leads01"
+HASH_EMAIL = "email-leads-0001"
+
+# Número de claves por consulta al índice en disco
+TAMANO_LOTE_INDICE = 100_000
+
+# Ubicación por defecto del historial de leads exportados
+RUTA_INDICE = os.path.join(os.path.expanduser("~"), ".cleaning_leads", "historial_leads.sqlite")
+
+
+def _claves(serie, hash_key, normalizar=False):
+    """
+    Calcula una clave de 64 bits por fila a partir de los valores de la serie.
+    Las filas vacías o con valores de relleno no tienen clave.
+
+    :return: Tupla (claves int64 de las filas con valor, máscara de las filas con valor).
+    """
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        # Teléfonos normalizados como enteros: no hay marcadores ni vacíos. La clave se calcula
+        # sobre el texto del número, igual que en el historial guardado antes
+        con_valor = serie.notna().to_numpy(dtype=bool, copy=True)
+        valores = telefonos_como_texto(serie[con_valor])
+        claves = pd.util.hash_pandas_object(valores, index=False, hash_key=hash_key)
+        return claves.to_numpy().view(np.int64), con_valor
+
+    con_valor = (serie.notna() & ~serie.isin(MARCADORES)).to_numpy(dtype=bool, copy=True)
+    valores = serie[con_valor].astype(str)
+    if normalizar:
+        valores = valores.str.strip().str.lower()
+
+    no_vacios = (valores != "").to_numpy(dtype=bool)
+    con_valor[con_valor] = no_vacios
+    claves = pd.util.hash_pandas_object(valores[no_vacios], index=False, hash_key=hash_key)
+    return claves.to_numpy().view(np.int64), con_valor
+
+
+class IndiceLeads:
+    """
+    Índice en disco (SQLite) con las claves de todos los leads ya exportados.
+    Las claves son hashes de 64 bits, así que la tabla es una sola columna entera
+    y cada consulta se resuelve con un join contra una tabla temporal por lotes.
+    """
+
+    def __init__(self, ruta=RUTA_INDICE):
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS leads (clave INTEGER PRIMARY KEY)")
+        self.conexion.execute("CREATE TEMP TABLE consulta (clave INTEGER PRIMARY KEY)")
+
+    def contiene(self, claves):
+        """
+        Indica qué claves ya están en el índice.
+
+        :param claves: Arreglo de claves int64.
+        :return: Arreglo booleano del mismo tamaño.
+        """
+        encontradas = []
+        for inicio in range(0, len(claves), TAMANO_LOTE_INDICE):
+            lote = claves[inicio:inicio + TAMANO_LOTE_INDICE]
+            self.conexion.execute("DELETE FROM consulta")
+            self.conexion.executemany("INSERT OR IGNORE INTO consulta VALUES (?)", ((c,) for c in lote.tolist()))
+            encontradas.extend(
+                fila[0] for fila in self.conexion.execute("SELECT clave FROM consulta JOIN leads USING (clave)")
+            )
+        return np.isin(claves, np.array(encontradas, dtype=np.int64))
+
+    def agregar(self, claves):
+        """
+        Guarda las claves en el índice (las ya existentes se ignoran).
+        """
+        # Insertar en orden hace que SQLite recorra el árbol del índice de forma secuencial
+        with self.conexion:
+            self.conexion.executemany("INSERT OR IGNORE INTO leads VALUES (?)", ((c,) for c in sorted(claves)))
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+class Deduplicador:
+    """
+    Elimina leads repetidos según el teléfono normalizado ('phone') y el email en minúsculas ('email').
+    Un lead se considera repetido si su teléfono o su email ya apareció antes en la ejecución
+    o, si se indica un índice, en alguna exportación anterior.
+    """
+
+    def __init__(self, indice=None):
+        self.indice = indice
+        self.vistos = set()  # Claves de los leads conservados en esta ejecución
+
+    def filtrar(self, df):
+        """
+        Devuelve el DataFrame sin las filas repetidas y registra como vistas las claves de las filas
+        que se conservan (las de las filas descartadas no cuentan, porque esos leads no se exportan).
+
+        :param df: DataFrame con las columnas 'phone' y/o 'email'.
+        :return: DataFrame sin duplicados.
+        """
+        repetidas = np.zeros(len(df), dtype=bool)
+        claves_columnas = []
+
+        for columna, hash_key, normalizar in (("phone", HASH_TELEFONO, False), ("email", HASH_EMAIL, True)):
+            if columna not in df.columns:
+                continue
+            claves, con_valor = _claves(df[columna], hash_key, normalizar)
+            filas = np.flatnonzero(con_valor)
+
+            # Repetidas en la ejecución o en el historial
+            vistos = self.vistos
+            repetida = np.fromiter((c in vistos for c in claves.tolist()), dtype=bool, count=len(claves))
+            if self.indice is not None and len(claves):
+                repetida |= self.indice.contiene(claves)
+            repetidas[filas[repetida]] = True
+            claves_columnas.append((filas, claves))
+
+        # Repetidas dentro del bloque: un lead se descarta si comparte una clave con un lead conservado antes.
+        # Solo las filas con alguna clave repetida en el bloque dependen de las anteriores y se recorren en orden
+        en_duda = np.zeros(len(df), dtype=bool)
+        for filas, claves in claves_columnas:
+            en_duda[filas[pd.Series(claves).duplicated(keep=False).to_numpy()]] = True
+        en_duda &= ~repetidas
+        if en_duda.any():
+            claves_fila = {fila: [] for fila in np.flatnonzero(en_duda).tolist()}
+            for filas, claves in claves_columnas:
+                seleccion = en_duda[filas]
+                for fila, clave in zip(filas[seleccion].tolist(), claves[seleccion].tolist()):
+                    claves_fila[fila].append(clave)
+            conservadas = set()
+            for fila in claves_fila:
+                if any(clave in conservadas for clave in claves_fila[fila]):
+                    repetidas[fila] = True
+                else:
+                    conservadas.update(claves_fila[fila])
+
+        for filas, claves in claves_columnas:
+            self.vistos.update(claves[~repetidas[filas]].tolist())
+        return df[~repetidas]
+
+    def guardar(self):
+        """
+        Guarda en el índice en disco las claves de los leads conservados en esta ejecución.
+        """
+        if self.indice is not None:
+            self.indice.agregar(self.vistos)
@@ -1,17 +1,273 @@
+import logging
+from itertools import islice
+
 import pandas as pd
+from cacheArchivos import cache_disponible, clave_cache, buscar_en_cache, leer_de_cache, guardar_en_cache
+
+log = logging.getLogger(__name__)
+
+# Filas que se muestran en la vista previa
+FILAS_VISTA_PREVIA = 5
+
+# Motor de lectura de Excel por defecto: openpyxl permite leer por bloques con memoria acotada
+MOTOR_EXCEL = "openpyxl"
+
+
+def listar_hojas(archivo):
+    """
+    Devuelve los nombres de las hojas de un archivo Excel (lista vacía para CSV).
+    """
+    if archivo.endswith(".csv"):
+        return []
+    if archivo.endswith(".xls"):
+        return pd.ExcelFile(archivo).sheet_names
+
+    try:
+        lector = _abrir_libro_xlsx(archivo)
+    except (ImportError, AttributeError) as e:
+        log.warning(f"No se pudo usar el lector interno de openpyxl ({e}); se abre el libro con load_workbook.")
+        from openpyxl import load_workbook
+
+        libro = load_workbook(archivo, read_only=True)
+        try:
+            return libro.sheetnames
+        finally:
+            libro.close()
+    try:
+        return [nombre for nombre, _ in _hojas_xlsx(lector)]
+    finally:
+        lector.archive.close()
+
+
+def _abrir_libro_xlsx(archivo):
+    """
+    Abre un .xlsx leyendo solo la estructura del libro (hojas, textos compartidos y formatos de fecha),
+    sin recorrer las hojas. load_workbook(read_only=True) recorre cada hoja completa buscando su
+    registro <dimension> cuando el archivo no lo tiene (por ejemplo, los exportados en modo write_only),
+    y en una hoja grande eso tarda varios segundos antes de devolver la primera fila.
+    Usa clases internas de openpyxl (probadas con la 3.1): si en otra versión no existen o cambiaron
+    (ImportError o AttributeError), quien llama vuelve a load_workbook(read_only=True).
+
+    :return: ExcelReader de openpyxl; hay que cerrar lector.archive al terminar.
+    """
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.styles.stylesheet import apply_stylesheet
+
+    lector = ExcelReader(archivo, read_only=True, data_only=True)
+    try:
+        lector.read_manifest()
+        lector.read_strings()
+        lector.read_workbook()
+        apply_stylesheet(lector.archive, lector.wb)
+    except Exception:
+        lector.archive.close()
+        raise
+    return lector
+
+
+def _hojas_xlsx(lector):
+    """
+    :return: Lista de tuplas (nombre de la hoja, ruta de la hoja dentro del .xlsx), sin las hojas de gráficos.
+    """
+    return [
+        (hoja.name, relacion.target) for hoja, relacion in lector.parser.find_sheets()
+        if relacion.target in lector.valid_files and "chartsheet" not in relacion.Type
+    ]
+
 
-def obtener_vista_previa(archivo):
+def _filas_xlsx(lector, ruta):
     """
-    Carga el archivo Excel o CSV, detecta si tiene encabezados,
+    Recorre las filas de una hoja de un .xlsx como tuplas de valores, igual que
+    iter_rows(values_only=True) sin dimensiones: las filas ausentes se devuelven vacías
+    y cada fila llega hasta su última celda con valor.
+    """
+    from openpyxl.worksheet._reader import WorkSheetParser
+
+    with lector.archive.open(ruta) as fuente:
+        parser = WorkSheetParser(
+            fuente, lector.shared_strings, data_only=True, epoch=lector.wb.epoch,
+            date_formats=lector.wb._date_formats, timedelta_formats=lector.wb._timedelta_formats,
+        )
+        siguiente = 1
+        for indice, celdas in parser.parse():
+            for _ in range(siguiente, indice):
+                yield ()
+            siguiente = indice + 1
+            fila = [None] * (celdas[-1]["column"] if celdas else 0)
+            for celda in celdas:
+                fila[celda["column"] - 1] = celda["value"]
+            yield tuple(fila)
+
+
+def iterar_bloques_excel(archivo, tamano_bloque, saltar_filas=0, progreso=None, hoja=None, usecols=None,
+                         motor=MOTOR_EXCEL, cache=True):
+    """
+    Lee un archivo Excel y devuelve bloques de DataFrames.
+    Si la hoja ya está en la caché (ver cacheArchivos) se lee desde ahí; si no, se lee del Excel
+    completa, con todas las columnas, y queda guardada en la caché al terminar de recorrerla.
+
+    :param archivo: Ruta del archivo Excel.
+    :param tamano_bloque: Número máximo de filas por bloque.
+    :param saltar_filas: Filas iniciales que se omiten (por ejemplo, los encabezados).
+    :param progreso: Diccionario opcional donde se guarda 'filas_totales' (filas de la hoja, si se conocen).
+    :param hoja: Nombre de la hoja (None para la primera hoja).
+    :param usecols: Posiciones de las columnas a leer (None para todas).
+    :param motor: "openpyxl" o "calamine".
+    :param cache: False para no usar la caché.
+    :return: Generador de DataFrames sin encabezados.
+    """
+    if not cache or not cache_disponible():
+        yield from _leer_bloques_excel(archivo, tamano_bloque, saltar_filas, progreso, hoja, usecols, motor)
+        return
+
+    clave = clave_cache(archivo, hoja)
+    ruta = buscar_en_cache(clave)
+    if ruta is not None:
+        yield from leer_de_cache(ruta, tamano_bloque, saltar_filas, usecols, progreso)
+        return
+
+    # Para guardar la hoja completa en la caché se leen todas las filas y columnas,
+    # y después se descartan las que no se pidieron
+    bloques = guardar_en_cache(clave, _leer_bloques_excel(archivo, tamano_bloque, 0, progreso, hoja, None, motor))
+    if saltar_filas:
+        bloques = _rebloquear(bloques, tamano_bloque, saltar_filas)
+    for bloque in bloques:
+        if usecols is not None:
+            bloque = bloque.iloc[:, [i for i in usecols if i < bloque.shape[1]]]
+            bloque.columns = range(bloque.shape[1])
+        yield bloque
+
+
+def _rebloquear(bloques, tamano_bloque, saltar_filas):
+    """
+    Omite las primeras filas de los bloques y los vuelve a partir en bloques de tamano_bloque filas,
+    para que los bloques sean los mismos que al leer con saltar_filas desde el Excel o desde la caché.
+    """
+    pendiente = None
+    for bloque in bloques:
+        if saltar_filas:
+            omitidas = min(saltar_filas, len(bloque))
+            bloque, saltar_filas = bloque.iloc[omitidas:], saltar_filas - omitidas
+        if pendiente is not None:
+            bloque = pd.concat([pendiente, bloque], ignore_index=True)
+        while len(bloque) >= tamano_bloque:
+            yield bloque.iloc[:tamano_bloque]
+            bloque = bloque.iloc[tamano_bloque:]
+        pendiente = bloque if len(bloque) else None
+    if pendiente is not None:
+        yield pendiente
+
+
+def _leer_bloques_excel(archivo, tamano_bloque, saltar_filas=0, progreso=None, hoja=None, usecols=None,
+                        motor=MOTOR_EXCEL):
+    """
+    Lee un archivo Excel directamente, sin pasar por la caché, y devuelve bloques de DataFrames.
+    Con el motor "openpyxl" los .xlsx se recorren fila por fila en modo solo lectura,
+    sin cargar la hoja completa en memoria. Con "calamine" (python-calamine, mucho más rápido)
+    o con los .xls antiguos, la hoja se lee de una vez, solo con las columnas pedidas, y se parte en bloques.
+
+    :param archivo: Ruta del archivo Excel.
+    :param tamano_bloque: Número máximo de filas por bloque.
+    :param saltar_filas: Filas iniciales que se omiten (por ejemplo, los encabezados).
+    :param progreso: Diccionario opcional donde se guarda 'filas_totales' (filas de la hoja, si se conocen).
+    :param hoja: Nombre de la hoja (None para la primera hoja).
+    :param usecols: Posiciones de las columnas a leer (None para todas).
+    :param motor: "openpyxl" o "calamine".
+    :return: Generador de DataFrames sin encabezados, con columnas de tipo object.
+    """
+    # Las columnas se dejan como object: sin la fila de encabezados, inferir tipos convertiría
+    # una columna de teléfonos con celdas vacías a float (2015551234 -> "2015551234.0")
+    if motor == "calamine" or archivo.endswith(".xls"):
+        df = pd.read_excel(
+            archivo, header=None, skiprows=saltar_filas, sheet_name=hoja or 0, usecols=usecols, dtype=object,
+            engine="calamine" if motor == "calamine" else None,
+        )
+        if progreso is not None:
+            progreso["filas_totales"] = len(df) + saltar_filas
+        for inicio in range(0, len(df), tamano_bloque):
+            yield df.iloc[inicio:inicio + tamano_bloque]
+        return
+
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        hoja_excel = libro[hoja] if hoja else libro.worksheets[0]
+        if progreso is not None:
+            progreso["filas_totales"] = hoja_excel.max_row
+        filas = hoja_excel.iter_rows(min_row=saltar_filas + 1, values_only=True)
+        if usecols is not None:
+            # Quedarse solo con las columnas pedidas de cada fila
+            filas = ([fila[i] if i < len(fila) else None for i in usecols] for fila in filas)
+        while True:
+            bloque = list(islice(filas, tamano_bloque))
+            if not bloque:
+                break
+            yield pd.DataFrame(bloque, dtype=object)
+    finally:
+        libro.close()
+
+
+def leer_filas_iniciales(archivo, n_filas, hoja=None):
+    """
+    Lee únicamente las primeras filas del archivo, sin asumir encabezados y sin pasar por la caché.
+    En los CSV y los .xlsx (con cualquier motor) la lectura se detiene al llegar a n_filas,
+    así que el tiempo no depende del tamaño total del archivo. Los .xls antiguos se cargan
+    completos con xlrd (como mucho 65536 filas por hoja) antes de tomar las primeras filas.
+
+    :param archivo: Ruta del archivo Excel o CSV.
+    :param n_filas: Número de filas a leer.
+    :param hoja: Nombre de la hoja de Excel (None para la primera hoja).
+    :return: DataFrame con las filas leídas.
+    """
+    if archivo.endswith(".csv"):
+        return pd.read_csv(archivo, header=None, nrows=n_filas)
+    if archivo.endswith(".xls"):
+        return pd.read_excel(archivo, header=None, nrows=n_filas, sheet_name=hoja or 0, dtype=object)
+
+    try:
+        lector = _abrir_libro_xlsx(archivo)
+        try:
+            hojas = dict(_hojas_xlsx(lector))
+            ruta = hojas[hoja] if hoja else next(iter(hojas.values()))
+            filas = list(islice(_filas_xlsx(lector, ruta), n_filas))
+        finally:
+            lector.archive.close()
+    except (ImportError, AttributeError) as e:
+        log.warning(f"No se pudo usar el lector interno de openpyxl ({e}); se lee con load_workbook.")
+        filas = _filas_iniciales_load_workbook(archivo, n_filas, hoja)
+    return pd.DataFrame(filas, dtype=object)
+
+
+def _filas_iniciales_load_workbook(archivo, n_filas, hoja=None):
+    """
+    Primeras filas de un .xlsx con la API pública de openpyxl. Es más lento que _filas_xlsx en las
+    hojas sin registro <dimension>, pero no depende de las clases internas de openpyxl.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        hoja_excel = libro[hoja] if hoja else libro.worksheets[0]
+        return list(hoja_excel.iter_rows(max_row=n_filas, values_only=True))
+    finally:
+        libro.close()
+
+
+def obtener_vista_previa(archivo, filas=FILAS_VISTA_PREVIA, hoja=None):
+    """
+    Carga las primeras filas del archivo Excel o CSV, detecta si tiene encabezados,
     y devuelve una vista previa del DataFrame.
     Si no hay encabezados, asigna nombres genéricos a las columnas.
+
+    :param archivo: Ruta del archivo Excel o CSV.
+    :param filas: Número de filas de datos a incluir en la vista previa.
+    :param hoja: Nombre de la hoja de Excel (None para la primera hoja).
+    :return: Tupla (encabezados_detectados, vista_previa).
     """
     try:
-        # Cargar archivo según la extensión
-        if archivo.endswith(".csv"):
-            df = pd.read_csv(archivo, header=None)  # Cargar sin asumir encabezados
-        else:
-            df = pd.read_excel(archivo, header=None)
+        # Leer solo la posible fila de encabezados más las filas de la vista previa
+        df = leer_filas_iniciales(archivo, filas + 1, hoja)
 
         # Verificar si la primera fila puede ser los encabezados
         if df.iloc[0].nunique() == df.shape[1]:  # Valores únicos en la primera fila
@@ -22,11 +278,11 @@ def obtener_vista_previa(archivo):
             encabezados_detectados = False
             df.columns = [f"Column{i}" for i in range(1, len(df.columns) + 1)]  # Asignar nombres genéricos
 
-        # Vista previa: primeras 5 filas
-        vista_previa = df.head()
+        # Vista previa: primeras filas
+        vista_previa = df.head(filas)
 
         return encabezados_detectados, vista_previa
 
     except Exception as e:
-        print(f"Error al procesar el archivo: {e}")
+        log.error(f"Error al procesar el archivo: {e}")
         return None, None
@@ -0,0 +1,176 @@
+import os
+
+from registro import medir_etapa
+from seleccionarCols import leads_como_texto
+
+# Filas de datos que admite una hoja de Excel (sin contar la fila de encabezados)
+MAX_FILAS_EXCEL = 1_048_575
+
+# Tamaño del buffer de escritura para CSV
+BUFFER_CSV = 1024 * 1024
+
+
+class EscritorCSV:
+    """
+    Escribe bloques de un DataFrame en un archivo CSV con un buffer de escritura.
+    """
+
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "w", newline="", encoding="utf-8", buffering=BUFFER_CSV)
+        self.encabezados_escritos = False
+
+    def escribir(self, df):
+        df.to_csv(self.archivo, index=False, header=not self.encabezados_escritos)
+        self.encabezados_escritos = True
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class EscritorXLSX:
+    """
+    Escribe bloques en un libro de Excel en modo solo escritura de openpyxl,
+    que guarda las filas en disco a medida que se agregan.
+    """
+
+    def __init__(self, ruta):
+        from openpyxl import Workbook
+
+        self.ruta = ruta
+        self.libro = Workbook(write_only=True)
+        self.hoja = self.libro.create_sheet()
+        self.encabezados_escritos = False
+
+    def escribir(self, df):
+        if not self.encabezados_escritos:
+            self.hoja.append([str(col) for col in df.columns])
+            self.encabezados_escritos = True
+
+        # openpyxl no acepta NaN: los valores faltantes se escriben como celdas vacías
+        df = df.astype(object).where(df.notna(), None)
+        for fila in df.itertuples(index=False, name=None):
+            self.hoja.append(fila)
+
+    def cerrar(self):
+        self.libro.save(self.ruta)
+
+
+class EscritorParquet:
+    """
+    Escribe cada bloque como un grupo de filas (row group) de un archivo Parquet.
+    El esquema se toma del primer bloque con filas y los bloques siguientes se convierten a él.
+    """
+
+    def __init__(self, ruta):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.pq = pq
+        self.ruta = ruta
+        self.escritor = None
+        self.vacio = None  # Bloque vacío recibido antes de cualquier fila, para escribir solo el esquema
+
+    def _esquema(self, tabla):
+        # Una columna sin valores en el primer bloque quedaría con tipo null y una categoría con pocos
+        # valores con índices int8: se amplían para que los bloques siguientes se puedan convertir
+        pa = self.pa
+        campos = []
+        for campo in tabla.schema:
+            if pa.types.is_null(campo.type):
+                campo = campo.with_type(pa.large_string())
+            elif pa.types.is_dictionary(campo.type):
+                campo = campo.with_type(pa.dictionary(pa.int32(), campo.type.value_type))
+            campos.append(campo)
+        return pa.schema(campos, metadata=tabla.schema.metadata)
+
+    def escribir(self, df):
+        if self.escritor is None and df.empty:
+            self.vacio = df
+            return
+        tabla = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.escritor is None:
+            self.escritor = self.pq.ParquetWriter(self.ruta, self._esquema(tabla))
+        self.escritor.write_table(tabla.select(self.escritor.schema.names).cast(self.escritor.schema))
+
+    def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+        elif self.vacio is not None:
+            self.pq.write_table(self.pa.Table.from_pandas(self.vacio, preserve_index=False), self.ruta)
+
+
+# Escritores disponibles según la extensión del archivo de salida
+ESCRITORES = {
+    ".csv": EscritorCSV,
+    ".xlsx": EscritorXLSX,
+    ".parquet": EscritorParquet,
+}
+
+
+def _ruta_parte(ruta, numero, numerar_todas):
+    """
+    Devuelve la ruta del archivo número `numero` de la exportación (leads.csv -> leads_002.csv).
+    """
+    if numero == 1 and not numerar_todas:
+        return ruta
+    base, extension = os.path.splitext(ruta)
+    return f"{base}_{numero:03d}{extension}"
+
+
+def exportar_bloques(bloques, ruta, filas_por_archivo=None, ejecucion=None, como_texto=True):
+    """
+    Escribe los bloques a medida que llegan, sin juntarlos en memoria.
+    El formato se elige según la extensión de la ruta (.csv, .xlsx o .parquet).
+    Si se indica filas_por_archivo, la salida se divide en archivos numerados de ese tamaño;
+    en Excel también se divide al llegar al límite de filas de una hoja.
+    Los teléfonos y emails compactos se escriben como texto (ver leads_como_texto).
+
+    :param bloques: Iterable de DataFrames con las mismas columnas.
+    :param ruta: Ruta del archivo de salida.
+    :param filas_por_archivo: Número máximo de filas por archivo (None para no dividir).
+    :param ejecucion: Ejecucion opcional donde se mide la escritura (ver registro).
+    :param como_texto: False para escribir los bloques con sus tipos compactos (archivos temporales en Parquet).
+    :return: Tupla (lista de archivos escritos, total de filas exportadas).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in ESCRITORES:
+        raise ValueError(f"Formato de exportación no soportado: {extension}")
+
+    limite = filas_por_archivo
+    if extension == ".xlsx":
+        limite = min(limite or MAX_FILAS_EXCEL, MAX_FILAS_EXCEL)
+
+    archivos = []
+    escritor = None
+    filas_archivo = 0
+    total = 0
+    try:
+        for bloque in bloques:
+            inicio = 0
+            # El primer archivo se crea aunque el bloque esté vacío, para escribir los encabezados
+            while inicio < len(bloque) or not archivos:
+                if escritor is None:
+                    archivos.append(_ruta_parte(ruta, len(archivos) + 1, filas_por_archivo is not None))
+                    escritor = ESCRITORES[extension](archivos[-1])
+
+                cupo = len(bloque) - inicio
+                if limite is not None:
+                    cupo = min(cupo, limite - filas_archivo)
+                with medir_etapa(ejecucion, "exportacion", cupo) as medida:
+                    parte = bloque.iloc[inicio:inicio + cupo]
+                    escritor.escribir(leads_como_texto(parte) if como_texto else parte)
+                    medida.filas_salida = cupo
+                inicio += cupo
+                filas_archivo += cupo
+                total += cupo
+
+                if limite is not None and filas_archivo >= limite:
+                    escritor.cerrar()
+                    escritor = None
+                    filas_archivo = 0
+    finally:
+        if escritor is not None:
+            escritor.cerrar()
+
+    return archivos, total
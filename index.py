@@ -1,10 +1,133 @@
+"""
+Ventana principal de la limpieza de leads.
+
+pandas y los módulos de limpieza tardan varios segundos en importarse (más en el ejecutable de
+PyInstaller), así que la ventana se crea solo con tkinter y esos módulos se importan en un hilo
+de fondo mientras el usuario elige el archivo (ver cargar_modulos_en_segundo_plano).
+"""
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter import simpledialog
-import pandas as pd
-from encabezados import obtener_vista_previa  # Importar la función
-from concatColumnas import usar_una_columna_para_nombre, concatenar_dos_columnas
-from seleccionarCols import detectar_columna_telefonos, seleccionar_columnas, detectar_columna_emails
+from tablaVirtual import TablaVirtual
+from trabajos import Trabajo
+from registro import configurar_registro, Ejecucion
+
+# Variable de entorno con la ruta de un archivo donde se anotan los hitos del arranque
+# ("ventana" y "modulos"); la usa benchmarks/arranque.py para medir el tiempo hasta la primera ventana
+VARIABLE_MEDIR_ARRANQUE = "LEADS_MEDIR_ARRANQUE"
+
+_hilo_modulos = None  # Hilo que importa los módulos pesados
+_error_modulos = []   # Excepción de la importación, si falló
+
+
+def _importar_modulos():
+    """
+    Importa pandas y los módulos de limpieza y los deja como nombres globales de este módulo.
+    """
+    global obtener_vista_previa, listar_hojas, usar_una_columna_para_nombre, concatenar_dos_columnas
+    global seleccionar_columnas, perfilar_columnas, buscar_columna_telefonos, limpiar_columna_telefonos
+    global buscar_columna_emails, limpiar_columna_emails, ordenar_columnas_leads, leads_como_texto, TAMANO_MUESTRA
+    global pd, procesar_archivo, procesar_en_bloques, nuevo_resumen, mapeo_desde_pasos, aplicar_pasos
+    global formato_temporal, leer_temporal, releer_resultado
+    global exportar_bloques, Deduplicador, IndiceLeads, guardar_receta, cargar_receta
+    global marcar_similares, enriquecer_leads, limpiar_cache
+    try:
+        import pandas as pd
+        from encabezados import obtener_vista_previa, listar_hojas
+        from concatColumnas import usar_una_columna_para_nombre, concatenar_dos_columnas
+        from seleccionarCols import (
+            seleccionar_columnas,
+            perfilar_columnas,
+            buscar_columna_telefonos,
+            limpiar_columna_telefonos,
+            buscar_columna_emails,
+            limpiar_columna_emails,
+            ordenar_columnas_leads,
+            leads_como_texto,
+            TAMANO_MUESTRA,
+        )
+        from procesarArchivo import procesar_archivo, procesar_en_bloques, nuevo_resumen, mapeo_desde_pasos, aplicar_pasos
+        from procesarArchivo import formato_temporal, leer_temporal, releer_resultado
+        from exportar import exportar_bloques
+        from deduplicar import Deduplicador, IndiceLeads
+        from receta import guardar_receta, cargar_receta
+        from nombresSimilares import marcar_similares
+        from codigosArea import enriquecer_leads
+        from cacheArchivos import limpiar_cache
+    except Exception as e:
+        _error_modulos.append(e)
+
+
+def cargar_modulos_en_segundo_plano():
+    """
+    Empieza a importar los módulos pesados en un hilo de fondo (solo la primera vez que se llama).
+    """
+    global _hilo_modulos
+    if _hilo_modulos is None:
+        _hilo_modulos = threading.Thread(target=_importar_modulos, daemon=True)
+        _hilo_modulos.start()
+
+
+def esperar_modulos():
+    """
+    Espera a que terminen de importarse los módulos pesados. Se llama antes de usarlos;
+    normalmente ya están cargados porque la importación empieza al abrir la ventana.
+    """
+    cargar_modulos_en_segundo_plano()
+    _hilo_modulos.join()
+    if _error_modulos:
+        raise _error_modulos[0]
+
+
+def _anotar_arranque(ruta, hito):
+    with open(ruta, "a", encoding="utf-8") as archivo:
+        archivo.write(hito + "\n")
+
+
+def al_dibujar_ventana(root, ruta_arranque=None):
+    """
+    Empieza a importar los módulos pesados cuando la ventana ya se dibujó, para que la importación
+    no compita con la creación de la ventana.
+    Con ruta_arranque se anotan en ese archivo los hitos "ventana" (primera vez que se dibuja)
+    y "modulos" (importación terminada), y el programa se cierra al terminar.
+
+    :param root: Ventana principal.
+    :param ruta_arranque: Archivo donde se anotan los hitos (None para no medir).
+    """
+    def dibujada(event):
+        root.unbind("<Expose>")
+        # Los widgets se redibujan en tareas "idle": after_idle corre después de ellas
+        root.after_idle(iniciar)
+
+    def iniciar():
+        if ruta_arranque:
+            _anotar_arranque(ruta_arranque, "ventana")
+        cargar_modulos_en_segundo_plano()
+        if ruta_arranque:
+            revisar_modulos()
+
+    def revisar_modulos():
+        if _hilo_modulos.is_alive():
+            root.after(10, revisar_modulos)
+            return
+        _anotar_arranque(ruta_arranque, "modulos" if not _error_modulos else f"error: {_error_modulos[0]}")
+        root.destroy()
+
+    root.bind("<Expose>", dibujada)
+
+
+def _formatear_tabla(visibles):
+    # La tabla solo recibe datos después de algún trabajo, cuando los módulos ya están cargados
+    return leads_como_texto(visibles)
+
+
+# Cada cuántos milisegundos la ventana revisa el progreso del trabajo en curso
+INTERVALO_REVISION = 100
 
 class App:
     def __init__(self, root):
@@ -15,6 +138,16 @@ class App:
         # Variables
         self.archivo = None  # Ruta del archivo seleccionado
         self.df = None       # DataFrame cargado
+        self.vista_previa = None   # Vista previa original, sin pasos aplicados
+        self.encabezados = None    # True si el archivo tiene fila de encabezados
+        self.columnas_origen = []  # Columnas de la vista previa antes de aplicar los pasos
+        self.pasos = []            # Pasos aplicados sobre la vista previa, para repetirlos en todo el archivo
+        self.trabajo = None        # Trabajo en segundo plano en curso
+        self.resultado = None      # Archivo temporal con el resultado completo de "Procesar Archivo Completo"
+        self.pasos_resultado = None  # Pasos con los que se generó ese resultado
+        self.resumen_resultado = None  # Resumen del procesamiento que generó ese resultado
+        self.hoja = None           # Hoja seleccionada en archivos Excel con varias hojas
+        self.excel_rapido = tk.BooleanVar(value=False)  # Leer Excel con calamine en lugar de openpyxl
         
         # Botón para cargar archivo
         self.cargar_btn = tk.Button(root, text="Cargar Archivo Excel o CSV", command=self.cargar_archivo, width=30)
@@ -23,6 +156,10 @@ class App:
         # Etiqueta para mostrar el archivo seleccionado
         self.archivo_lbl = tk.Label(root, text="No se ha seleccionado ningún archivo", wraplength=400)
         self.archivo_lbl.pack(pady=10)
+
+        # Opción para leer Excel con un motor más rápido (requiere python-calamine)
+        self.excel_rapido_chk = tk.Checkbutton(root, text="Lectura rápida de Excel (calamine)", variable=self.excel_rapido)
+        self.excel_rapido_chk.pack()
         
         # Botón para continuar (deshabilitado hasta que se cargue un archivo)
         self.continuar_btn = tk.Button(root, text="Vista Previa", command=self.preparar_trabajo, state="disabled", width=20)
@@ -45,12 +182,67 @@ class App:
         self.concatenar_columnas_btn = tk.Button(root, text="Concatenar Columnas", command=self.concatenar_columnas_para_nombre, state="disabled", width=20)
         self.concatenar_columnas_btn.pack(pady=5)
 
+        # Botón para agregar el estado y la zona horaria según el código de área del teléfono
+        self.enriquecer_btn = tk.Button(root, text="Estado y Zona Horaria", command=self.agregar_estado_y_zona, state="disabled", width=20)
+        self.enriquecer_btn.pack(pady=5)
+
+        # Botón para aplicar los pasos a todo el archivo
+        self.procesar_btn = tk.Button(root, text="Procesar Archivo Completo", command=self.procesar_archivo_completo, state="disabled", width=30)
+        self.procesar_btn.pack(pady=5)
+
+        # Botón para exportar el archivo completo ya limpio
+        self.exportar_btn = tk.Button(root, text="Exportar Leads", command=self.exportar_leads, state="disabled", width=30)
+        self.exportar_btn.pack(pady=5)
+
+        # Botón para buscar leads con nombres parecidos (posibles duplicados) en el resultado
+        self.similares_btn = tk.Button(root, text="Duplicados Similares", command=self.buscar_similares, state="disabled", width=30)
+        self.similares_btn.pack(pady=5)
+
+        # Botón para guardar el mapeo de columnas y reutilizarlo en el modo por lotes (lotes.py)
+        self.guardar_mapeo_btn = tk.Button(root, text="Guardar Mapeo", command=self.guardar_mapeo, state="disabled", width=30)
+        self.guardar_mapeo_btn.pack(pady=5)
+
+        # Botones para guardar los pasos como receta y aplicar una receta guardada a la vista previa
+        self.guardar_receta_btn = tk.Button(root, text="Guardar Receta", command=self.guardar_receta, state="disabled", width=30)
+        self.guardar_receta_btn.pack(pady=5)
+        self.cargar_receta_btn = tk.Button(root, text="Cargar Receta", command=self.cargar_receta, state="disabled", width=30)
+        self.cargar_receta_btn.pack(pady=5)
+
+        # Botón para vaciar la caché de hojas de Excel ya leídas
+        self.limpiar_cache_btn = tk.Button(root, text="Limpiar Caché", command=self.limpiar_cache, width=30)
+        self.limpiar_cache_btn.pack(pady=5)
+
+        # Barra de progreso y botón para cancelar el trabajo en curso
+        self.progreso_frame = tk.Frame(root)
+        self.progreso_frame.pack(fill="x", padx=5)
+        self.progreso_bar = ttk.Progressbar(self.progreso_frame, mode="determinate", maximum=100)
+        self.progreso_bar.pack(side="left", expand=True, fill="x")
+        self.cancelar_btn = tk.Button(self.progreso_frame, text="Cancelar", command=self.cancelar_trabajo, state="disabled")
+        self.cancelar_btn.pack(side="right", padx=5)
+        self.progreso_lbl = tk.Label(root, text="", anchor="w")
+        self.progreso_lbl.pack(fill="x", padx=5)
+
+        # Botones que se deshabilitan mientras hay un trabajo en curso
+        self.botones_acciones = [
+            self.cargar_btn,
+            self.continuar_btn,
+            self.seleccionar_columnas_btn,
+            self.usar_una_columna_btn,
+            self.concatenar_columnas_btn,
+            self.enriquecer_btn,
+            self.procesar_btn,
+            self.exportar_btn,
+            self.similares_btn,
+            self.guardar_mapeo_btn,
+            self.guardar_receta_btn,
+            self.cargar_receta_btn,
+            self.limpiar_cache_btn,
+        ]
+        self.estado_botones = {}
+
         # Tabla para mostrar la vista previa
-        self.tree = ttk.Treeview(root)
-        self.tree.pack(expand=True, fill="both", padx=5, pady=5)
-        scrollbar_x = ttk.Scrollbar(root, orient="horizontal", command=self.tree.xview)
-        scrollbar_x.pack(side="bottom", fill="x")
-        self.tree.configure(xscrollcommand=scrollbar_x.set)
+        self.tabla = TablaVirtual(root, formato=_formatear_tabla)
+        self.tabla.pack(expand=True, fill="both", padx=5, pady=5)
 
     def cargar_archivo(self):
         # Seleccionar archivo
@@ -59,46 +251,140 @@ class App:
             filetypes=[("Archivos Excel y CSV", "*.xlsx *.xls *.csv")]
         )
         if self.archivo:
-            self.archivo_lbl.config(text=f"Archivo seleccionado:\n{self.archivo}")
+            esperar_modulos()
+            self.descartar_resultado()
+            # Elegir la hoja si el libro de Excel tiene más de una
+            self.hoja = None
+            hojas = listar_hojas(self.archivo)
+            if len(hojas) > 1:
+                self.hoja = self.seleccionar_opcion("Selecciona la hoja a cargar:", hojas)
+
+            self.archivo_lbl.config(text=f"Archivo seleccionado:\n{self.archivo}" + (f" (hoja: {self.hoja})" if self.hoja else ""))
             self.continuar_btn.config(state="normal")  # Habilitar el botón de continuar
             self.usar_una_columna_btn.config(state="normal")  # Botón "Usar Una Columna"
             self.concatenar_columnas_btn.config(state="normal")  # Botón "Concatenar Columnas"
             self.seleccionar_columnas_btn.config(state="normal")  # Botón "Usar Una Columna"
+            self.enriquecer_btn.config(state="normal")  # Botón "Estado y Zona Horaria"
+            self.procesar_btn.config(state="normal")  # Botón "Procesar Archivo Completo"
+            self.exportar_btn.config(state="normal")  # Botón "Exportar Leads"
+            self.similares_btn.config(state="normal")  # Botón "Duplicados Similares"
+            self.guardar_mapeo_btn.config(state="normal")  # Botón "Guardar Mapeo"
+            self.guardar_receta_btn.config(state="normal")  # Botón "Guardar Receta"
+            self.cargar_receta_btn.config(state="normal")  # Botón "Cargar Receta"
 
         else:
             self.archivo_lbl.config(text="No se seleccionó ningún archivo.")
     
+    def ejecutar_en_segundo_plano(self, funcion, al_terminar):
+        """
+        Ejecuta una función en un hilo de fondo y muestra su progreso.
+        :param funcion: Función que recibe el Trabajo y devuelve el resultado.
+        :param al_terminar: Función que recibe el resultado, llamada desde la ventana al terminar.
+        """
+        if self.trabajo is not None:
+            messagebox.showwarning("Advertencia", "Espere a que termine el trabajo en curso.")
+            return
+
+        # Deshabilitar las acciones mientras el trabajo está en curso
+        self.estado_botones = {boton: boton.cget("state") for boton in self.botones_acciones}
+        for boton in self.botones_acciones:
+            boton.config(state="disabled")
+        self.cancelar_btn.config(state="normal")
+        self.progreso_bar.config(mode="indeterminate")
+        self.progreso_bar.start()
+        self.progreso_lbl.config(text="Procesando...")
+
+        def funcion_con_modulos(trabajo):
+            esperar_modulos()
+            return funcion(trabajo)
+
+        self.al_terminar_trabajo = al_terminar
+        self.trabajo = Trabajo(funcion_con_modulos).iniciar()
+        self.root.after(INTERVALO_REVISION, self.revisar_trabajo)
+
+    def revisar_trabajo(self):
+        for tipo, datos in self.trabajo.mensajes():
+            if tipo == "progreso":
+                self.mostrar_progreso(datos)
+            else:
+                self.finalizar_trabajo(tipo, datos)
+                return
+        self.root.after(INTERVALO_REVISION, self.revisar_trabajo)
+
+    def mostrar_progreso(self, resumen):
+        texto = f"Filas procesadas: {resumen['filas_leidas']:,}"
+        if resumen.get("bytes_totales"):
+            if str(self.progreso_bar.cget("mode")) != "determinate":
+                self.progreso_bar.stop()
+                self.progreso_bar.config(mode="determinate")
+            self.progreso_bar["value"] = 100 * resumen["bytes_leidos"] / resumen["bytes_totales"]
+            texto += f" - {resumen['bytes_leidos'] / 1e6:,.1f} MB de {resumen['bytes_totales'] / 1e6:,.1f} MB"
+        self.progreso_lbl.config(text=texto)
+
+    def finalizar_trabajo(self, tipo, datos):
+        self.trabajo = None
+        self.progreso_bar.stop()
+        self.progreso_bar.config(mode="determinate")
+        self.progreso_bar["value"] = 0
+        self.progreso_lbl.config(text="")
+        self.cancelar_btn.config(state="disabled")
+        for boton, estado in self.estado_botones.items():
+            boton.config(state=estado)
+
+        if tipo == "terminado":
+            self.al_terminar_trabajo(datos)
+        elif tipo == "cancelado":
+            messagebox.showinfo("Cancelado", "El trabajo fue cancelado.")
+        else:
+            messagebox.showerror("Error", f"No se pudo completar el trabajo: {datos}")
+
+    def cancelar_trabajo(self):
+        if self.trabajo is not None:
+            # La cancelación se aplica al terminar el bloque que se está procesando
+            self.trabajo.cancelar.set()
+            self.cancelar_btn.config(state="disabled")
+            self.progreso_lbl.config(text="Cancelando...")
+
+    def motor_excel(self):
+        return "calamine" if self.excel_rapido.get() else "openpyxl"
+
     def preparar_trabajo(self):
         if self.archivo:
-            encabezados, vista_previa = obtener_vista_previa(self.archivo)
-            if vista_previa is not None:
-                if encabezados:
-                    messagebox.showinfo("Encabezados Detectados", "Se detectaron encabezados automáticamente.")
+            archivo, hoja = self.archivo, self.hoja
+
+            def cargar(trabajo):
+                with Ejecucion("vista_previa", {"archivo": archivo, "hoja": hoja}) as ejecucion:
+                    with ejecucion.etapa("encabezados") as medida:
+                        encabezados, vista_previa = obtener_vista_previa(archivo, hoja=hoja)
+                        medida.filas_salida = 0 if vista_previa is None else len(vista_previa)
+                return encabezados, vista_previa
+
+            def al_terminar(resultado):
+                encabezados, vista_previa = resultado
+                if vista_previa is not None:
+                    if encabezados:
+                        messagebox.showinfo("Encabezados Detectados", "Se detectaron encabezados automáticamente.")
+                    else:
+                        messagebox.showinfo("Encabezados Asignados", "No se detectaron encabezados claros. Se asignaron nombres genéricos.")
+
+                    # Asignar los datos cargados a self.df
+                    self.descartar_resultado()
+                    self.df = vista_previa.copy()
+                    self.vista_previa = vista_previa
+                    self.encabezados = encabezados
+                    self.columnas_origen = list(vista_previa.columns)
+                    self.pasos = []
+                    self.mostrar_vista_previa(vista_previa)
                 else:
-                    messagebox.showinfo("Encabezados Asignados", "No se detectaron encabezados claros. Se asignaron nombres genéricos.")
-                
-                # Asignar los datos cargados a self.df
-                self.df = vista_previa.copy()
-                self.mostrar_vista_previa(vista_previa)
-            else:
-                messagebox.showerror("Error", "No se pudo procesar el archivo.")
+                    messagebox.showerror("Error", "No se pudo procesar el archivo.")
+
+            self.ejecutar_en_segundo_plano(cargar, al_terminar)
         else:
             messagebox.showwarning("Advertencia", "No hay archivo cargado.")
     
     def mostrar_vista_previa(self, df):
-        # Limpiar cualquier contenido previo en la tabla
-        self.tree.delete(*self.tree.get_children())
-        self.tree["columns"] = list(df.columns)
-        self.tree["show"] = "headings"
-        
-        # Configurar encabezados
-        for col in df.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, anchor="center")
-        
-        # Agregar filas
-        for _, row in df.iterrows():
-            self.tree.insert("", "end", values=list(row))
+        # La tabla solo crea las filas visibles, así que puede mostrar el resultado completo
+        self.tabla.mostrar(df)
 
     def actualizar_vista_previa(self):
         if self.df is not None:
@@ -115,9 +401,21 @@ class App:
             columna = self.seleccionar_opcion("Selecciona una columna para 'name':", columnas)
             
             if columna:
-                # Llamar a la función para usar una columna
-                self.df = usar_una_columna_para_nombre(self.df, columna)
-                self.actualizar_vista_previa()
+                df = self.df
+
+                def usar_columna(trabajo):
+                    # Llamar a la función para usar una columna
+                    return usar_una_columna_para_nombre(df, columna)
+
+                def al_terminar(resultado):
+                    if resultado is None:
+                        messagebox.showerror("Error", f"No se pudo usar la columna '{columna}'.")
+                        return
+                    self.df = resultado
+                    self.pasos.append({"accion": "usar_columna", "columna": columna})
+                    self.actualizar_vista_previa()
+
+                self.ejecutar_en_segundo_plano(usar_columna, al_terminar)
         else:
             messagebox.showerror("Error", "No hay datos cargados.")
 
@@ -131,20 +429,283 @@ class App:
             columna2 = self.seleccionar_opcion("Selecciona la segunda columna:", columnas)
             
             if columna1 and columna2:
-                # Llamar a la función para concatenar columnas
-                self.df = concatenar_dos_columnas(self.df, columna1, columna2)
-                
-                # Eliminar únicamente las columnas seleccionadas
-                self.df.drop(columns=[columna1, columna2], inplace=True)
-                
-                # Actualizar la vista previa
-                self.actualizar_vista_previa()
-                
-                # Mensaje informativo
-                messagebox.showinfo("Éxito", f"Las columnas '{columna1}' y '{columna2}' fueron concatenadas y eliminadas. La nueva columna 'name' ha sido añadida.")
+                df = self.df
+
+                def concatenar(trabajo):
+                    # Concatenar sobre una copia superficial para no modificar la tabla que se está mostrando
+                    resultado = concatenar_dos_columnas(df.copy(deep=False), columna1, columna2)
+                    if resultado is None:
+                        return None
+                    # Eliminar únicamente las columnas seleccionadas
+                    return resultado.drop(columns=[columna1, columna2])
+
+                def al_terminar(resultado):
+                    if resultado is None:
+                        messagebox.showerror("Error", "No se pudieron concatenar las columnas.")
+                        return
+                    self.df = resultado
+                    self.pasos.append({"accion": "concatenar", "columnas": [columna1, columna2]})
+
+                    # Actualizar la vista previa
+                    self.actualizar_vista_previa()
+
+                    # Mensaje informativo
+                    messagebox.showinfo("Éxito", f"Las columnas '{columna1}' y '{columna2}' fueron concatenadas y eliminadas. La nueva columna 'name' ha sido añadida.")
+
+                self.ejecutar_en_segundo_plano(concatenar, al_terminar)
         else:
             messagebox.showerror("Error", "No hay datos cargados.")
 
+    def agregar_estado_y_zona(self):
+        if self.df is None:
+            messagebox.showerror("Error", "No hay datos cargados.")
+            return
+        if 'phone' not in self.df.columns:
+            messagebox.showerror("Error", "Primero seleccione las columnas para detectar la columna 'phone'.")
+            return
+        df = self.df
+
+        def enriquecer(trabajo):
+            return enriquecer_leads(df)
+
+        def al_terminar(resultado):
+            self.df = resultado
+            self.pasos.append({"accion": "enriquecer"})
+            self.actualizar_vista_previa()
+
+        self.ejecutar_en_segundo_plano(enriquecer, al_terminar)
+
+    def procesar_archivo_completo(self):
+        if self.archivo and self.df is not None:
+            archivo, encabezados, columnas, pasos = self.archivo, self.encabezados, self.columnas_origen, list(self.pasos)
+            hoja, motor = self.hoja, self.motor_excel()
+
+            def procesar(trabajo):
+                # El resultado completo se escribe en un archivo temporal; en memoria quedan solo sus primeras filas
+                descriptor, temporal = tempfile.mkstemp(prefix="leads_resultado_", suffix=formato_temporal())
+                os.close(descriptor)
+                parametros = {"archivo": archivo, "hoja": hoja, "motor": motor, "pasos": pasos}
+                try:
+                    with Ejecucion("procesar", parametros) as ejecucion:
+                        df, resumen = procesar_archivo(
+                            archivo, encabezados, columnas, pasos, deduplicador=Deduplicador(),
+                            progreso=trabajo.informar, cancelar=trabajo.cancelar, hoja=hoja, motor=motor,
+                            ejecucion=ejecucion, salida=temporal
+                        )
+                        ejecucion.agregar("resumen", resumen)
+                except BaseException:
+                    os.remove(temporal)
+                    raise
+                return df, resumen, temporal
+
+            def al_terminar(resultado):
+                self.df, resumen, temporal = resultado
+                self.descartar_resultado()
+                self.resultado, self.pasos_resultado, self.resumen_resultado = temporal, pasos, resumen
+                self.actualizar_vista_previa()
+                messagebox.showinfo(
+                    "Proceso Terminado",
+                    f"Filas leídas: {resumen['filas_leidas']}\n"
+                    f"Filas descartadas: {resumen['filas_descartadas']}\n"
+                    f"Filas duplicadas: {resumen['filas_duplicadas']}\n"
+                    f"Emails corregidos: {resumen['emails_corregidos']}\n"
+                    f"Emails rechazados: {resumen['emails_rechazados']}\n"
+                    f"Filas resultantes: {resumen['filas_resultantes']}"
+                    + (f"\n\nSe muestran las primeras {len(self.df)} filas; use \"Exportar Leads\" para guardar todas."
+                       if len(self.df) < resumen["filas_resultantes"] else "")
+                )
+
+            self.ejecutar_en_segundo_plano(procesar, al_terminar)
+        else:
+            messagebox.showerror("Error", "Primero genere la vista previa del archivo.")
+
+    def descartar_resultado(self):
+        # Borrar el resultado temporal del último "Procesar Archivo Completo"
+        if self.resultado is not None:
+            try:
+                os.remove(self.resultado)
+            except OSError:
+                pass
+            self.resultado = self.pasos_resultado = self.resumen_resultado = None
+
+    def exportar_leads(self):
+        if not (self.archivo and self.df is not None):
+            messagebox.showerror("Error", "Primero genere la vista previa del archivo.")
+            return
+
+        ruta = filedialog.asksaveasfilename(
+            title="Exportar Leads",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Excel", "*.xlsx"), ("Parquet", "*.parquet")]
+        )
+        if not ruta:
+            return
+
+        # Dividir la salida en varios archivos si el marcador lo requiere (0 = un solo archivo)
+        filas_por_archivo = simpledialog.askinteger(
+            "Dividir Archivo",
+            "Filas por archivo (0 para no dividir):",
+            parent=self.root, minvalue=0, initialvalue=0
+        )
+        if filas_por_archivo is None:
+            return
+
+        # Omitir también los leads de exportaciones anteriores usando el historial en disco
+        usar_historial = messagebox.askyesno("Historial", "¿Omitir los leads que ya se exportaron en archivos anteriores?")
+
+        archivo, encabezados, columnas, pasos = self.archivo, self.encabezados, self.columnas_origen, list(self.pasos)
+        hoja, motor = self.hoja, self.motor_excel()
+        # Si el archivo ya se procesó con los pasos actuales, se exporta ese resultado sin volver a limpiarlo
+        resultado = self.resultado if self.resultado is not None and self.pasos_resultado == self.pasos else None
+        resumen_resultado = self.resumen_resultado
+
+        def exportar(trabajo):
+            parametros = {
+                "archivo": archivo, "hoja": hoja, "motor": motor, "pasos": pasos, "salida": ruta,
+                "filas_por_archivo": filas_por_archivo, "historial": usar_historial, "procesado": resultado is not None,
+            }
+            # La conexión SQLite se crea en el mismo hilo que la usa
+            indice = IndiceLeads() if usar_historial else None
+            try:
+                with Ejecucion("exportar", parametros) as ejecucion:
+                    deduplicador = Deduplicador(indice)
+                    if resultado is not None:
+                        # El resultado ya no tiene duplicados propios: solo hace falta revisar el historial
+                        resumen = dict(resumen_resultado)
+                        bloques = releer_resultado(
+                            resultado, resumen, deduplicador=deduplicador if indice is not None else None,
+                            progreso=trabajo.informar, cancelar=trabajo.cancelar, ejecucion=ejecucion
+                        )
+                    else:
+                        resumen = nuevo_resumen()
+                        bloques = procesar_en_bloques(
+                            archivo, encabezados, columnas, pasos, resumen=resumen, deduplicador=deduplicador,
+                            progreso=trabajo.informar, cancelar=trabajo.cancelar, hoja=hoja, motor=motor,
+                            ejecucion=ejecucion
+                        )
+                    archivos, total = exportar_bloques(bloques, ruta, filas_por_archivo or None, ejecucion)
+                    # Recordar los leads exportados para las próximas exportaciones
+                    deduplicador.guardar()
+                    ejecucion.agregar("resumen", resumen)
+                    ejecucion.agregar("archivos", archivos)
+            finally:
+                if indice is not None:
+                    indice.cerrar()
+            return archivos, total, resumen
+
+        def al_terminar(resultado):
+            archivos, total, resumen = resultado
+            messagebox.showinfo(
+                "Exportación Terminada",
+                f"Filas exportadas: {total}\n"
+                f"Filas descartadas: {resumen['filas_descartadas']}\n"
+                f"Filas duplicadas: {resumen['filas_duplicadas']}\n"
+                f"Emails corregidos: {resumen['emails_corregidos']}\n"
+                f"Emails rechazados: {resumen['emails_rechazados']}\n"
+                f"Archivos creados: {len(archivos)}"
+            )
+
+        self.ejecutar_en_segundo_plano(exportar, al_terminar)
+
+    def guardar_mapeo(self):
+        if not self.pasos:
+            messagebox.showerror("Error", "Todavía no se aplicó ningún paso sobre la vista previa.")
+            return
+
+        ruta = filedialog.asksaveasfilename(
+            title="Guardar Mapeo",
+            defaultextension=".json",
+            filetypes=[("Mapeo de columnas", "*.json")]
+        )
+        if ruta:
+            esperar_modulos()
+            mapeo = mapeo_desde_pasos(self.pasos)
+            if self.hoja:
+                mapeo["hoja"] = self.hoja
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump(mapeo, archivo, ensure_ascii=False, indent=2)
+            messagebox.showinfo("Mapeo Guardado", f"Mapeo guardado en:\n{ruta}")
+
+    def guardar_receta(self):
+        if not self.pasos:
+            messagebox.showerror("Error", "Todavía no se aplicó ningún paso sobre la vista previa.")
+            return
+
+        ruta = filedialog.asksaveasfilename(
+            title="Guardar Receta",
+            defaultextension=".json",
+            filetypes=[("Receta de pasos", "*.json")]
+        )
+        if ruta:
+            esperar_modulos()
+            guardar_receta(ruta, self.pasos, self.columnas_origen, self.hoja)
+            messagebox.showinfo("Receta Guardada", f"Receta guardada en:\n{ruta}")
+
+    def cargar_receta(self):
+        if self.vista_previa is None:
+            messagebox.showerror("Error", "Primero cargue la vista previa del archivo.")
+            return
+
+        ruta = filedialog.askopenfilename(title="Cargar Receta", filetypes=[("Receta de pasos", "*.json")])
+        if not ruta:
+            return
+        vista_previa = self.vista_previa
+
+        def aplicar(trabajo):
+            pasos = cargar_receta(ruta)["pasos"]
+            return aplicar_pasos(vista_previa.copy(), pasos), pasos
+
+        def al_terminar(resultado):
+            # Los pasos de la receta reemplazan a los aplicados hasta ahora
+            self.df, self.pasos = resultado
+            self.actualizar_vista_previa()
+
+        self.ejecutar_en_segundo_plano(aplicar, al_terminar)
+
+    def buscar_similares(self):
+        if self.df is None or "name" not in self.df.columns:
+            messagebox.showerror("Error", "Primero arme la columna 'name' (Usar Una Columna o Concatenar Columnas).")
+            return
+        df = self.df
+        # Si el archivo ya se procesó con los pasos actuales, buscar en el resultado completo
+        resultado = self.resultado if self.resultado is not None and self.pasos_resultado == self.pasos else None
+
+        def buscar(trabajo):
+            leads = df
+            if resultado is not None:
+                leads = pd.concat(list(leer_temporal(resultado, columnas=("name", "phone", "email"))), ignore_index=True)
+            with Ejecucion("similares", {"archivo": self.archivo, "filas": len(leads)}) as ejecucion:
+                with ejecucion.etapa("similares", len(leads)) as medida:
+                    grupos = marcar_similares(leads)
+                    medida.filas_salida = int(grupos.notna().sum())
+            return leads, grupos
+
+        def al_terminar(resultado):
+            leads, grupos = resultado
+            en_grupo = grupos.notna()
+            if not en_grupo.any():
+                messagebox.showinfo("Duplicados Similares", "No se encontraron leads con nombres parecidos.")
+                return
+            # Mostrar solo los leads con algún similar, agrupados; self.df no cambia
+            # y "Procesar Archivo Completo" u otro paso vuelven a mostrar el resultado completo
+            similares = leads[en_grupo].assign(grupo_similar=grupos[en_grupo]).sort_values("grupo_similar", kind="stable")
+            self.mostrar_vista_previa(similares)
+            messagebox.showinfo(
+                "Duplicados Similares",
+                f"Grupos de posibles duplicados: {grupos.nunique()}\n"
+                f"Leads en algún grupo: {int(en_grupo.sum())}"
+            )
+
+        self.ejecutar_en_segundo_plano(buscar, al_terminar)
+
+    def limpiar_cache(self):
+        esperar_modulos()
+        eliminados, liberados = limpiar_cache()
+        messagebox.showinfo(
+            "Caché Limpiada",
+            f"Archivos eliminados: {eliminados}\nEspacio liberado: {liberados / 1024 ** 2:.1f} MB"
+        )
+
     def seleccionar_opcion(self, mensaje, opciones):
         """
         Abre una ventana emergente para que el usuario seleccione una opción de una lista de opciones.
@@ -229,33 +790,52 @@ class App:
                     messagebox.showerror("Error", "Debe seleccionar al menos una columna.")
                     return
                 
-                # Aplicar la selección: eliminar las columnas no seleccionadas
-                self.df = seleccionar_columnas(self.df, columnas_seleccionadas)
-                if self.df is not None:
+                # Cerrar la ventana de selección
+                ventana_seleccion.destroy()
+                df = self.df
+                archivo, hoja, pasos = self.archivo, self.hoja, list(self.pasos)
+
+                def limpiar(trabajo):
+                    # Aplicar la selección: eliminar las columnas no seleccionadas
+                    resultado = seleccionar_columnas(df, columnas_seleccionadas)
+                    if resultado is None:
+                        return None
+                    # Perfilar las columnas una sola vez para detectar teléfono y email, sobre una muestra
+                    # del archivo con los pasos ya aplicados (la vista previa tiene muy pocas filas)
+                    _, muestra = obtener_vista_previa(archivo, filas=TAMANO_MUESTRA, hoja=hoja)
+                    if muestra is not None:
+                        muestra = seleccionar_columnas(aplicar_pasos(muestra, pasos), columnas_seleccionadas)
+                    perfil = perfilar_columnas(muestra if muestra is not None else resultado)
+                    trabajo.revisar_cancelacion()
                     # Detectar y renombrar la columna de teléfonos
-                    self.df = detectar_columna_telefonos(self.df)
+                    columna_telefonos = buscar_columna_telefonos(resultado, perfil)
+                    resultado = limpiar_columna_telefonos(resultado, columna_telefonos)
+                    trabajo.revisar_cancelacion()
                     # Detectar y renombrar la columna de correos electrónicos
-                    self.df = detectar_columna_emails(self.df)
-                    
-                    # Crear columnas faltantes si no existen
-                    if 'phone' not in self.df.columns:
-                        self.df['phone'] = "No hay telefono"
-                    if 'email' not in self.df.columns:
-                        self.df['email'] = "No hay email"
-                    
-                    # Reorganizar las columnas en el orden deseado
-                    columnas_deseadas = ['name', 'phone', 'email']
-                    columnas_restantes = [col for col in self.df.columns if col not in columnas_deseadas]
-                    columnas_reorganizadas = columnas_deseadas + columnas_restantes
-                    self.df = self.df[[col for col in columnas_reorganizadas if col in self.df.columns]]
-                    
-                    # Cerrar la ventana de selección
-                    ventana_seleccion.destroy()
-                    
+                    columna_emails = buscar_columna_emails(resultado, perfil)
+                    resultado = limpiar_columna_emails(resultado, columna_emails)
+
+                    # Crear columnas faltantes y reorganizar las columnas en el orden deseado
+                    return ordenar_columnas_leads(resultado), columna_telefonos, columna_emails
+
+                def al_terminar(resultado):
+                    if resultado is None:
+                        messagebox.showerror("Error", "No se pudo seleccionar las columnas.")
+                        return
+                    self.df, columna_telefonos, columna_emails = resultado
+
+                    # Registrar los pasos con las columnas detectadas en la vista previa
+                    self.pasos.extend([
+                        {"accion": "seleccionar", "columnas": columnas_seleccionadas},
+                        {"accion": "telefonos", "columna": columna_telefonos},
+                        {"accion": "emails", "columna": columna_emails},
+                        {"accion": "ordenar"},
+                    ])
+
                     # Actualizar la vista previa en la interfaz
                     self.actualizar_vista_previa()
-                else:
-                    messagebox.showerror("Error", "No se pudo seleccionar las columnas.")
+
+                self.ejecutar_en_segundo_plano(limpiar, al_terminar)
             
             # Botón para confirmar selección
             btn_confirmar = tk.Button(ventana_seleccion, text="Confirmar", command=confirmar_seleccion)
@@ -265,6 +845,10 @@ class App:
 
 # Ejecutar la aplicación
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necesario en el ejecutable de Windows (procesos de marcar_similares)
+    configurar_registro()
     root = tk.Tk()
     app = App(root)
+    al_dibujar_ventana(root, os.environ.get(VARIABLE_MEDIR_ARRANQUE))
     root.mainloop()
+    app.descartar_resultado()
@@ -0,0 +1,301 @@
+"""
+Procesa en lote todos los archivos de una carpeta (o de un patrón glob) sin abrir la interfaz.
+
+Cada archivo se limpia en un proceso aparte con el mismo mapeo de columnas ("Guardar Mapeo")
+o la misma receta de pasos ("Guardar Receta") guardados desde la interfaz; después los resultados
+se unen en una sola salida sin duplicados y se escribe un resumen por archivo.
+
+Uso:
+    python lotes.py CARPETA_O_PATRON (--mapeo mapeo.json | --receta receta.json) --salida leads.csv
+                    [--procesos N] [--filas-por-archivo N] [--historial [RUTA]] [--motor-excel calamine]
+                    [--perfilar] [--similares]
+
+Cada lote deja un registro JSON con el tiempo, las filas y la memoria de cada etapa por archivo
+en la carpeta de registros (ver registro.py). Con --perfilar cada archivo además se perfila con
+cProfile y tracemalloc y su perfil se guarda en la misma carpeta.
+
+Con --similares, después de unir los resultados se buscan leads con nombres parecidos
+(ver nombresSimilares.py) y los grupos se escriben en SALIDA_similares.csv para revisarlos.
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from encabezados import obtener_vista_previa, MOTOR_EXCEL
+from procesarArchivo import pasos_desde_mapeo, procesar_en_bloques, nuevo_resumen, formato_temporal, leer_temporal
+from exportar import exportar_bloques
+from deduplicar import Deduplicador, IndiceLeads, RUTA_INDICE
+from seleccionarCols import TAMANO_MUESTRA, TIPO_TEXTO, leads_como_texto
+from nombresSimilares import marcar_similares
+from receta import cargar_receta, PlanPasos
+from registro import configurar_registro, medir_etapa, Ejecucion
+
+log = logging.getLogger(__name__)
+
+# Extensiones que se procesan cuando la entrada es una carpeta
+EXTENSIONES = (".csv", ".xlsx", ".xls")
+
+# Filas de la vista previa usadas para detectar nombre, teléfono y email en cada archivo
+FILAS_MUESTRA = TAMANO_MUESTRA
+
+
+def buscar_archivos(entrada):
+    """
+    Devuelve los archivos a procesar: los de la carpeta indicada o los que coinciden con el patrón.
+    """
+    if os.path.isdir(entrada):
+        archivos = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)]
+    else:
+        archivos = glob.glob(entrada)
+    return sorted(archivo for archivo in archivos if archivo.lower().endswith(EXTENSIONES))
+
+
+def procesar_archivo_lote(archivo, mapeo, carpeta_temporal, numero, motor=MOTOR_EXCEL, perfilar=False):
+    """
+    Limpia un archivo con el mapeo (o la receta) y guarda el resultado en un archivo temporal.
+    Se ejecuta en un proceso del pool, así que no comparte memoria con el proceso principal.
+
+    :param perfilar: True para perfilar el archivo; el perfil se guarda en la carpeta de registros.
+    :return: Diccionario con el resumen del archivo, su estado, la ruta del resultado temporal,
+             sus columnas y el registro de sus etapas.
+    """
+    resultado = {"archivo": archivo, "estado": "ok", "error": "", "temporal": None, "columnas": []}
+    hoja = mapeo.get("hoja")
+    ejecucion = Ejecucion(
+        f"archivo_{numero:05d}", {"archivo": archivo, "hoja": hoja, "motor": motor}, guardar=perfilar, perfilar=perfilar
+    )
+    try:
+        with ejecucion:
+            with ejecucion.etapa("encabezados") as medida:
+                encabezados, vista_previa = obtener_vista_previa(archivo, filas=FILAS_MUESTRA, hoja=hoja)
+                if vista_previa is None:
+                    raise ValueError("No se pudo leer la vista previa del archivo.")
+                medida.filas_salida = len(vista_previa)
+
+            # Una receta ya trae los pasos exactos; un mapeo se adapta a las columnas de cada archivo
+            pasos = mapeo["pasos"] if "pasos" in mapeo else pasos_desde_mapeo(mapeo, vista_previa)
+            columnas = list(PlanPasos(pasos, list(vista_previa.columns)).salida)
+            resumen = nuevo_resumen()
+            temporal = os.path.join(carpeta_temporal, f"{numero:05d}{formato_temporal()}")
+            bloques = procesar_en_bloques(
+                archivo, encabezados, list(vista_previa.columns), pasos, resumen=resumen, hoja=hoja, motor=motor,
+                ejecucion=ejecucion
+            )
+            # En Parquet el resultado temporal conserva los tipos compactos hasta la salida final
+            exportar_bloques(bloques, temporal, ejecucion=ejecucion, como_texto=temporal.endswith(".csv"))
+
+        resultado.update(resumen)
+        resultado["temporal"] = temporal
+        resultado["columnas"] = columnas
+    except Exception as e:
+        resultado["estado"] = "error"
+        resultado["error"] = str(e)
+    resultado["registro"] = ejecucion.datos
+    return resultado
+
+
+def columnas_unidas(resultados):
+    """
+    Unión de las columnas de salida de todos los archivos, en el orden en que aparecen.
+    """
+    columnas = []
+    for resultado in resultados:
+        columnas.extend(columna for columna in resultado["columnas"] if columna not in columnas)
+    return columnas
+
+
+def alinear_columnas(bloque, columnas):
+    """
+    Ordena las columnas del bloque según la lista indicada; las que faltan se agregan vacías, como texto.
+    """
+    faltantes = [columna for columna in columnas if columna not in bloque.columns]
+    if faltantes:
+        vacias = pd.DataFrame({columna: pd.Series(index=bloque.index, dtype=TIPO_TEXTO) for columna in faltantes})
+        bloque = pd.concat([bloque, vacias], axis=1)
+    return bloque[columnas]
+
+
+def procesar_lote(archivos, mapeo, salida, procesos=None, filas_por_archivo=None, ruta_historial=None,
+                  motor=MOTOR_EXCEL, perfilar=False, ruta_similares=None):
+    """
+    Procesa varios archivos en paralelo y une los resultados en una salida sin duplicados.
+    El registro de cada archivo (etapas, mensajes y duración) se guarda en el registro JSON del lote.
+
+    :param archivos: Lista de rutas de archivos.
+    :param mapeo: Mapeo de columnas (ver procesarArchivo.pasos_desde_mapeo) o receta (ver receta.cargar_receta).
+    :param salida: Ruta del archivo de salida (.csv, .xlsx o .parquet).
+    :param procesos: Número de procesos; por defecto, uno por núcleo disponible.
+    :param filas_por_archivo: Número máximo de filas por archivo de salida (None para no dividir).
+    :param ruta_historial: Ruta del historial de leads exportados, para omitirlos (None para no usarlo).
+    :param motor: Motor de lectura de Excel ("openpyxl" o "calamine").
+    :param perfilar: True para perfilar cada archivo con cProfile y tracemalloc.
+    :param ruta_similares: Ruta del reporte de leads con nombres parecidos (None para no buscarlos).
+    :return: Tupla (lista de resúmenes por archivo, archivos de salida escritos).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    carpeta_temporal = tempfile.mkdtemp(prefix="leads_lote_")
+    indice = IndiceLeads(ruta_historial) if ruta_historial else None
+    deduplicador = Deduplicador(indice)
+    resumenes = []
+    claves_similares = []  # Nombre, teléfono y email de cada fila exportada, para buscar similares
+    parametros = {
+        "archivos": len(archivos), "salida": salida, "procesos": procesos, "motor": motor,
+        "filas_por_archivo": filas_por_archivo, "historial": ruta_historial,
+    }
+
+    def bloques_unidos(resultados):
+        # Se unen en el orden de los archivos para que la salida sea reproducible, y todos los bloques
+        # con las mismas columnas aunque los archivos tengan columnas adicionales distintas
+        columnas = columnas_unidas(resultados)
+        for resultado in resultados:
+            resumenes.append(resultado)
+            if resultado["estado"] == "ok":
+                log.info(f"[ok] {resultado['archivo']}")
+            else:
+                log.error(f"[{resultado['estado']}] {resultado['archivo']} {resultado['error']}")
+                continue
+
+            resultado["filas_duplicadas"] = 0
+            resultado["filas_exportadas"] = 0
+            for bloque in leer_temporal(resultado["temporal"]):
+                with ejecucion.etapa("deduplicacion", len(bloque)) as medida:
+                    unicos = deduplicador.filtrar(bloque)
+                    medida.filas_salida = len(unicos)
+                resultado["filas_duplicadas"] += len(bloque) - len(unicos)
+                resultado["filas_exportadas"] += len(unicos)
+                if ruta_similares is not None:
+                    claves_similares.append(unicos[[c for c in ("name", "phone", "email") if c in unicos.columns]])
+                yield alinear_columnas(unicos, columnas)
+            os.remove(resultado["temporal"])
+
+    try:
+        with Ejecucion("lote", parametros) as ejecucion:
+            with ProcessPoolExecutor(max_workers=min(procesos, max(len(archivos), 1))) as pool:
+                futuros = [
+                    pool.submit(procesar_archivo_lote, archivo, mapeo, carpeta_temporal, numero, motor, perfilar)
+                    for numero, archivo in enumerate(archivos)
+                ]
+                # Las columnas de la salida se conocen cuando terminan todos los archivos
+                resultados = [futuro.result() for futuro in futuros]
+                salidas, _ = exportar_bloques(bloques_unidos(resultados), salida, filas_por_archivo, ejecucion)
+            deduplicador.guardar()
+            if ruta_similares is not None:
+                buscar_similares(claves_similares, ruta_similares, procesos, ejecucion)
+            ejecucion.agregar("archivos", [
+                {clave: valor for clave, valor in resultado.items() if clave not in ("temporal", "columnas")}
+                for resultado in resumenes
+            ])
+    finally:
+        if indice is not None:
+            indice.cerrar()
+        shutil.rmtree(carpeta_temporal, ignore_errors=True)
+
+    return resumenes, salidas
+
+
+def buscar_similares(bloques, ruta, procesos=None, ejecucion=None):
+    """
+    Busca leads con nombres parecidos entre todas las filas exportadas y escribe los grupos
+    en un CSV con el número de grupo, la fila de la salida (contando desde 1) y el nombre,
+    teléfono y email de cada lead.
+
+    :param bloques: Bloques exportados, en orden, con las columnas 'name', 'phone' y 'email'.
+    :return: Número de grupos encontrados.
+    """
+    leads = pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame()
+    if "name" not in leads.columns:
+        log.warning("La salida no tiene columna 'name'; no se buscan nombres similares.")
+        return 0
+
+    with medir_etapa(ejecucion, "similares", len(leads)) as medida:
+        grupos = marcar_similares(leads, procesos=procesos)
+        medida.filas_salida = int(grupos.notna().sum())
+
+    en_grupo = grupos.notna().to_numpy(dtype=bool)
+    reporte = leads_como_texto(leads[en_grupo])
+    reporte.insert(0, "fila", reporte.index + 1)
+    reporte.insert(0, "grupo", grupos[en_grupo])
+    reporte.sort_values(["grupo", "fila"]).to_csv(ruta, index=False)
+    log.info(f"Grupos de nombres similares: {grupos.nunique()} ({int(en_grupo.sum())} leads) en {ruta}")
+    return grupos.nunique()
+
+
+def escribir_reporte(resumenes, ruta):
+    """
+    Escribe el resumen por archivo en un CSV.
+    """
+    columnas = [
+        "archivo", "estado", "filas_leidas", "filas_descartadas", "filas_duplicadas", "filas_exportadas",
+        "emails_corregidos", "emails_rechazados", "error",
+    ]
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=columnas, extrasaction="ignore")
+        escritor.writeheader()
+        escritor.writerows(resumenes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpia en lote varios archivos de leads con un mapeo guardado.")
+    parser.add_argument("entrada", help="Carpeta con los archivos o patrón glob (por ejemplo 'leads/*.csv').")
+    origen_pasos = parser.add_mutually_exclusive_group(required=True)
+    origen_pasos.add_argument("--mapeo", help="Archivo JSON con el mapeo de columnas.")
+    origen_pasos.add_argument("--receta", help="Archivo JSON con la receta de pasos.")
+    parser.add_argument("--salida", required=True, help="Archivo de salida (.csv, .xlsx o .parquet).")
+    parser.add_argument("--procesos", type=int, default=None, help="Número de procesos (por defecto, uno por núcleo).")
+    parser.add_argument("--filas-por-archivo", type=int, default=None, help="Dividir la salida en archivos de N filas.")
+    parser.add_argument(
+        "--historial", nargs="?", const=RUTA_INDICE, default=None,
+        help="Omitir los leads ya exportados antes (opcionalmente, ruta del historial).",
+    )
+    parser.add_argument(
+        "--motor-excel", choices=["openpyxl", "calamine"], default=MOTOR_EXCEL,
+        help="Motor de lectura de Excel (calamine es más rápido y requiere python-calamine).",
+    )
+    parser.add_argument(
+        "--perfilar", action="store_true",
+        help="Perfilar cada archivo con cProfile y tracemalloc (el perfil se guarda junto al registro).",
+    )
+    parser.add_argument(
+        "--similares", action="store_true",
+        help="Buscar leads con nombres parecidos y escribir los grupos en SALIDA_similares.csv.",
+    )
+    args = parser.parse_args()
+    configurar_registro(consola=True)
+
+    archivos = buscar_archivos(args.entrada)
+    if not archivos:
+        parser.error(f"No se encontraron archivos en: {args.entrada}")
+
+    if args.receta:
+        mapeo = cargar_receta(args.receta)
+    else:
+        with open(args.mapeo, encoding="utf-8") as archivo:
+            mapeo = json.load(archivo)
+
+    base = os.path.splitext(args.salida)[0]
+    resumenes, salidas = procesar_lote(
+        archivos, mapeo, args.salida, args.procesos, args.filas_por_archivo, args.historial, args.motor_excel,
+        args.perfilar, base + "_similares.csv" if args.similares else None
+    )
+
+    reporte = base + "_resumen.csv"
+    escribir_reporte(resumenes, reporte)
+
+    exportadas = sum(r.get("filas_exportadas", 0) for r in resumenes)
+    errores = sum(r["estado"] != "ok" for r in resumenes)
+    print(f"Archivos procesados: {len(resumenes)} (con error: {errores})")
+    print(f"Filas exportadas: {exportadas} en {len(salidas)} archivo(s)")
+    print(f"Resumen por archivo: {reporte}")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necesario en el ejecutable de Windows
+    main()
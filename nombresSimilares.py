@@ -0,0 +1,311 @@
+"""
+Detección de leads duplicados por nombre aproximado: el mismo lead puede llegar como "JOHN SMITH"
+de un proveedor y como "Smith John" o "Jon Smith" de otro.
+
+Comparar todos los pares de nombres no es posible con millones de filas, así que la búsqueda
+se hace en tres pasos:
+1. Bloqueo: los leads se agrupan por la clave fonética del nombre (Soundex de cada palabra),
+   por el código de área del teléfono y por el dominio del email. Solo se comparan leads
+   que comparten alguno de esos bloques.
+2. Dentro de cada bloque los leads se ordenan por nombre normalizado y cada uno se compara con
+   los VENTANA siguientes. En los bloques chicos eso equivale a comparar todos los pares; en los
+   grandes (un código de área, gmail.com) el costo sigue siendo lineal.
+3. La similitud es el índice de Jaccard de los bigramas del nombre normalizado (palabras en orden
+   alfabético, sin acentos ni mayúsculas). Se estima con firmas MinHash calculadas con numpy
+   y se confirma de forma exacta solo en los pares candidatos.
+
+Los pares similares se unen en grupos (componentes conexas). La normalización y las comparaciones
+se reparten en tareas que se ejecutan en paralelo en varios procesos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from seleccionarCols import TIPO_TEXTO
+from validacionEmails import dominios_email
+
+# Similitud mínima (Jaccard de bigramas) para considerar que dos nombres son del mismo lead
+UMBRAL_SIMILITUD = 0.75
+
+# Leads siguientes con los que se compara cada lead dentro de su bloque
+VENTANA = 10
+
+# Funciones de hash de las firmas MinHash (multiplicación y suma de 32 bits, con desborde)
+# y margen bajo el umbral con el que se eligen los pares que se confirman de forma exacta
+PERMUTACIONES_MINHASH = 32
+MARGEN_MINHASH = 0.2
+COEFICIENTES_MINHASH = np.random.default_rng(0).integers(
+    1, 1 << 32, size=(PERMUTACIONES_MINHASH, 2), dtype=np.uint64
+).astype(np.uint32) | np.uint32(1)
+
+# Caracteres del nombre normalizado que se comparan, y de cada palabra para la clave fonética
+LARGO_MAXIMO_NOMBRE = 48
+LARGO_MAXIMO_PALABRA = 16
+
+# Palabras del nombre que forman la clave fonética (15 bits por palabra en un entero de 64 bits)
+PALABRAS_CLAVE_FONETICA = 4
+
+# Filas por tarea al normalizar, pares por lote al comparar y mínimo de filas para usar varios procesos
+FILAS_POR_TAREA = 200_000
+PARES_POR_LOTE = 200_000
+FILAS_MINIMAS_PARALELO = 200_000
+
+# Dígito de Soundex de cada letra; 0 para las vocales (separan letras con el mismo dígito),
+# 7 para 'h' y 'w' (no separan) y 8 para el relleno al final de la palabra
+SOUNDEX = np.full(256, 8, dtype=np.uint8)
+for _letras, _digito in (("aeiouy", 0), ("bfpv", 1), ("cgjkqsxz", 2), ("dt", 3), ("l", 4), ("mn", 5), ("r", 6),
+                         ("hw", 7)):
+    SOUNDEX[np.frombuffer(_letras.encode(), dtype=np.uint8)] = _digito
+
+
+def normalizar_nombres(nombres):
+    """
+    Normaliza los nombres para compararlos: sin acentos ni mayúsculas, solo letras,
+    y con las palabras en orden alfabético ("Smith, JOHN" -> "john smith").
+
+    :param nombres: Serie o lista de nombres (con nulos).
+    :return: Lista de textos normalizados ("" para los nombres vacíos).
+    """
+    textos = pd.Series(nombres, dtype=TIPO_TEXTO)
+    textos = (
+        textos.str.normalize("NFKD")
+        .str.replace("[\u0300-\u036f]", "", regex=True)  # Acentos separados por NFKD
+        .str.lower()
+        .str.replace(r"[^a-z]+", " ", regex=True)
+        .fillna("")
+    )
+    return [" ".join(sorted(texto.split())) for texto in textos.tolist()]
+
+
+def claves_foneticas(normalizados):
+    """
+    Calcula la clave fonética de cada nombre normalizado: el código Soundex de cada palabra
+    (hasta PALABRAS_CLAVE_FONETICA palabras) combinado en un entero. "john smith" y "jon smyth"
+    tienen la misma clave.
+
+    :param normalizados: Lista de nombres normalizados (ver normalizar_nombres).
+    :return: Arreglo int64 con la clave de cada nombre (0 para los nombres vacíos).
+    """
+    palabras = pd.Series(normalizados, dtype=object).str.split().explode().dropna()
+    claves = np.zeros(len(normalizados), dtype=np.int64)
+    if palabras.empty:
+        return claves
+
+    letras = np.array(palabras.tolist(), dtype=f"S{LARGO_MAXIMO_PALABRA}")
+    letras = letras.view(np.uint8).reshape(len(letras), LARGO_MAXIMO_PALABRA)
+    codigos = SOUNDEX[letras]
+
+    # Soundex: primera letra y los tres primeros dígitos distintos del anterior
+    digitos = np.zeros((len(letras), 3), dtype=np.int64)
+    cantidad = np.zeros(len(letras), dtype=np.int64)
+    anterior = codigos[:, 0].astype(np.int64)
+    filas = np.arange(len(letras))
+    for posicion in range(1, LARGO_MAXIMO_PALABRA):
+        codigo = codigos[:, posicion].astype(np.int64)
+        nuevo = (codigo >= 1) & (codigo <= 6) & (codigo != anterior) & (cantidad < 3)
+        digitos[filas[nuevo], cantidad[nuevo]] = codigo[nuevo]
+        cantidad += nuevo
+        # Las vocales reinician el dígito anterior; 'h', 'w' y el relleno lo conservan
+        anterior = np.where(codigo <= 6, codigo, anterior)
+    soundex = (letras[:, 0].astype(np.int64) - ord("a")) * 1000 + digitos @ np.array([100, 10, 1])
+
+    # Hasta PALABRAS_CLAVE_FONETICA códigos por nombre, 15 bits cada uno
+    posicion = palabras.groupby(level=0).cumcount().to_numpy()
+    usadas = posicion < PALABRAS_CLAVE_FONETICA
+    fila = palabras.index.to_numpy()[usadas]
+    np.add.at(claves, fila, (soundex[usadas] + 1) << (15 * posicion[usadas]))
+    return claves
+
+
+def _preparar(nombres):
+    """
+    Tarea de un proceso: normaliza un tramo de nombres y calcula sus claves fonéticas.
+
+    :return: Tupla (nombres normalizados como arreglo de bytes, claves fonéticas).
+    """
+    normalizados = normalizar_nombres(nombres)
+    return np.array(normalizados, dtype=f"S{LARGO_MAXIMO_NOMBRE}"), claves_foneticas(normalizados)
+
+
+def _firmas_minhash(nombres, filas_por_lote=50_000):
+    """
+    Firmas MinHash de los bigramas de cada nombre (rodeado de espacios para contar el inicio
+    y el fin de las palabras), calculadas sobre la matriz de bytes de todos los nombres a la vez.
+
+    :param nombres: Arreglo de bytes de ancho fijo con los nombres normalizados.
+    :return: Matriz uint32 (nombres x PERMUTACIONES_MINHASH).
+    """
+    n, ancho = len(nombres), nombres.dtype.itemsize
+    firmas = np.empty((n, PERMUTACIONES_MINHASH), dtype=np.uint32)
+    for inicio in range(0, n, filas_por_lote):
+        lote = nombres[inicio:inicio + filas_por_lote]
+        largos = np.char.str_len(lote)
+        usado = int(largos.max(initial=0))  # Solo las columnas que ocupa el nombre más largo
+        matriz = np.full((len(lote), usado + 2), ord(" "), dtype=np.uint8)
+        matriz[:, 1:usado + 1] = lote.view(np.uint8).reshape(len(lote), ancho)[:, :usado]
+        matriz[np.arange(len(lote)), largos + 1] = ord(" ")
+
+        bigramas = (matriz[:, :-1].astype(np.uint32) << 8) | matriz[:, 1:]
+        # Las posiciones después del final repiten el primer bigrama, así no cambian el mínimo
+        despues = np.arange(usado + 1) > largos[:, None]
+        bigramas[despues] = np.broadcast_to(bigramas[:, :1], bigramas.shape)[despues]
+        for k, (a, b) in enumerate(COEFICIENTES_MINHASH):
+            firmas[inicio:inicio + len(lote), k] = (bigramas * a + b).min(axis=1)
+    return firmas
+
+
+def _bigramas(nombre):
+    texto = b" " + nombre + b" "
+    return {texto[i:i + 2] for i in range(len(texto) - 1)}
+
+
+def similitud(nombre1, nombre2):
+    """
+    Índice de Jaccard de los bigramas de dos nombres ya normalizados.
+    """
+    if isinstance(nombre1, str):
+        nombre1, nombre2 = nombre1.encode()[:LARGO_MAXIMO_NOMBRE], nombre2.encode()[:LARGO_MAXIMO_NOMBRE]
+    bigramas1, bigramas2 = _bigramas(nombre1), _bigramas(nombre2)
+    return len(bigramas1 & bigramas2) / len(bigramas1 | bigramas2)
+
+
+def _comparar(ids, nombres, bloques, ventana, umbral):
+    """
+    Tarea de un proceso: compara los leads de una partición de bloques.
+
+    :param ids: Posición de cada lead en el DataFrame original.
+    :param nombres: Nombres normalizados (arreglo de bytes).
+    :param bloques: Bloque de cada lead.
+    :return: Tupla de arreglos (ids1, ids2) con los pares de leads similares.
+    """
+    firmas = _firmas_minhash(nombres)
+    orden = np.lexsort((nombres, bloques))
+    conjuntos = {}
+    pares1, pares2 = [], []
+
+    for distancia in range(1, ventana + 1):
+        a, b = orden[:-distancia], orden[distancia:]
+        mismo_bloque = bloques[a] == bloques[b]
+        if not mismo_bloque.any():
+            break  # Ningún bloque tiene más de `distancia` leads
+        a, b = a[mismo_bloque], b[mismo_bloque]
+
+        for inicio in range(0, len(a), PARES_POR_LOTE):
+            x, y = a[inicio:inicio + PARES_POR_LOTE], b[inicio:inicio + PARES_POR_LOTE]
+            estimada = (firmas[x] == firmas[y]).mean(axis=1)
+            candidatos = estimada >= umbral - MARGEN_MINHASH
+            x, y = x[candidatos], y[candidatos]
+
+            # Confirmar la similitud exacta; los nombres iguales no hace falta compararlos
+            similares = nombres[x] == nombres[y]
+            pendientes = np.flatnonzero(~similares)
+            for k, i, j in zip(pendientes.tolist(), x[pendientes].tolist(), y[pendientes].tolist()):
+                bigramas_i = conjuntos.get(i) or conjuntos.setdefault(i, _bigramas(bytes(nombres[i])))
+                bigramas_j = conjuntos.get(j) or conjuntos.setdefault(j, _bigramas(bytes(nombres[j])))
+                similares[k] = len(bigramas_i & bigramas_j) >= umbral * len(bigramas_i | bigramas_j)
+            pares1.append(ids[x[similares]])
+            pares2.append(ids[y[similares]])
+
+    if not pares1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(pares1), np.concatenate(pares2)
+
+
+def _agrupar(n, pares1, pares2):
+    """
+    Une los pares en grupos (componentes conexas) propagando el menor índice de cada grupo.
+
+    :return: Arreglo con el representante (menor posición) del grupo de cada lead.
+    """
+    grupo = np.arange(n)
+    while True:
+        menor = np.minimum(grupo[pares1], grupo[pares2])
+        nuevo = grupo.copy()
+        np.minimum.at(nuevo, pares1, menor)
+        np.minimum.at(nuevo, pares2, menor)
+        nuevo = nuevo[nuevo]  # Saltar directamente al representante del representante
+        if np.array_equal(nuevo, grupo):
+            return grupo
+        grupo = nuevo
+
+
+def claves_de_bloqueo(df):
+    """
+    Calcula los bloques de cada lead en las pasadas de bloqueo por teléfono y por email.
+    Los teléfonos y emails de relleno no forman bloques.
+
+    :return: Diccionario {pasada: arreglo int64 con el bloque de cada lead, -1 si no tiene}.
+    """
+    claves = {}
+    if "phone" in df.columns and not isinstance(df["phone"].dtype, pd.CategoricalDtype):
+        telefonos = pd.to_numeric(df["phone"], errors="coerce")
+        claves["area"] = pd.factorize(telefonos // 10_000_000)[0]
+    if "email" in df.columns and not isinstance(df["email"].dtype, pd.CategoricalDtype):
+        claves["dominio"] = dominios_email(df["email"].astype(TIPO_TEXTO)).cat.codes.to_numpy(dtype=np.int64)
+    return claves
+
+
+def marcar_similares(df, umbral=UMBRAL_SIMILITUD, ventana=VENTANA, procesos=None):
+    """
+    Busca grupos de leads con nombres parecidos que probablemente son la misma persona.
+    Los leads no se eliminan: se devuelve el grupo de cada uno para revisarlos.
+
+    :param df: DataFrame limpio con la columna 'name' y, si existen, 'phone' y 'email'.
+    :param umbral: Similitud mínima entre dos nombres (0 a 1).
+    :param ventana: Leads siguientes con los que se compara cada lead dentro de su bloque.
+    :param procesos: Número de procesos; por defecto, uno por núcleo (uno solo en DataFrames chicos).
+    :return: Serie Int64 con el número de grupo (1, 2, ...) de los leads que tienen algún similar,
+             y nulo en el resto.
+    """
+    n = len(df)
+    if n < FILAS_MINIMAS_PARALELO:
+        procesos = 1
+    procesos = procesos or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    mapear = pool.map if pool is not None else map
+
+    try:
+        # Normalizar los nombres y calcular las claves fonéticas por tramos
+        nombres = df["name"].tolist()
+        tramos = list(mapear(_preparar, [nombres[i:i + FILAS_POR_TAREA] for i in range(0, n, FILAS_POR_TAREA)]))
+        normalizados = np.concatenate([t[0] for t in tramos]) if tramos else np.empty(0, dtype="S1")
+        foneticas = np.concatenate([t[1] for t in tramos]) if tramos else np.empty(0, dtype=np.int64)
+        con_nombre = normalizados != b""
+
+        pasadas = {"fonetica": pd.factorize(foneticas)[0]}
+        pasadas["fonetica"][foneticas == 0] = -1
+        pasadas.update(claves_de_bloqueo(df))
+
+        # Repartir los bloques de cada pasada en particiones independientes
+        particiones = max(procesos * 2, 1)
+        tareas = []
+        for bloques in pasadas.values():
+            validos = con_nombre & (bloques >= 0)
+            for particion in range(particiones):
+                ids = np.flatnonzero(validos & (bloques % particiones == particion))
+                if len(ids) > 1:
+                    tareas.append((ids, normalizados[ids], bloques[ids]))
+
+        pares1, pares2 = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        resultados = mapear(
+            _comparar, *zip(*tareas), [ventana] * len(tareas), [umbral] * len(tareas)
+        ) if tareas else []
+        for a, b in resultados:
+            pares1.append(a)
+            pares2.append(b)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    grupo = _agrupar(n, np.concatenate(pares1), np.concatenate(pares2))
+    tamano = np.bincount(grupo, minlength=n)
+    en_grupo = tamano[grupo] > 1
+
+    # Numerar los grupos en el orden en que aparece su primer lead
+    numeros = np.zeros(n, dtype=np.int64)
+    representantes = np.flatnonzero(en_grupo & (grupo == np.arange(n)))
+    numeros[representantes] = np.arange(1, len(representantes) + 1)
+    return pd.Series(
+        pd.arrays.IntegerArray(numeros[grupo], ~en_grupo), index=df.index, name="grupo_similar"
+    )
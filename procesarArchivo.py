@@ -0,0 +1,398 @@
+import os
+
+import pandas as pd
+from codigosArea import enriquecer_leads
+from encabezados import iterar_bloques_excel, MOTOR_EXCEL
+from exportar import exportar_bloques
+from receta import PlanPasos
+from registro import medir_bloques, medir_etapa
+from trabajos import ProcesoCancelado
+from concatColumnas import usar_una_columna_para_nombre, concatenar_dos_columnas
+from seleccionarCols import (
+    seleccionar_columnas,
+    buscar_columna_telefonos,
+    buscar_columna_emails,
+    buscar_columna_nombres,
+    perfilar_columnas,
+    limpiar_columna_telefonos,
+    limpiar_columna_emails,
+    ordenar_columnas_leads,
+)
+
+# Número de filas que se procesan a la vez
+TAMANO_BLOQUE = 100_000
+
+# Filas del resultado que procesar_archivo conserva en memoria para mostrarlas
+FILAS_RESULTADO = 1000
+
+
+def _paso_usar_columna(df, paso):
+    return usar_una_columna_para_nombre(df, paso["columna"])
+
+
+def _paso_concatenar(df, paso):
+    columna1, columna2 = paso["columnas"]
+    df = concatenar_dos_columnas(df, columna1, columna2)
+    if df is not None:
+        df = df.drop(columns=[columna1, columna2])
+    return df
+
+
+def _paso_seleccionar(df, paso):
+    return seleccionar_columnas(df, paso["columnas"])
+
+
+def _paso_telefonos(df, paso):
+    return limpiar_columna_telefonos(df, paso["columna"])
+
+
+def _paso_emails(df, paso):
+    return limpiar_columna_emails(df, paso["columna"])
+
+
+def _paso_enriquecer(df, paso):
+    if 'phone' not in df.columns:
+        return None
+    return enriquecer_leads(df)
+
+
+def _paso_ordenar(df, paso):
+    return ordenar_columnas_leads(df)
+
+
+# Acciones que el usuario puede aplicar desde la interfaz
+ACCIONES = {
+    "usar_columna": _paso_usar_columna,
+    "concatenar": _paso_concatenar,
+    "seleccionar": _paso_seleccionar,
+    "telefonos": _paso_telefonos,
+    "emails": _paso_emails,
+    "enriquecer": _paso_enriquecer,
+    "ordenar": _paso_ordenar,
+}
+
+
+def aplicar_pasos(df, pasos):
+    """
+    Aplica en orden los pasos registrados sobre la vista previa a un DataFrame.
+
+    :param df: DataFrame con las columnas originales del archivo.
+    :param pasos: Lista de pasos, cada uno un diccionario con la clave 'accion' y sus parámetros.
+    :return: DataFrame transformado.
+    """
+    for paso in pasos:
+        df = ACCIONES[paso["accion"]](df, paso)
+        if df is None:
+            raise ValueError(f"No se pudo aplicar el paso '{paso['accion']}'.")
+    return df
+
+
+def pasos_desde_mapeo(mapeo, vista_previa):
+    """
+    Convierte un mapeo de columnas guardado en la lista de pasos para un archivo concreto.
+    Las columnas de nombre, teléfono y email marcadas como "auto" se detectan sobre la vista previa del archivo.
+
+    Formato del mapeo:
+        {"nombre": [columna] o [columna1, columna2] o "auto",
+         "columnas": [columnas a mantener, como en seleccionar_columnas],
+         "telefono": "auto" o nombre de columna o None,
+         "email": "auto" o nombre de columna o None,
+         "enriquecer": True para agregar estado y zona horaria según el teléfono (opcional)}
+
+    :param mapeo: Diccionario con el mapeo.
+    :param vista_previa: Vista previa del archivo (ver obtener_vista_previa).
+    :return: Lista de pasos.
+    """
+    pasos = []
+    nombre = mapeo.get("nombre") or []
+    if nombre == "auto":
+        columna_nombre = buscar_columna_nombres(vista_previa)
+        nombre = [columna_nombre] if columna_nombre is not None else []
+    if len(nombre) == 1:
+        pasos.append({"accion": "usar_columna", "columna": nombre[0]})
+    elif len(nombre) == 2:
+        pasos.append({"accion": "concatenar", "columnas": list(nombre)})
+
+    columnas = mapeo.get("columnas") or []
+    if columnas:
+        seleccion = {"accion": "seleccionar", "columnas": list(columnas)}
+        # Si la lista incluye las columnas del nombre, la selección se hizo antes de armar el nombre
+        if nombre and set(nombre) <= set(columnas):
+            pasos.insert(0, seleccion)
+        else:
+            pasos.append(seleccion)
+
+    # Detectar teléfono y email sobre la vista previa ya transformada, igual que en la interfaz
+    muestra = aplicar_pasos(vista_previa.copy(), pasos)
+    perfil = perfilar_columnas(muestra)
+    columna_telefonos = mapeo.get("telefono", "auto")
+    if columna_telefonos == "auto":
+        columna_telefonos = buscar_columna_telefonos(muestra, perfil)
+    columna_emails = mapeo.get("email", "auto")
+    if columna_emails == "auto":
+        columna_emails = buscar_columna_emails(muestra, perfil)
+
+    pasos.extend([
+        {"accion": "telefonos", "columna": columna_telefonos},
+        {"accion": "emails", "columna": columna_emails},
+    ])
+    if mapeo.get("enriquecer"):
+        pasos.append({"accion": "enriquecer"})
+    pasos.append({"accion": "ordenar"})
+    return pasos
+
+
+def mapeo_desde_pasos(pasos):
+    """
+    Genera un mapeo reutilizable a partir de los pasos registrados en la interfaz.
+    El teléfono y el email quedan en "auto" para detectarlos en cada archivo.
+
+    :param pasos: Lista de pasos.
+    :return: Diccionario con el mapeo (ver pasos_desde_mapeo).
+    """
+    mapeo = {"nombre": [], "columnas": [], "telefono": "auto", "email": "auto"}
+    for paso in pasos:
+        if paso["accion"] == "usar_columna":
+            mapeo["nombre"] = [paso["columna"]]
+        elif paso["accion"] == "concatenar":
+            mapeo["nombre"] = list(paso["columnas"])
+        elif paso["accion"] == "seleccionar":
+            mapeo["columnas"] = list(paso["columnas"])
+        elif paso["accion"] == "enriquecer":
+            mapeo["enriquecer"] = True
+    return mapeo
+
+
+def leer_bloques(archivo, encabezados, columnas, tamano_bloque=TAMANO_BLOQUE, resumen=None, usar=None, hoja=None,
+                 motor=MOTOR_EXCEL):
+    """
+    Lee el archivo completo en bloques de tamaño fijo y asigna a cada bloque
+    los mismos nombres de columnas que tiene la vista previa.
+    Si se indican las columnas a usar, solo esas se pasan al lector (usecols),
+    así el resto de las columnas del archivo no se convierte a DataFrame.
+
+    :param archivo: Ruta del archivo Excel o CSV.
+    :param encabezados: True si la primera fila del archivo contiene los encabezados.
+    :param columnas: Nombres de columnas de la vista previa.
+    :param tamano_bloque: Número máximo de filas por bloque.
+    :param resumen: Diccionario opcional donde se actualizan 'bytes_leidos' y 'bytes_totales'.
+    :param usar: Columnas de la vista previa que se leen (None para todas).
+    :param hoja: Nombre de la hoja de Excel (None para la primera hoja).
+    :param motor: Motor de lectura de Excel ("openpyxl" o "calamine").
+    :return: Generador de DataFrames.
+    """
+    if resumen is None:
+        resumen = nuevo_resumen()
+    resumen["bytes_totales"] = os.path.getsize(archivo)
+    saltar_filas = 1 if encabezados else 0
+
+    usecols = None
+    if usar and len(usar) < len(columnas):
+        usar = set(usar)
+        usecols = [i for i, columna in enumerate(columnas) if columna in usar]
+        columnas = [columnas[i] for i in usecols]
+
+    if archivo.endswith(".csv"):
+        with open(archivo, "rb") as manejador:
+            # Leer todo como texto para que los bloques no dependan de la inferencia de tipos
+            lector = pd.read_csv(
+                manejador, header=None, skiprows=saltar_filas, usecols=usecols, dtype=str, chunksize=tamano_bloque
+            )
+            for bloque in lector:
+                resumen["bytes_leidos"] = manejador.tell()
+                yield _ajustar_columnas(bloque, columnas)
+        return
+
+    # En Excel los bytes leídos se estiman con la proporción de filas leídas
+    progreso_excel = {}
+    filas = 0
+    for bloque in iterar_bloques_excel(archivo, tamano_bloque, saltar_filas, progreso_excel, hoja, usecols, motor):
+        filas += len(bloque)
+        filas_totales = progreso_excel.get("filas_totales")
+        if filas_totales:
+            resumen["bytes_leidos"] = int(resumen["bytes_totales"] * min((filas + saltar_filas) / filas_totales, 1))
+        yield _ajustar_columnas(bloque, columnas)
+    resumen["bytes_leidos"] = resumen["bytes_totales"]
+
+
+def _ajustar_columnas(bloque, columnas):
+    """
+    Asigna a un bloque sin encabezados los nombres de columnas de la vista previa.
+    """
+    bloque = bloque.iloc[:, :len(columnas)]
+    bloque.columns = columnas[:bloque.shape[1]]
+    return bloque.reindex(columns=columnas)
+
+
+def nuevo_resumen():
+    """
+    Crea el diccionario con los contadores de una ejecución.
+    """
+    return {
+        "bloques": 0,
+        "filas_leidas": 0,
+        "filas_descartadas": 0,
+        "filas_duplicadas": 0,
+        "filas_resultantes": 0,
+        "emails_corregidos": 0,
+        "emails_rechazados": 0,
+        "bytes_leidos": 0,
+        "bytes_totales": 0,
+    }
+
+
+def procesar_en_bloques(archivo, encabezados, columnas, pasos, tamano_bloque=TAMANO_BLOQUE, resumen=None,
+                        deduplicador=None, progreso=None, cancelar=None, hoja=None, motor=MOTOR_EXCEL,
+                        ejecucion=None):
+    """
+    Aplica los pasos elegidos sobre la vista previa a todo el archivo, bloque por bloque,
+    de modo que la memoria usada no depende del tamaño del archivo.
+
+    :param archivo: Ruta del archivo Excel o CSV.
+    :param encabezados: True si la primera fila del archivo contiene los encabezados.
+    :param columnas: Nombres de columnas de la vista previa.
+    :param pasos: Lista de pasos registrados en la interfaz.
+    :param tamano_bloque: Número máximo de filas por bloque.
+    :param resumen: Diccionario de contadores (ver nuevo_resumen) que se actualiza en cada bloque.
+    :param deduplicador: Deduplicador opcional para eliminar leads repetidos.
+    :param progreso: Función opcional que recibe una copia del resumen después de cada bloque.
+    :param cancelar: threading.Event opcional; si se activa, se lanza ProcesoCancelado antes del siguiente bloque.
+    :param hoja: Nombre de la hoja de Excel (None para la primera hoja).
+    :param motor: Motor de lectura de Excel ("openpyxl" o "calamine").
+    :param ejecucion: Ejecucion opcional donde se mide cada etapa (ver registro).
+    :return: Generador de DataFrames limpios.
+    """
+    if resumen is None:
+        resumen = nuevo_resumen()
+
+    # Compilar los pasos una sola vez y leer del archivo solo las columnas que llegan al resultado
+    plan = PlanPasos(pasos, columnas)
+    bloques = leer_bloques(archivo, encabezados, columnas, tamano_bloque, resumen, plan.columnas_leidas, hoja, motor)
+    for bloque in medir_bloques(ejecucion, "carga", bloques):
+        if cancelar is not None and cancelar.is_set():
+            raise ProcesoCancelado()
+
+        resultado = plan.aplicar(bloque, ejecucion, resumen)
+        resumen["filas_descartadas"] += len(bloque) - len(resultado)
+
+        if deduplicador is not None:
+            filas_limpias = len(resultado)
+            with medir_etapa(ejecucion, "deduplicacion", filas_limpias) as medida:
+                resultado = deduplicador.filtrar(resultado)
+                medida.filas_salida = len(resultado)
+            resumen["filas_duplicadas"] += filas_limpias - len(resultado)
+
+        resumen["bloques"] += 1
+        resumen["filas_leidas"] += len(bloque)
+        resumen["filas_resultantes"] += len(resultado)
+        if progreso is not None:
+            progreso(dict(resumen))
+
+        yield resultado
+
+
+def procesar_archivo(archivo, encabezados, columnas, pasos, tamano_bloque=TAMANO_BLOQUE, deduplicador=None,
+                     progreso=None, cancelar=None, hoja=None, motor=MOTOR_EXCEL, ejecucion=None, salida=None,
+                     filas_resultado=FILAS_RESULTADO):
+    """
+    Procesa el archivo completo y escribe los bloques limpios en la salida a medida que se generan.
+    Del resultado solo se conservan en memoria las primeras filas, para mostrarlas.
+
+    :param salida: Ruta del archivo donde se escribe el resultado completo (None para no escribirlo).
+    :param filas_resultado: Número máximo de filas del resultado que se devuelven.
+    :return: Tupla (DataFrame con las primeras filas del resultado, resumen de la ejecución).
+    """
+    resumen = nuevo_resumen()
+    primeras = []
+    filas = 0
+
+    def conservar_primeras(bloques):
+        nonlocal filas
+        for bloque in bloques:
+            if filas < filas_resultado or not primeras:
+                primeras.append(bloque.iloc[:filas_resultado - filas].copy())
+                filas += len(primeras[-1])
+            yield bloque
+
+    bloques = conservar_primeras(procesar_en_bloques(
+        archivo, encabezados, columnas, pasos, tamano_bloque, resumen, deduplicador, progreso, cancelar, hoja, motor,
+        ejecucion
+    ))
+    if salida is not None:
+        exportar_bloques(bloques, salida, ejecucion=ejecucion, como_texto=salida.endswith(".csv"))
+    else:
+        for _ in bloques:
+            pass
+    if not primeras:
+        return pd.DataFrame(), resumen
+    return pd.concat(primeras, ignore_index=True), resumen
+
+
+def formato_temporal():
+    """
+    Extensión de los resultados temporales: Parquet si pyarrow está instalado, CSV si no.
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return ".parquet"
+    except ImportError:
+        return ".csv"
+
+
+def leer_temporal(ruta, tamano_bloque=TAMANO_BLOQUE, columnas=None):
+    """
+    Lee por bloques un resultado temporal escrito con exportar_bloques.
+
+    :param columnas: Columnas que se leen, si existen en el archivo (None para todas).
+    :return: Generador de DataFrames.
+    """
+    if ruta.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        archivo = pq.ParquetFile(ruta)
+        if columnas is not None:
+            columnas = [c for c in archivo.schema_arrow.names if c in columnas]
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=columnas):
+            yield lote.to_pandas()
+    else:
+        usecols = None if columnas is None else (lambda c: c in columnas)
+        yield from pd.read_csv(ruta, dtype=str, keep_default_na=False, usecols=usecols, chunksize=tamano_bloque)
+
+
+def releer_resultado(ruta, resumen, tamano_bloque=TAMANO_BLOQUE, deduplicador=None, progreso=None, cancelar=None,
+                     ejecucion=None):
+    """
+    Lee por bloques el resultado completo que procesar_archivo escribió en disco, para exportarlo
+    sin volver a leer ni limpiar el archivo original. Las filas ya están limpias y sin duplicados
+    dentro del archivo; el deduplicador solo omite los leads del historial.
+
+    :param ruta: Ruta del resultado (ver formato_temporal).
+    :param resumen: Resumen del procesamiento; se actualizan las filas duplicadas y resultantes y el avance.
+    :param deduplicador: Deduplicador opcional con el historial de leads exportados.
+    :param progreso: Función opcional que recibe una copia del resumen después de cada bloque.
+    :param cancelar: threading.Event opcional; si se activa, se lanza ProcesoCancelado antes del siguiente bloque.
+    :param ejecucion: Ejecucion opcional donde se mide cada etapa (ver registro).
+    :return: Generador de DataFrames limpios.
+    """
+    filas_totales = resumen["filas_resultantes"]
+    resumen["bytes_totales"] = os.path.getsize(ruta)
+    resumen["bytes_leidos"] = 0
+    filas = 0
+    for bloque in medir_bloques(ejecucion, "carga", leer_temporal(ruta, tamano_bloque)):
+        if cancelar is not None and cancelar.is_set():
+            raise ProcesoCancelado()
+
+        filas += len(bloque)
+        if deduplicador is not None:
+            with medir_etapa(ejecucion, "deduplicacion", len(bloque)) as medida:
+                unicos = deduplicador.filtrar(bloque)
+                medida.filas_salida = len(unicos)
+            resumen["filas_duplicadas"] += len(bloque) - len(unicos)
+            resumen["filas_resultantes"] -= len(bloque) - len(unicos)
+            bloque = unicos
+
+        resumen["bytes_leidos"] = int(resumen["bytes_totales"] * min(filas / max(filas_totales, 1), 1))
+        if progreso is not None:
+            progreso(dict(resumen))
+
+        yield bloque
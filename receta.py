@@ -0,0 +1,220 @@
+"""
+Recetas: los pasos registrados en la interfaz guardados en JSON para repetirlos sobre otros archivos
+con las mismas columnas (por ejemplo, el archivo de la semana siguiente del mismo proveedor).
+
+Antes de procesar un archivo, los pasos se compilan en un plan (PlanPasos): los renombres se
+resuelven de antemano, se calcula qué columnas del archivo hacen falta y cada bloque se
+transforma en una sola pasada, sin DataFrames intermedios por cada paso.
+"""
+import json
+
+import pandas as pd
+from codigosArea import estados, zonas_horarias
+from concatColumnas import concatenar_series
+from seleccionarCols import (
+    normalizar_telefonos,
+    normalizar_emails,
+    columna_constante,
+    SIN_REGISTRO,
+    SIN_TELEFONO,
+    SIN_EMAIL,
+    TIPO_TEXTO,
+)
+from registro import medir_etapa
+
+VERSION_RECETA = 1
+
+# Etapa del registro en la que se mide cada tipo de expresión
+ETAPAS = {
+    "texto": "nombre",
+    "concatenar": "nombre",
+    "telefono": "telefonos",
+    "email": "emails",
+    "estado": "enriquecimiento",
+    "zona_horaria": "enriquecimiento",
+}
+
+
+def guardar_receta(ruta, pasos, columnas, hoja=None):
+    """
+    Guarda los pasos en un archivo JSON.
+
+    :param ruta: Ruta del archivo de la receta.
+    :param pasos: Lista de pasos registrados en la interfaz.
+    :param columnas: Columnas de la vista previa sobre las que se registraron los pasos.
+    :param hoja: Hoja de Excel de la que se leyeron las columnas (None para la primera hoja).
+    """
+    receta = {"version": VERSION_RECETA, "columnas": list(columnas), "pasos": list(pasos)}
+    if hoja:
+        receta["hoja"] = hoja
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(receta, archivo, ensure_ascii=False, indent=2)
+
+
+def cargar_receta(ruta):
+    """
+    Lee una receta guardada con guardar_receta y comprueba que sus pasos se puedan compilar.
+
+    :param ruta: Ruta del archivo de la receta.
+    :return: Diccionario con las claves 'version', 'columnas' y 'pasos'.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        receta = json.load(archivo)
+    if receta.get("version") != VERSION_RECETA or "pasos" not in receta:
+        raise ValueError(f"El archivo no es una receta válida (versión {VERSION_RECETA}): {ruta}")
+    PlanPasos(receta["pasos"], receta.get("columnas", []))
+    return receta
+
+
+def _renombrar(estado, anterior, nuevo):
+    """
+    Renombra una columna del estado conservando su posición, como DataFrame.rename.
+    """
+    return {nuevo if columna == anterior else columna: expresion for columna, expresion in estado.items()}
+
+
+class PlanPasos:
+    """
+    Plan compilado a partir de una lista de pasos.
+    Cada columna del resultado se describe con una expresión sobre las columnas originales:
+        ("columna", nombre)                 columna del archivo sin cambios
+        ("valor", texto)                    valor fijo (por ejemplo, 'No hay email'), como categoría
+        ("texto", expr)                     expresión convertida a TIPO_TEXTO
+        ("concatenar", expr1, expr2)        dos expresiones unidas con un espacio
+        ("telefono", expr)                  teléfono normalizado, como entero
+        ("email", expr)                     email validado como TIPO_TEXTO, con los vacíos e inválidos como nulos
+        ("estado", expr)                    estado del código de área del teléfono, como categoría
+        ("zona_horaria", expr)              zona horaria del código de área del teléfono, como categoría
+    Las expresiones "telefono" además descartan las filas con números inválidos.
+    Los nulos de 'email' se escriben como 'No hay email' al exportar (ver leads_como_texto).
+    """
+
+    def __init__(self, pasos, columnas):
+        estado = {columna: ("columna", columna) for columna in columnas}
+        self.filtros = []
+
+        for paso in pasos:
+            accion = paso["accion"]
+            if accion == "usar_columna":
+                self._verificar(estado, [paso["columna"]])
+                estado = _renombrar(estado, paso["columna"], "name")
+                estado["name"] = ("texto", estado["name"])
+            elif accion == "concatenar":
+                columna1, columna2 = paso["columnas"]
+                self._verificar(estado, [columna1, columna2])
+                estado["name"] = ("concatenar", estado[columna1], estado[columna2])
+                estado = {c: e for c, e in estado.items() if c not in (columna1, columna2)}
+            elif accion == "seleccionar":
+                self._verificar(estado, paso["columnas"])
+                estado = {columna: estado[columna] for columna in paso["columnas"]}
+            elif accion == "telefonos":
+                if paso["columna"] is None:
+                    estado["phone"] = ("valor", SIN_REGISTRO)
+                else:
+                    self._verificar(estado, [paso["columna"]])
+                    estado = _renombrar(estado, paso["columna"], "phone")
+                    estado["phone"] = ("telefono", estado["phone"])
+                    self.filtros.append(estado["phone"])
+            elif accion == "emails":
+                if paso["columna"] is None:
+                    estado["email"] = ("valor", SIN_EMAIL)
+                else:
+                    self._verificar(estado, [paso["columna"]])
+                    estado = _renombrar(estado, paso["columna"], "email")
+                    estado["email"] = ("email", estado["email"])
+            elif accion == "enriquecer":
+                self._verificar(estado, ["phone"])
+                estado["state"] = ("estado", estado["phone"])
+                estado["timezone"] = ("zona_horaria", estado["phone"])
+            elif accion == "ordenar":
+                estado.setdefault("phone", ("valor", SIN_TELEFONO))
+                estado.setdefault("email", ("valor", SIN_EMAIL))
+                primeras = [columna for columna in ("name", "phone", "email") if columna in estado]
+                estado = {columna: estado[columna] for columna in primeras + [c for c in estado if c not in primeras]}
+            else:
+                raise ValueError(f"Acción desconocida en la receta: '{accion}'.")
+
+        self.salida = estado
+
+        # Columnas del archivo que usa alguna expresión, en el orden del archivo
+        usadas = set()
+        for expresion in list(self.salida.values()) + self.filtros:
+            usadas |= self._columnas_de(expresion)
+        self.columnas_leidas = [columna for columna in columnas if columna in usadas]
+
+    @staticmethod
+    def _verificar(estado, columnas):
+        faltantes = [columna for columna in columnas if columna not in estado]
+        if faltantes:
+            raise ValueError(f"Las columnas no existen en el archivo: {', '.join(map(str, faltantes))}")
+
+    def _columnas_de(self, expresion):
+        if expresion[0] == "columna":
+            return {expresion[1]}
+        if expresion[0] == "valor":
+            return set()
+        return set().union(*(self._columnas_de(e) for e in expresion[1:]))
+
+    def _evaluar(self, expresion, bloque, calculadas, ejecucion=None, resumen=None):
+        # Las expresiones compartidas (por ejemplo, el teléfono usado como filtro y como columna)
+        # se calculan una sola vez por bloque
+        clave = id(expresion)
+        if clave in calculadas:
+            return calculadas[clave]
+
+        tipo = expresion[0]
+        if tipo == "columna":
+            resultado = bloque[expresion[1]]
+        elif tipo == "valor":
+            resultado = columna_constante(expresion[1], bloque.index)
+        else:
+            argumentos = [self._evaluar(e, bloque, calculadas, ejecucion, resumen) for e in expresion[1:]]
+            with medir_etapa(ejecucion, ETAPAS[tipo], len(bloque)) as medida:
+                if tipo == "texto":
+                    resultado = argumentos[0].astype(TIPO_TEXTO)
+                elif tipo == "concatenar":
+                    resultado = concatenar_series(*argumentos)
+                elif tipo == "telefono":
+                    resultado = normalizar_telefonos(*argumentos)
+                elif tipo == "estado":
+                    resultado = estados(*argumentos)
+                elif tipo == "zona_horaria":
+                    resultado = zonas_horarias(*argumentos)
+                else:
+                    resultado = normalizar_emails(*argumentos, resumen=resumen)
+                # Solo el teléfono descarta filas: las que quedan sin un número válido
+                medida.filas_salida = int(resultado.notna().sum()) if tipo == "telefono" else len(resultado)
+
+        calculadas[clave] = resultado
+        return resultado
+
+    def aplicar(self, bloque, ejecucion=None, resumen=None):
+        """
+        Transforma un bloque con las columnas originales del archivo.
+
+        :param bloque: DataFrame con (al menos) las columnas de columnas_leidas.
+        :param ejecucion: Ejecucion opcional donde se miden las etapas (ver registro).
+        :param resumen: Diccionario opcional donde se suman los emails corregidos y rechazados.
+        :return: DataFrame transformado.
+        """
+        calculadas = {}
+
+        # Primero se descartan las filas con teléfonos inválidos, así el resto
+        # de las columnas solo se calcula para las filas que quedan
+        if self.filtros:
+            validas = None
+            for expresion in self.filtros:
+                con_valor = self._evaluar(expresion, bloque, calculadas, ejecucion, resumen).notna().to_numpy(dtype=bool)
+                validas = con_valor if validas is None else validas & con_valor
+            if not validas.all():
+                bloque = bloque[validas]
+                calculadas = {clave: serie[validas] for clave, serie in calculadas.items()}
+
+        datos = {
+            columna: self._evaluar(expresion, bloque, calculadas, ejecucion, resumen)
+            for columna, expresion in self.salida.items()
+        }
+        with medir_etapa(ejecucion, "seleccion", len(bloque)) as medida:
+            resultado = pd.DataFrame(datos, index=bloque.index, copy=False)
+            medida.filas_salida = len(resultado)
+        return resultado
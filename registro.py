@@ -0,0 +1,370 @@
+"""
+Registro de diagnóstico de las ejecuciones.
+
+- Los módulos escriben sus mensajes con logging (logging.getLogger(__name__)) en lugar de print.
+  configurar_registro() los guarda en un archivo dentro de RUTA_REGISTROS, así también quedan
+  disponibles en el ejecutable de la interfaz, que no tiene consola.
+- Ejecucion mide cada etapa del procesamiento (tiempo, filas de entrada y de salida, filas
+  descartadas y pico de memoria durante la etapa) y al terminar guarda un registro JSON de la ejecución.
+- Con perfilar=True (o la variable de entorno LEADS_PERFILAR=1) la ejecución además se perfila
+  con cProfile y tracemalloc; el perfil se guarda junto al registro JSON.
+"""
+import datetime
+import io
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from trabajos import ProcesoCancelado
+
+# Carpeta de los registros, junto al historial de leads exportados
+RUTA_REGISTROS = os.path.join(os.path.expanduser("~"), ".cleaning_leads", "registros")
+
+# Registros JSON de ejecuciones que se conservan (se eliminan los más antiguos)
+MAX_REGISTROS = 200
+
+# Tamaño máximo del archivo de mensajes antes de rotarlo, y copias que se conservan
+TAMANO_ARCHIVO_MENSAJES = 5 * 1024 ** 2
+COPIAS_ARCHIVO_MENSAJES = 3
+
+# Variable de entorno para perfilar todas las ejecuciones
+VARIABLE_PERFILAR = "LEADS_PERFILAR"
+
+# Funciones y líneas que se guardan en el resumen del perfil
+LINEAS_PERFIL = 25
+
+FORMATO_MENSAJES = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configurar_registro(consola=False, carpeta=RUTA_REGISTROS):
+    """
+    Envía los mensajes de todos los módulos a un archivo de registro y, si se indica, a la consola.
+    Llamarla más de una vez no agrega manejadores repetidos.
+
+    :param consola: True para mostrar también los mensajes en la consola (modo por lotes).
+    :return: Ruta del archivo de mensajes.
+    """
+    raiz = logging.getLogger()
+    raiz.setLevel(logging.INFO)
+    ruta = os.path.join(carpeta, "cleaning_leads.log")
+    if not any(getattr(manejador, "_leads", False) for manejador in raiz.handlers):
+        os.makedirs(carpeta, exist_ok=True)
+        archivo = logging.handlers.RotatingFileHandler(
+            ruta, maxBytes=TAMANO_ARCHIVO_MENSAJES, backupCount=COPIAS_ARCHIVO_MENSAJES, encoding="utf-8"
+        )
+        archivo.setFormatter(logging.Formatter(FORMATO_MENSAJES))
+        archivo._leads = True
+        raiz.addHandler(archivo)
+        if consola:
+            pantalla = logging.StreamHandler()
+            pantalla.setFormatter(logging.Formatter("%(message)s"))
+            pantalla._leads = True
+            raiz.addHandler(pantalla)
+    return ruta
+
+
+def memoria_actual():
+    """
+    Memoria residente (RSS) del proceso en bytes, o None si no se puede medir en este sistema.
+    """
+    if sys.platform == "win32":
+        return _contadores_memoria_windows()[1]
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def memoria_pico():
+    """
+    Pico de memoria residente del proceso desde que empezó, en bytes (None si no se puede medir).
+    """
+    if sys.platform == "win32":
+        return _contadores_memoria_windows()[0]
+    import resource
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024  # En Linux ru_maxrss está en KB
+
+
+def _contadores_memoria_windows():
+    """
+    :return: Tupla (PeakWorkingSetSize, WorkingSetSize) del proceso, o (None, None) si falla.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    contadores = PROCESS_MEMORY_COUNTERS()
+    contadores.cb = ctypes.sizeof(contadores)
+    proceso = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+        return None, None
+    return contadores.PeakWorkingSetSize, contadores.WorkingSetSize
+
+
+def _mb(valor):
+    return None if valor is None else round(valor / 1024 ** 2, 1)
+
+
+class MedidaEtapa:
+    """
+    Filas de una llamada a una etapa. Quien ejecuta la etapa completa filas_salida.
+    La memoria residente al empezar y el pico durante la etapa los completa Ejecucion.
+    """
+
+    def __init__(self, filas_entrada=None):
+        self.filas_entrada = filas_entrada
+        self.filas_salida = None
+        self.memoria_inicial = None
+        self.memoria_pico = None
+
+
+class _MuestreoMemoria:
+    """
+    Revisa la memoria residente cada INTERVALO segundos desde un hilo aparte y actualiza
+    el pico de las etapas en curso (como MedidorMemoria en benchmarks/suite.py).
+    Las etapas más cortas que el intervalo quedan medidas al empezar y al terminar.
+    """
+
+    INTERVALO = 0.01
+
+    def __init__(self):
+        self.activas = []
+        self._terminar = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        if memoria_actual() is None:
+            return
+        self._terminar.clear()
+        self._hilo = threading.Thread(target=self._revisar, name="muestreo_memoria", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._terminar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _revisar(self):
+        while not self._terminar.wait(self.INTERVALO):
+            self.anotar(memoria_actual())
+
+    def anotar(self, memoria):
+        if memoria is None:
+            return
+        for medida in list(self.activas):
+            medida.memoria_pico = max(medida.memoria_pico or 0, memoria)
+
+
+class _ManejadorEventos(logging.Handler):
+    """
+    Guarda los mensajes emitidos durante la ejecución en su registro JSON.
+    """
+
+    def __init__(self, eventos):
+        super().__init__(logging.INFO)
+        self.eventos = eventos
+
+    def emit(self, registro):
+        self.eventos.append({
+            "hora": datetime.datetime.fromtimestamp(registro.created).isoformat(timespec="milliseconds"),
+            "nivel": registro.levelname,
+            "modulo": registro.name,
+            "mensaje": registro.getMessage(),
+        })
+
+
+class Ejecucion:
+    """
+    Registro estructurado de una ejecución (procesar o exportar un archivo, o un lote).
+    Se usa como administrador de contexto; al salir guarda el registro JSON en RUTA_REGISTROS
+    con el estado ("ok", "cancelado" o "error"), la duración, las etapas y los mensajes emitidos.
+
+    Las etapas se miden con 'with ejecucion.etapa(nombre, filas_entrada) as medida' y se acumulan
+    por nombre, porque en el procesamiento por bloques cada etapa se ejecuta una vez por bloque.
+    """
+
+    def __init__(self, descripcion, parametros=None, carpeta=RUTA_REGISTROS, guardar=True, perfilar=None):
+        self.carpeta = carpeta
+        self.guardar_al_salir = guardar
+        if perfilar is None:
+            perfilar = os.environ.get(VARIABLE_PERFILAR, "") not in ("", "0")
+        self.perfilar = perfilar
+        self.etapas = {}
+        self.datos = {
+            "descripcion": descripcion,
+            "inicio": datetime.datetime.now().isoformat(timespec="seconds"),
+            "parametros": parametros or {},
+            "etapas": self.etapas,
+            "eventos": [],
+        }
+        self.ruta = None
+        self._manejador = _ManejadorEventos(self.datos["eventos"])
+        self._perfil = None
+        self._inicio = None
+        self._muestreo = _MuestreoMemoria()
+
+    def __enter__(self):
+        logging.getLogger().addHandler(self._manejador)
+        self._muestreo.iniciar()
+        if self.perfilar:
+            # cProfile y pstats se importan solo al perfilar, para no demorar el arranque de la ventana
+            import cProfile
+
+            tracemalloc.start()
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.datos["segundos"] = round(time.perf_counter() - self._inicio, 3)
+        if tipo is None:
+            self.datos["estado"] = "ok"
+        elif issubclass(tipo, ProcesoCancelado):
+            self.datos["estado"] = "cancelado"
+        else:
+            self.datos["estado"] = "error"
+            self.datos["error"] = f"{tipo.__name__}: {valor}"
+        # Pico de toda la vida del proceso (no solo de esta ejecución): se anota una vez por ejecución
+        self.datos["memoria_pico_proceso_mb"] = _mb(memoria_pico())
+        self._muestreo.detener()
+
+        logging.getLogger().removeHandler(self._manejador)
+        if self.guardar_al_salir:
+            self.guardar()
+        return False
+
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=None):
+        """
+        Mide una llamada a una etapa y la acumula en el registro.
+
+        :param nombre: Nombre de la etapa (por ejemplo "carga", "telefonos" o "exportacion").
+        :param filas_entrada: Filas que recibe la etapa (si se conocen).
+        :return: MedidaEtapa, donde se indican las filas de salida.
+        """
+        medida = MedidaEtapa(filas_entrada)
+        medida.memoria_inicial = memoria_actual()
+        self._muestreo.activas.append(medida)
+        self._muestreo.anotar(medida.memoria_inicial)
+        inicio = time.perf_counter()
+        try:
+            yield medida
+        finally:
+            duracion = time.perf_counter() - inicio
+            memoria_final = memoria_actual()
+            self._muestreo.anotar(memoria_final)
+            self._muestreo.activas.remove(medida)
+            acumulado = self.etapas.setdefault(nombre, {
+                "llamadas": 0, "segundos": 0.0, "filas_entrada": 0, "filas_salida": 0, "filas_descartadas": 0,
+            })
+            acumulado["llamadas"] += 1
+            acumulado["segundos"] = round(acumulado["segundos"] + duracion, 4)
+            if medida.filas_entrada is not None:
+                acumulado["filas_entrada"] += medida.filas_entrada
+            if medida.filas_salida is not None:
+                acumulado["filas_salida"] += medida.filas_salida
+                if medida.filas_entrada is not None:
+                    acumulado["filas_descartadas"] += medida.filas_entrada - medida.filas_salida
+            acumulado["memoria_mb"] = _mb(memoria_final)
+            if medida.memoria_pico is not None:
+                # Pico de memoria residente durante la etapa y cuánto creció respecto del inicio
+                # de la llamada, el máximo entre todas las llamadas
+                aumento = _mb(medida.memoria_pico - medida.memoria_inicial)
+                acumulado["memoria_pico_mb"] = max(acumulado.get("memoria_pico_mb", 0.0), _mb(medida.memoria_pico))
+                acumulado["memoria_aumento_mb"] = max(acumulado.get("memoria_aumento_mb", 0.0), aumento)
+
+    def agregar(self, clave, valor):
+        """
+        Agrega un dato al registro (por ejemplo, el resumen de filas o los archivos exportados).
+        """
+        self.datos[clave] = valor
+
+    def guardar(self):
+        """
+        Escribe el registro JSON (y el perfil, si se pidió) y elimina los registros más antiguos.
+
+        :return: Ruta del registro JSON.
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        nombre = f"ejecucion_{datetime.datetime.now():%Y%m%d_%H%M%S_%f}_{self.datos['descripcion']}"
+        self.ruta = os.path.join(self.carpeta, nombre + ".json")
+
+        if self._perfil is not None:
+            import pstats
+
+            self._perfil.disable()
+            ruta_perfil = os.path.join(self.carpeta, nombre + ".prof")
+            self._perfil.dump_stats(ruta_perfil)
+            texto = io.StringIO()
+            pstats.Stats(self._perfil, stream=texto).sort_stats("cumulative").print_stats(LINEAS_PERFIL)
+            self.datos["perfil"] = {"archivo": ruta_perfil, "resumen": texto.getvalue().splitlines()}
+            self._perfil = None
+        if tracemalloc.is_tracing():
+            instantanea = tracemalloc.take_snapshot()
+            self.datos["memoria_asignada"] = [str(linea) for linea in instantanea.statistics("lineno")[:LINEAS_PERFIL]]
+            tracemalloc.stop()
+
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            json.dump(self.datos, archivo, ensure_ascii=False, indent=2, default=str)
+        _eliminar_antiguos(self.carpeta)
+        return self.ruta
+
+
+def _eliminar_antiguos(carpeta, conservar=MAX_REGISTROS):
+    registros = sorted(nombre for nombre in os.listdir(carpeta) if nombre.startswith("ejecucion_"))
+    registros_json = [nombre for nombre in registros if nombre.endswith(".json")]
+    for nombre in registros_json[:-conservar]:
+        base = os.path.splitext(nombre)[0]
+        for extension in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(carpeta, base + extension))
+            except OSError:
+                pass
+
+
+def medir_etapa(ejecucion, nombre, filas_entrada=None):
+    """
+    Igual que ejecucion.etapa, pero no mide nada si no hay ejecución (ejecucion es None).
+    """
+    if ejecucion is None:
+        return nullcontext(MedidaEtapa(filas_entrada))
+    return ejecucion.etapa(nombre, filas_entrada)
+
+
+def medir_bloques(ejecucion, nombre, bloques):
+    """
+    Devuelve los mismos bloques midiendo como etapa el tiempo de obtener cada uno
+    (por ejemplo, el tiempo de lectura del archivo).
+    """
+    bloques = iter(bloques)
+    while True:
+        with medir_etapa(ejecucion, nombre) as medida:
+            bloque = next(bloques, None)
+            medida.filas_salida = 0 if bloque is None else len(bloque)
+        if bloque is None:
+            return
+        yield bloque
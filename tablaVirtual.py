@@ -0,0 +1,126 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Alto aproximado de una fila del Treeview (en píxeles) si el tema no lo define
+ALTO_FILA = 20
+
+
+class TablaVirtual(tk.Frame):
+    """
+    Tabla para mostrar DataFrames grandes. El Treeview solo tiene tantos elementos
+    como filas caben en pantalla; al desplazarse se reutilizan esos elementos
+    y se rellenan con la porción visible del DataFrame.
+    """
+
+    def __init__(self, master, formato=None, **kwargs):
+        """
+        :param formato: Función opcional que convierte la porción visible antes de mostrarla
+                        (por ejemplo, los tipos compactos de los leads a texto).
+        """
+        super().__init__(master, **kwargs)
+        self.df = None
+        self.formato = formato
+        self.inicio = 0           # Primera fila del DataFrame que se muestra
+        self.filas_visibles = 0   # Elementos creados en el Treeview
+
+        self.total_lbl = tk.Label(self, text="", anchor="w")
+        self.total_lbl.pack(side="top", fill="x", padx=5)
+
+        self.scrollbar_x = ttk.Scrollbar(self, orient="horizontal")
+        self.scrollbar_x.pack(side="bottom", fill="x")
+        self.scrollbar_y = ttk.Scrollbar(self, orient="vertical", command=self._desplazar)
+        self.scrollbar_y.pack(side="right", fill="y")
+
+        self.tree = ttk.Treeview(self, show="headings")
+        self.tree.pack(expand=True, fill="both")
+        self.tree.configure(xscrollcommand=self.scrollbar_x.set)
+        self.scrollbar_x.configure(command=self.tree.xview)
+
+        self.alto_fila = int(ttk.Style().lookup("Treeview", "rowheight") or ALTO_FILA)
+
+        self.tree.bind("<Configure>", self._al_redimensionar)
+        self.tree.bind("<MouseWheel>", self._rueda)   # Windows y macOS
+        self.tree.bind("<Button-4>", self._rueda)     # Linux, hacia arriba
+        self.tree.bind("<Button-5>", self._rueda)     # Linux, hacia abajo
+
+    def mostrar(self, df):
+        """
+        Muestra un DataFrame en la tabla, sin crear un elemento por cada fila.
+
+        :param df: DataFrame a mostrar.
+        """
+        self.df = df
+        self.inicio = 0
+
+        self.tree["columns"] = [str(col) for col in df.columns]
+        for col in self.tree["columns"]:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor="center")
+
+        self.total_lbl.config(text=f"Total de filas: {len(df):,}")
+        self._crear_elementos()
+        self._refrescar()
+
+    def _filas_que_caben(self, alto):
+        # Se descuenta la fila de encabezados
+        return max(alto // self.alto_fila - 1, 1)
+
+    def _crear_elementos(self):
+        """
+        Crea un elemento del Treeview por cada fila que cabe en pantalla.
+        """
+        self.tree.delete(*self.tree.get_children())
+        self.filas_visibles = self._filas_que_caben(self.tree.winfo_height())
+        for _ in range(self.filas_visibles):
+            self.tree.insert("", "end", values=())
+
+    def _refrescar(self):
+        """
+        Rellena los elementos del Treeview con la porción visible del DataFrame.
+        """
+        if self.df is None:
+            return
+
+        total = len(self.df)
+        self.inicio = max(min(self.inicio, total - self.filas_visibles), 0)
+        fin = min(self.inicio + self.filas_visibles, total)
+
+        visibles = self.df.iloc[self.inicio:fin]
+        if self.formato is not None:
+            visibles = self.formato(visibles)
+        filas = visibles.itertuples(index=False, name=None)
+        for elemento, fila in zip(self.tree.get_children(), filas):
+            self.tree.item(elemento, values=fila)
+        for elemento in self.tree.get_children()[fin - self.inicio:]:
+            self.tree.item(elemento, values=())
+
+        if total:
+            self.scrollbar_y.set(self.inicio / total, fin / total)
+        else:
+            self.scrollbar_y.set(0, 1)
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """
+        Responde a la barra de desplazamiento vertical ('moveto' o 'scroll').
+        """
+        if self.df is None:
+            return
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * len(self.df))
+        elif accion == "scroll":
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self.inicio += int(cantidad) * paso
+        self._refrescar()
+
+    def _rueda(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._desplazar("scroll", -3, "units")
+        else:
+            self._desplazar("scroll", 3, "units")
+        return "break"
+
+    def _al_redimensionar(self, event):
+        # Volver a crear los elementos solo si cambió el número de filas que caben
+        if self._filas_que_caben(event.height) != self.filas_visibles:
+            self._crear_elementos()
+            self._refrescar()
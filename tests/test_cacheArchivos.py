@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+import cacheArchivos
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    ruta = tmp_path / "leads.xlsx"
+    ruta.write_bytes(b"x" * (3 * cacheArchivos.TAMANO_MUESTRA_HASH))
+    return str(ruta)
+
+
+def _bloques():
+    yield pd.DataFrame([["Ana", 2015550123], ["Luis", None]], dtype=object)
+    yield pd.DataFrame([["Eva", 3125550199]], dtype=object)
+
+
+def test_clave_cache_cambia_con_el_archivo_y_la_hoja(archivo):
+    clave = cacheArchivos.clave_cache(archivo)
+    assert cacheArchivos.clave_cache(archivo) == clave
+    assert cacheArchivos.clave_cache(archivo, "Hoja2") != clave
+
+    estado = os.stat(archivo)
+    with open(archivo, "r+b") as manejador:
+        manejador.seek(-1, os.SEEK_END)
+        manejador.write(b"y")
+    # Mismo tamaño y misma fecha de modificación: el cambio se detecta por el hash del final del archivo
+    os.utime(archivo, ns=(estado.st_atime_ns, estado.st_mtime_ns))
+    assert cacheArchivos.clave_cache(archivo) != clave
+
+
+def test_guardar_y_leer_de_cache(tmp_path):
+    carpeta = str(tmp_path / "cache")
+    guardados = list(cacheArchivos.guardar_en_cache("clave", _bloques(), carpeta=carpeta))
+    assert [len(bloque) for bloque in guardados] == [2, 1]
+    assert guardados[0].iloc[0].tolist() == ["Ana", "2015550123"]
+    assert pd.isna(guardados[0].iloc[1, 1])
+
+    ruta = cacheArchivos.buscar_en_cache("clave", carpeta)
+    progreso = {}
+    leidos = list(cacheArchivos.leer_de_cache(ruta, 2, saltar_filas=1, usecols=[1], progreso=progreso))
+    assert progreso["filas_totales"] == 3
+    assert pd.concat(leidos)[0].fillna("").tolist() == ["", "3125550199"]
+
+
+def test_lectura_interrumpida_no_queda_en_cache(tmp_path):
+    carpeta = str(tmp_path / "cache")
+    bloques = cacheArchivos.guardar_en_cache("clave", _bloques(), carpeta=carpeta)
+    next(bloques)
+    bloques.close()
+    assert cacheArchivos.buscar_en_cache("clave", carpeta) is None
+    assert os.listdir(carpeta) == []
+
+
+def test_filas_de_distinto_ancho_no_quedan_en_cache(tmp_path):
+    carpeta = str(tmp_path / "cache")
+    bloques = [pd.DataFrame([["a", "b"]], dtype=object), pd.DataFrame([["c"]], dtype=object)]
+    assert len(list(cacheArchivos.guardar_en_cache("clave", iter(bloques), carpeta=carpeta))) == 2
+    assert cacheArchivos.buscar_en_cache("clave", carpeta) is None
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from codigosArea import enriquecer_leads, estados, numeros_validos, zonas_horarias
+
+
+@pytest.mark.parametrize("numero, valido", [
+    (2128675309, True),
+    (4158675309, True),
+    (2122345678, True),
+    (2120345678, False),   # Central que empieza con 0
+    (2121345678, False),   # Central que empieza con 1
+    (2124115678, False),   # Central N11
+    (2129115678, False),
+    (2125550100, False),   # 555-0100 a 555-0199: ficticios
+    (2125550199, False),
+    (2125550200, True),
+    (2125550099, True),
+    (1118675309, False),   # Código de área inexistente
+    (9998675309, False),
+])
+def test_numeros_validos(numero, valido):
+    assert numeros_validos(np.array([numero], dtype=np.int64)).tolist() == [valido]
+
+
+def test_estados_y_zonas_horarias():
+    telefonos = pd.Series([2128675309, 4158675309, 4168675309, 8008675309, None], dtype="Int64", index=[5, 6, 7, 8, 9])
+    assert estados(telefonos).tolist()[:3] == ["NY", "CA", "ON"]
+    assert zonas_horarias(telefonos).tolist()[:3] == ["America/New_York", "America/Los_Angeles", "America/Toronto"]
+    # Números gratuitos (no geográficos) y faltantes quedan nulos
+    assert estados(telefonos).isna().tolist() == [False, False, False, True, True]
+    assert zonas_horarias(telefonos).index.equals(telefonos.index)
+
+
+def test_enriquecer_sin_telefonos():
+    df = pd.DataFrame({"name": ["Ana"], "phone": pd.Categorical(["No hay registro"])})
+    resultado = enriquecer_leads(df)
+    assert resultado["state"].isna().all()
+    assert resultado["timezone"].isna().all()
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from deduplicar import Deduplicador, IndiceLeads
+
+
+def _bloque(telefonos, emails):
+    return pd.DataFrame({"phone": pd.array(telefonos, dtype="Int64"), "email": pd.array(emails, dtype="str")})
+
+
+def test_filtrar_dentro_del_bloque_y_entre_bloques():
+    deduplicador = Deduplicador()
+    primero = deduplicador.filtrar(_bloque(
+        [2128675309, 2128675309, 3128675309, None, None],
+        ["a@gmail.com", "b@gmail.com", " A@Gmail.com ", None, None],
+    ))
+    # Se repiten el teléfono (fila 1) y el email sin espacios ni mayúsculas (fila 2); las vacías no
+    assert primero.index.tolist() == [0, 3, 4]
+
+    segundo = deduplicador.filtrar(_bloque([4158675309, 2128675309], ["c@gmail.com", "d@gmail.com"]))
+    assert segundo.index.tolist() == [0]
+
+
+def test_los_marcadores_no_son_duplicados():
+    df = pd.DataFrame({"phone": ["No hay registro", "No hay registro"], "email": ["No hay email", ""]})
+    assert len(Deduplicador().filtrar(df)) == 2
+
+
+def test_historial_entre_ejecuciones(tmp_path):
+    ruta = str(tmp_path / "historial.sqlite")
+    indice = IndiceLeads(ruta)
+    deduplicador = Deduplicador(indice)
+    deduplicador.filtrar(_bloque([2128675309], ["a@gmail.com"]))
+    deduplicador.guardar()
+    indice.cerrar()
+
+    indice = IndiceLeads(ruta)
+    try:
+        resultado = Deduplicador(indice).filtrar(_bloque([2128675309, 4158675309, 3128675309], [None, "a@gmail.com", None]))
+        assert resultado.index.tolist() == [2]
+    finally:
+        indice.cerrar()
+
+
+def test_solo_se_recuerdan_los_leads_conservados(tmp_path):
+    ruta = str(tmp_path / "historial.sqlite")
+    indice = IndiceLeads(ruta)
+    deduplicador = Deduplicador(indice)
+    # El segundo lead repite el teléfono: se descarta y su email no queda en el historial
+    primero = deduplicador.filtrar(_bloque([2128675309, 2128675309], ["a@gmail.com", "b@gmail.com"]))
+    assert primero.index.tolist() == [0]
+    deduplicador.guardar()
+    indice.cerrar()
+
+    indice = IndiceLeads(ruta)
+    try:
+        resultado = Deduplicador(indice).filtrar(_bloque([3128675309, 2128675309], ["b@gmail.com", "c@gmail.com"]))
+        assert resultado.index.tolist() == [0]
+    finally:
+        indice.cerrar()
+
+
+def test_repetidos_de_un_lead_descartado_en_el_mismo_bloque():
+    # La fila 1 se descarta por el teléfono de la fila 0, así que su email no descarta a la fila 2
+    bloque = _bloque(
+        [2128675309, 2128675309, 3128675309, 4158675309], ["a@gmail.com", "b@gmail.com", "b@gmail.com", "a@gmail.com"]
+    )
+    assert Deduplicador().filtrar(bloque).index.tolist() == [0, 2]
@@ -0,0 +1,161 @@
+import functools
+import os
+import time
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import encabezados
+
+
+def _escribir_xlsx(ruta, filas):
+    """
+    Escribe un .xlsx en modo write_only, como los exportados por otros programas: sin registro
+    <dimension>, que es el caso en que load_workbook(read_only=True) recorre toda la hoja al abrirla.
+    """
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Leads")
+    hoja.append(["First Name", "Last Name", "Phone", "Email"])
+    for i in range(filas):
+        hoja.append([f"Nombre{i}", f"Apellido{i}", f"(201) 555-{i % 10000:04d}", f"lead{i}@gmail.com"])
+    libro.save(ruta)
+    return str(ruta)
+
+
+def _tiempo_vista_previa(archivo, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        encabezados.obtener_vista_previa(archivo)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+@pytest.fixture(scope="module")
+def archivos(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp("vista_previa")
+    return _escribir_xlsx(carpeta / "chico.xlsx", 100), _escribir_xlsx(carpeta / "grande.xlsx", 50_000)
+
+
+def test_vista_previa_no_depende_del_tamano(archivos):
+    chico, grande = archivos
+    tiempo_chico = _tiempo_vista_previa(chico)
+    tiempo_grande = _tiempo_vista_previa(grande)
+    # Recorrer la hoja grande completa tarda más de un segundo; leer solo las primeras filas, milisegundos
+    assert tiempo_grande < max(5 * tiempo_chico, 0.25), (tiempo_chico, tiempo_grande)
+
+
+def test_vista_previa_igual_a_lectura_completa(archivos):
+    _, grande = archivos
+    primeras = encabezados.leer_filas_iniciales(grande, 6)
+    bloque = next(encabezados._leer_bloques_excel(grande, 6))
+    assert primeras.equals(bloque)
+
+    detectados, vista_previa = encabezados.obtener_vista_previa(grande)
+    assert detectados
+    assert list(vista_previa.columns) == ["First Name", "Last Name", "Phone", "Email"]
+    assert len(vista_previa) == encabezados.FILAS_VISTA_PREVIA
+
+
+def test_vista_previa_no_usa_la_cache(archivos, monkeypatch):
+    def sin_cache(*args, **kwargs):
+        raise AssertionError("La vista previa no debe buscar ni guardar en la caché")
+
+    monkeypatch.setattr(encabezados, "clave_cache", sin_cache)
+    monkeypatch.setattr(encabezados, "guardar_en_cache", sin_cache)
+    chico, _ = archivos
+    assert encabezados.leer_filas_iniciales(chico, 3).shape == (3, 4)
+
+
+def test_filas_y_celdas_vacias(tmp_path):
+    libro = Workbook()
+    hoja = libro.active
+    hoja.title = "Datos"
+    hoja["A1"] = "x"
+    hoja["C1"] = "z"
+    hoja["B3"] = 5
+    otra = libro.create_sheet("Otra")
+    otra.append(["n", "m"])
+    archivo = str(tmp_path / "huecos.xlsx")
+    libro.save(archivo)
+
+    assert encabezados.listar_hojas(archivo) == ["Datos", "Otra"]
+    filas = encabezados.leer_filas_iniciales(archivo, 5)
+    assert filas.values.tolist() == [["x", None, "z"], [None, None, None], [None, 5, None]]
+    assert encabezados.leer_filas_iniciales(archivo, 5, hoja="Otra").values.tolist() == [["n", "m"]]
+
+
+@pytest.fixture
+def hoja_con_huecos(tmp_path):
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Leads")
+    hoja.append(["First Name", "Last Name", "Phone", "Email"])
+    for i in range(23):
+        # Algunas celdas vacías en el medio de la fila, para comparar cómo las devuelve cada motor
+        hoja.append([f"Nombre{i}", None if i % 5 == 0 else f"Apellido{i}", f"(201) 555-{i:04d}", f"lead{i}@gmail.com"])
+    archivo = str(tmp_path / "huecos.xlsx")
+    libro.save(archivo)
+    return archivo
+
+
+def _valores(bloques):
+    """
+    Filas de todos los bloques como listas, con las celdas vacías como None (cada motor las
+    devuelve como None o NaN) y el tamaño de cada bloque.
+    """
+    bloques = list(bloques)
+    filas = [
+        [None if pd.isna(valor) else valor for valor in fila]
+        for bloque in bloques for fila in bloque.astype(object).values.tolist()
+    ]
+    return [len(bloque) for bloque in bloques], filas
+
+
+@pytest.mark.parametrize("usecols", [None, [0, 2]])
+def test_los_motores_y_la_cache_devuelven_los_mismos_bloques(hoja_con_huecos, tmp_path, monkeypatch, usecols):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("python_calamine")
+    carpeta = str(tmp_path / "cache")
+    monkeypatch.setattr(encabezados, "buscar_en_cache", functools.partial(encabezados.buscar_en_cache, carpeta=carpeta))
+    monkeypatch.setattr(encabezados, "guardar_en_cache", functools.partial(encabezados.guardar_en_cache, carpeta=carpeta))
+
+    def leer(motor, cache=False):
+        return _valores(encabezados.iterar_bloques_excel(
+            hoja_con_huecos, 10, saltar_filas=1, usecols=usecols, motor=motor, cache=cache
+        ))
+
+    openpyxl = leer("openpyxl")
+    assert openpyxl[0] == [10, 10, 3]
+    assert openpyxl[1][0][:2] == ["Nombre0", None] if usecols is None else openpyxl[1][0] == ["Nombre0", "(201) 555-0000"]
+    assert leer("calamine") == openpyxl
+    # La primera lectura guarda la hoja en la caché y la segunda la lee desde ahí
+    assert leer("openpyxl", cache=True) == openpyxl
+    assert os.listdir(carpeta)
+    assert leer("calamine", cache=True) == openpyxl
+
+
+@pytest.mark.parametrize("motor", ["openpyxl", "calamine"])
+def test_usecols_lee_solo_las_columnas_pedidas(hoja_con_huecos, motor):
+    if motor == "calamine":
+        pytest.importorskip("python_calamine")
+    completos = _valores(encabezados._leer_bloques_excel(hoja_con_huecos, 10, saltar_filas=1, motor=motor))[1]
+    bloques = list(encabezados._leer_bloques_excel(hoja_con_huecos, 10, saltar_filas=1, usecols=[1, 3], motor=motor))
+    assert all(bloque.shape[1] == 2 for bloque in bloques)
+    assert _valores(bloques)[1] == [[fila[1], fila[3]] for fila in completos]
+
+
+@pytest.mark.parametrize("falla", [ImportError("sin ExcelReader"), AttributeError("sin read_manifest")])
+def test_sin_el_lector_interno_de_openpyxl_usa_load_workbook(archivos, monkeypatch, falla):
+    chico, _ = archivos
+    esperadas = encabezados.leer_filas_iniciales(chico, 6)
+
+    def sin_lector(archivo):
+        raise falla
+
+    monkeypatch.setattr(encabezados, "_abrir_libro_xlsx", sin_lector)
+    assert encabezados.listar_hojas(chico) == ["Leads"]
+    assert encabezados.leer_filas_iniciales(chico, 6).equals(esperadas)
+    detectados, vista_previa = encabezados.obtener_vista_previa(chico)
+    assert detectados
+    assert list(vista_previa.columns) == ["First Name", "Last Name", "Phone", "Email"]
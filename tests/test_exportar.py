@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+import exportar
+from exportar import exportar_bloques
+
+
+def _bloques(filas, tamano):
+    for inicio in range(0, filas, tamano):
+        numeros = range(inicio, min(inicio + tamano, filas))
+        yield pd.DataFrame({
+            "name": [f"Lead {i}" for i in numeros],
+            "phone": pd.array([2128670000 + i for i in numeros], dtype="Int64"),
+            "email": pd.array([None if i % 3 == 0 else f"lead{i}@gmail.com" for i in numeros], dtype="str"),
+        })
+
+
+def test_csv_en_un_archivo(tmp_path):
+    ruta = str(tmp_path / "leads.csv")
+    archivos, total = exportar_bloques(_bloques(25, 10), ruta)
+    assert (archivos, total) == ([ruta], 25)
+    df = pd.read_csv(ruta, dtype=str)
+    assert df["phone"].tolist()[:2] == ["2128670000", "2128670001"]
+    assert df["email"].tolist()[:2] == ["No hay email", "lead1@gmail.com"]
+
+
+def test_dividir_por_filas_por_archivo(tmp_path):
+    archivos, total = exportar_bloques(_bloques(25, 7), str(tmp_path / "leads.csv"), filas_por_archivo=10)
+    assert total == 25
+    assert [ruta.rsplit("_", 1)[1] for ruta in archivos] == ["001.csv", "002.csv", "003.csv"]
+    assert [len(pd.read_csv(ruta)) for ruta in archivos] == [10, 10, 5]
+    unidos = pd.concat([pd.read_csv(ruta, dtype=str) for ruta in archivos], ignore_index=True)
+    assert unidos["name"].tolist() == [f"Lead {i}" for i in range(25)]
+
+
+def test_xlsx_respeta_el_limite_de_filas_de_la_hoja(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")
+    monkeypatch.setattr(exportar, "MAX_FILAS_EXCEL", 8)
+    archivos, total = exportar_bloques(_bloques(20, 6), str(tmp_path / "leads.xlsx"), filas_por_archivo=100)
+    assert total == 20
+    hojas = [pd.read_excel(ruta, dtype=str) for ruta in archivos]
+    assert [len(hoja) for hoja in hojas] == [8, 8, 4]
+    assert list(hojas[0].columns) == ["name", "phone", "email"]
+    assert hojas[0]["email"].tolist()[:2] == ["No hay email", "lead1@gmail.com"]
+    assert hojas[2]["name"].tolist()[-1] == "Lead 19"
+
+
+def test_parquet_con_columna_vacia_en_el_primer_bloque(tmp_path):
+    pytest.importorskip("pyarrow")
+    primero = pd.DataFrame({"name": ["Ana"], "ciudad": [None], "state": pd.Categorical(["NY"])})
+    segundo = pd.DataFrame({
+        "name": ["Luis", "Eva"], "ciudad": ["Chicago", None], "state": pd.Categorical(["IL", "CA"])
+    })
+    ruta = str(tmp_path / "leads.parquet")
+    archivos, total = exportar_bloques(iter([primero.iloc[:0], primero, segundo]), ruta, como_texto=False)
+    assert (archivos, total) == ([ruta], 3)
+    df = pd.read_parquet(ruta)
+    assert df["ciudad"].tolist()[1] == "Chicago"
+    assert df["state"].astype(str).tolist() == ["NY", "IL", "CA"]
+
+
+def test_parquet_solo_con_bloques_vacios_escribe_el_esquema(tmp_path):
+    pytest.importorskip("pyarrow")
+    ruta = str(tmp_path / "leads.parquet")
+    archivos, total = exportar_bloques(_bloques(0, 10), ruta)
+    assert (archivos, total) == ([], 0)
+    archivos, total = exportar_bloques(iter([next(_bloques(1, 1)).iloc[:0]]), ruta)
+    assert (archivos, total) == ([ruta], 0)
+    assert list(pd.read_parquet(ruta).columns) == ["name", "phone", "email"]
+
+
+def test_formato_no_soportado(tmp_path):
+    with pytest.raises(ValueError):
+        exportar_bloques(_bloques(1, 1), str(tmp_path / "leads.txt"))
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from lotes import procesar_lote
+
+
+@pytest.fixture
+def archivos(tmp_path):
+    primero = tmp_path / "a.csv"
+    pd.DataFrame({
+        "nombre": ["Ana Ruiz", "Bo Li"],
+        "telefono": ["(212) 234-5678", "(212) 234-5679"],
+        "correo": ["a@gmail.com", "b@gmail.com"],
+        "ciudad": ["NYC", "Albany"],
+    }).to_csv(primero, index=False)
+    segundo = tmp_path / "b.csv"
+    pd.DataFrame({
+        "nombre": ["Cy Dee"],
+        "telefono": ["(312) 234-6678"],
+        "correo": ["c@gmail.com"],
+        "fuente": ["f1"],
+        "estado": ["s"],
+    }).to_csv(segundo, index=False)
+    return [str(primero), str(segundo)]
+
+
+MAPEO = {"nombre": ["nombre"], "telefono": "auto", "email": "auto"}
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet"])
+def test_archivos_con_columnas_distintas(archivos, tmp_path, extension):
+    if extension == ".parquet":
+        pytest.importorskip("pyarrow")
+    salida = str(tmp_path / f"leads{extension}")
+    resumenes, salidas = procesar_lote(archivos, MAPEO, salida, procesos=1)
+    assert [resumen["estado"] for resumen in resumenes] == ["ok", "ok"]
+    assert salidas == [salida]
+
+    df = pd.read_csv(salida, dtype=str) if extension == ".csv" else pd.read_parquet(salida)
+    assert list(df.columns) == ["name", "phone", "email", "ciudad", "fuente", "estado"]
+    fila = df.iloc[2]
+    assert [fila["name"], str(fila["phone"]), fila["email"]] == ["Cy Dee", "3122346678", "c@gmail.com"]
+    assert [fila["fuente"], fila["estado"]] == ["f1", "s"]
+    assert pd.isna(fila["ciudad"])
+    assert df["ciudad"].tolist()[:2] == ["NYC", "Albany"]
+    assert df[["fuente", "estado"]].iloc[:2].isna().all().all()
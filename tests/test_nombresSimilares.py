@@ -0,0 +1,44 @@
+import pandas as pd
+
+from nombresSimilares import claves_foneticas, marcar_similares, normalizar_nombres, similitud
+
+
+def test_normalizar_nombres():
+    assert normalizar_nombres(["Smith, JOHN", "José  Pérez-Núñez", None, "  "]) == [
+        "john smith", "jose nunez perez", "", ""
+    ]
+
+
+def test_claves_foneticas():
+    claves = claves_foneticas(normalizar_nombres(["John Smith", "Jon Smyth", "Mary Smith", ""]))
+    assert claves[0] == claves[1]
+    assert claves[0] != claves[2]
+    assert claves[3] == 0
+
+
+def test_similitud():
+    assert similitud("john smith", "john smith") == 1
+    assert similitud("john smith", "jon smith") >= 0.75
+    assert similitud("john smith", "mary jones") < 0.3
+
+
+def test_marcar_similares_agrupa_nombres_parecidos():
+    df = pd.DataFrame({
+        "name": ["JOHN SMITH", "Maria Lopez", "Smith John", "Jon Smith", "María López", "Peter Parker", None, ""],
+        "phone": [2128675309, 3128675309, 2124567890, 2129876543, 3122345678, 4158675309, 2128675310, 2128675311],
+        "email": ["a@gmail.com", "b@yahoo.com", "c@gmail.com", None, "d@yahoo.com", "e@gmail.com", None, None],
+    })
+    df["phone"] = df["phone"].astype("Int64")
+    grupos = marcar_similares(df)
+    assert grupos.dtype == "Int64"
+    assert grupos.index.equals(df.index)
+    assert grupos[0] == grupos[2] == grupos[3]
+    assert grupos[1] == grupos[4]
+    assert grupos[0] != grupos[1]
+    assert grupos[[5, 6, 7]].isna().all()
+
+
+def test_marcar_similares_sin_pares():
+    df = pd.DataFrame({"name": ["Ana Ruiz", "Peter Parker"]})
+    assert marcar_similares(df).isna().all()
+    assert marcar_similares(df.iloc[:0]).empty
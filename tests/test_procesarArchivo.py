@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+import procesarArchivo
+from deduplicar import Deduplicador
+from procesarArchivo import leer_bloques, leer_temporal, pasos_desde_mapeo, procesar_archivo, procesar_en_bloques, releer_resultado
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    filas = 2500
+    df = pd.DataFrame({
+        "nombre": [f"Lead {i % 2000}" for i in range(filas)],
+        "telefono": [f"(212) 555-{1000 + i % 2000}" for i in range(filas)],
+        "correo": [f"lead{i % 2000}@gmail.com" for i in range(filas)],
+    })
+    ruta = tmp_path / "leads.csv"
+    df.to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def _argumentos(archivo):
+    columnas = ["nombre", "telefono", "correo"]
+    vista_previa = pd.read_csv(archivo, dtype=str, nrows=100)
+    pasos = pasos_desde_mapeo({"nombre": ["nombre"], "telefono": "auto", "email": "auto"}, vista_previa)
+    return archivo, True, columnas, pasos
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet"])
+def test_procesar_archivo_escribe_la_salida_y_conserva_las_primeras_filas(archivo, tmp_path, extension):
+    if extension == ".parquet":
+        pytest.importorskip("pyarrow")
+    salida = str(tmp_path / f"resultado{extension}")
+    primeras, resumen = procesar_archivo(
+        *_argumentos(archivo), tamano_bloque=300, deduplicador=Deduplicador(), salida=salida, filas_resultado=700
+    )
+    completo = pd.concat(list(procesar_en_bloques(
+        *_argumentos(archivo), tamano_bloque=300, deduplicador=Deduplicador()
+    )), ignore_index=True)
+
+    assert resumen["filas_leidas"] == 2500
+    assert resumen["filas_resultantes"] == len(completo) == 2000
+    pd.testing.assert_frame_equal(primeras, completo.head(700))
+
+    escrito = pd.concat(list(leer_temporal(salida, tamano_bloque=500)), ignore_index=True)
+    assert len(escrito) == 2000
+    assert escrito["name"].tolist() == completo["name"].astype(str).tolist()
+
+
+def test_procesar_archivo_sin_salida(archivo):
+    primeras, resumen = procesar_archivo(*_argumentos(archivo), tamano_bloque=300, filas_resultado=10)
+    assert len(primeras) == 10
+    assert resumen["filas_resultantes"] == 2500
+
+
+def test_leer_temporal_solo_las_columnas_pedidas(archivo, tmp_path):
+    salida = str(tmp_path / "resultado.csv")
+    procesar_archivo(*_argumentos(archivo), tamano_bloque=300, salida=salida)
+    leidos = pd.concat(list(leer_temporal(salida, columnas=("name", "email", "no_existe"))), ignore_index=True)
+    assert list(leidos.columns) == ["name", "email"]
+    assert len(leidos) == 2500
+
+
+def test_releer_resultado_omite_el_historial(archivo, tmp_path):
+    salida = str(tmp_path / "resultado.csv")
+    _, resumen = procesar_archivo(*_argumentos(archivo), tamano_bloque=300, deduplicador=Deduplicador(), salida=salida)
+    bloques = list(releer_resultado(salida, dict(resumen), tamano_bloque=500))
+    assert sum(len(bloque) for bloque in bloques) == 2000
+
+    historial = Deduplicador()
+    historial.filtrar(pd.concat(bloques, ignore_index=True).iloc[:150])
+    avances = []
+    copia = dict(resumen)
+    releidos = pd.concat(list(releer_resultado(
+        salida, copia, tamano_bloque=500, deduplicador=historial, progreso=avances.append
+    )), ignore_index=True)
+    assert len(releidos) == 1850
+    assert (copia["filas_resultantes"], copia["filas_duplicadas"]) == (1850, resumen["filas_duplicadas"] + 150)
+    assert len(avances) == 4 and avances[-1]["bytes_leidos"] == avances[-1]["bytes_totales"]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".xlsx"])
+def test_leer_bloques_solo_lee_las_columnas_usadas(archivo, tmp_path, monkeypatch, extension):
+    pedidas = []
+    if extension == ".csv":
+        read_csv = pd.read_csv
+
+        def espiar(*args, **kwargs):
+            pedidas.append(kwargs["usecols"])
+            return read_csv(*args, **kwargs)
+
+        monkeypatch.setattr(procesarArchivo.pd, "read_csv", espiar)
+    else:
+        ruta = str(tmp_path / "leads.xlsx")
+        pd.read_csv(archivo, dtype=str).head(700).to_excel(ruta, index=False)
+        archivo = ruta
+        iterar_bloques_excel = procesarArchivo.iterar_bloques_excel
+
+        def espiar(archivo, tamano_bloque, saltar_filas, progreso, hoja, usecols, motor):
+            pedidas.append(usecols)
+            return iterar_bloques_excel(archivo, tamano_bloque, saltar_filas, progreso, hoja, usecols, motor, cache=False)
+
+        monkeypatch.setattr(procesarArchivo, "iterar_bloques_excel", espiar)
+
+    columnas = ["nombre", "telefono", "correo"]
+    bloques = list(leer_bloques(archivo, True, columnas, tamano_bloque=300, usar=["correo", "nombre"]))
+    assert pedidas == [[0, 2]]
+    assert all(list(bloque.columns) == ["nombre", "correo"] for bloque in bloques)
+    leidos = pd.concat(bloques, ignore_index=True)
+    assert leidos["correo"].tolist()[:3] == ["lead0@gmail.com", "lead1@gmail.com", "lead2@gmail.com"]
+
+    # Sin 'usar' se leen todas las columnas
+    pedidas.clear()
+    assert list(next(leer_bloques(archivo, True, columnas, tamano_bloque=300)).columns) == columnas
+    assert pedidas == [None]
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from procesarArchivo import aplicar_pasos
+from receta import PlanPasos, cargar_receta, guardar_receta
+
+
+def _sin_encabezados():
+    # Archivo sin encabezados (columnas 0, 1, ...) con filas de distinto largo y celdas NaN
+    filas = [
+        ["Ana", "Pérez", "(212) 867-5309", "ANA@GMIAL.COM", "NY"],
+        ["Luis", np.nan, "1-312-867-5309", "", "IL"],
+        [np.nan, "Soto", "2128675310", "soto@yahoo,com"],
+        ["Eva", "Ruiz", None, "eva@gmail.com", "CA"],
+        ["Bob", "Lee", "911-555-1234"],
+        ["Zoe", "Kim", "+1 (415) 867 5309", "zoe@hotmail.con", "CA"],
+        ["Max"],
+    ]
+    return pd.DataFrame(filas, dtype=object)
+
+
+PASOS = [
+    [
+        {"accion": "concatenar", "columnas": [0, 1]},
+        {"accion": "telefonos", "columna": 2},
+        {"accion": "emails", "columna": 3},
+        {"accion": "enriquecer"},
+        {"accion": "ordenar"},
+    ],
+    [
+        {"accion": "seleccionar", "columnas": [0, 2, 3]},
+        {"accion": "usar_columna", "columna": 0},
+        {"accion": "telefonos", "columna": 2},
+        {"accion": "emails", "columna": None},
+        {"accion": "ordenar"},
+    ],
+    [
+        {"accion": "usar_columna", "columna": 1},
+        {"accion": "telefonos", "columna": None},
+        {"accion": "emails", "columna": 3},
+        {"accion": "ordenar"},
+    ],
+]
+
+
+@pytest.mark.parametrize("pasos", PASOS)
+def test_plan_igual_a_aplicar_pasos(pasos):
+    df = _sin_encabezados()
+    esperado = aplicar_pasos(df.copy(), pasos)
+    plan = PlanPasos(pasos, list(df.columns))
+    pd.testing.assert_frame_equal(plan.aplicar(df[plan.columnas_leidas]), esperado)
+
+
+def test_plan_descarta_telefonos_invalidos_y_cuenta_emails():
+    pasos = PASOS[0]
+    resumen = {}
+    resultado = PlanPasos(pasos, list(range(5))).aplicar(_sin_encabezados(), resumen=resumen)
+    assert resultado.index.tolist() == [0, 1, 2, 5]
+    assert resultado["email"].tolist()[0] == "ana@gmail.com"
+    assert pd.isna(resultado["email"].tolist()[1])
+    assert resultado["state"].tolist() == ["NY", "IL", "NY", "CA"]
+    # Corregidos: gmial.com, yahoo,com y hotmail.con; el email vacío no cuenta como rechazado
+    assert resumen == {"emails_corregidos": 3, "emails_rechazados": 0}
+
+
+def test_plan_lee_solo_las_columnas_usadas():
+    assert PlanPasos(PASOS[1], list(range(5))).columnas_leidas == [0, 2, 3]
+    assert PlanPasos(PASOS[2], list(range(5))).columnas_leidas == [0, 1, 2, 3, 4]
+
+
+def test_plan_rechaza_columnas_inexistentes_y_acciones_desconocidas():
+    with pytest.raises(ValueError):
+        PlanPasos([{"accion": "usar_columna", "columna": "Nombre"}], [0, 1])
+    with pytest.raises(ValueError):
+        PlanPasos([{"accion": "borrar"}], [0, 1])
+
+
+def test_guardar_y_cargar_receta(tmp_path):
+    ruta = str(tmp_path / "receta.json")
+    guardar_receta(ruta, PASOS[0], list(range(5)), hoja="Leads")
+    receta = cargar_receta(ruta)
+    assert receta["pasos"] == json.loads(json.dumps(PASOS[0]))
+    assert receta["hoja"] == "Leads"
+
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump({"version": 99, "pasos": []}, archivo)
+    with pytest.raises(ValueError):
+        cargar_receta(ruta)
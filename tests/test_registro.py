@@ -0,0 +1,45 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+import registro
+from trabajos import ProcesoCancelado
+
+MB = 1024 ** 2
+
+pytestmark = pytest.mark.skipif(registro.memoria_actual() is None, reason="No se puede medir la memoria")
+
+
+def test_memoria_pico_por_etapa(tmp_path):
+    with registro.Ejecucion("prueba", carpeta=str(tmp_path)) as ejecucion:
+        with ejecucion.etapa("grande"):
+            datos = np.ones(200 * MB // 8)
+            time.sleep(0.05)
+            del datos
+        with ejecucion.etapa("chica", filas_entrada=10) as medida:
+            medida.filas_salida = 8
+
+    with open(ejecucion.ruta, encoding="utf-8") as archivo:
+        guardado = json.load(archivo)
+    grande, chica = guardado["etapas"]["grande"], guardado["etapas"]["chica"]
+    # La etapa chica no hereda el pico de la grande, que ya liberó su memoria
+    assert grande["memoria_aumento_mb"] > 150
+    assert chica["memoria_aumento_mb"] < 20
+    assert chica["memoria_pico_mb"] < grande["memoria_pico_mb"] - 150
+    assert chica["filas_descartadas"] == 2
+    assert guardado["memoria_pico_proceso_mb"] > 0
+    assert "memoria_pico_mb" not in guardado
+
+
+def test_estado_de_la_ejecucion(tmp_path):
+    class CanceladoEnLote(ProcesoCancelado):
+        pass
+
+    for excepcion, estado in [(ProcesoCancelado, "cancelado"), (CanceladoEnLote, "cancelado"), (ValueError, "error")]:
+        with pytest.raises(excepcion):
+            with registro.Ejecucion("prueba", carpeta=str(tmp_path), guardar=False) as ejecucion:
+                raise excepcion("x")
+        assert ejecucion.datos["estado"] == estado
+        assert ("error" in ejecucion.datos) == (estado == "error")
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import seleccionarCols
+from seleccionarCols import normalizar_telefonos
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def implementacion(request, monkeypatch):
+    """
+    Corre cada prueba con la implementación sobre los bytes de Arrow y con la de pandas (sin pyarrow).
+    """
+    if request.param == "pandas":
+        monkeypatch.setattr(seleccionarCols, "pa", None)
+    elif seleccionarCols.pa is None:
+        pytest.skip("pyarrow no está instalado")
+    return request.param
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("(201) 234-5678", 2012345678),
+    ("+1 (415) 234-5678", 4152345678),
+    ("1 201 234 5678", 2012345678),
+    (4152345678, 4152345678),
+    ("201 234 5678 ext", 2012345678),
+    ("22012345678", None),  # 11 dígitos sin el '1' inicial
+    ("2012345678901", None),
+    ("999-234-5678", None),  # código de área inexistente
+    ("201-155-1234", None),  # central que empieza con 1
+    ("201-911-1234", None),  # central N11
+    ("(201) 555-0123", None),  # número ficticio 555-01xx
+    ("(201) 555-0200", 2015550200),
+    ("", None),
+    ("abc", None),
+    (None, None),
+    (np.nan, None),
+])
+def test_normalizar_telefonos(implementacion, valor, esperado):
+    # El valor va entre otros para que las posiciones de los dígitos no empiecen en cero
+    serie = pd.Series(["(312) 234-5678", valor, "sin dato"], dtype=object, index=[10, 11, 12])
+    resultado = normalizar_telefonos(serie)
+    assert resultado.dtype == "Int64"
+    assert list(resultado.index) == [10, 11, 12]
+    assert resultado[10] == 3122345678
+    assert (pd.isna(resultado[11]) if esperado is None else resultado[11] == esperado)
+    assert pd.isna(resultado[12])
+
+
+def test_normalizar_telefonos_sin_numeros_validos(implementacion):
+    resultado = normalizar_telefonos(pd.Series(["123", None, ""], dtype=object))
+    assert resultado.isna().all()
+
+
+NOMBRES = ["Ana", "Luis", "María José", "John", "Mary", "O'Brien", "Jean-Luc", "Patricia", "Robert", "Linda",
+           "José", "Michael", "Jennifer", "David", "Susan", "Carlos", "Lucía", "Thomas", "Karen", "Daniel",
+           "Nancy", "Paul", "Sandra", "Mark", "Laura", "Steven", "Emily", "Kevin", "Sofía", "Brian"]
+
+
+def _leads(filas=200):
+    return pd.DataFrame({
+        "City": [["Houston", "Phoenix", "Dallas", "Miami", "Denver", "Austin", "Tampa", "Boise"][i % 8]
+                 for i in range(filas)],
+        "State": [["TX", "AZ", "Florida", "CO", "New York"][i % 5] for i in range(filas)],
+        "Source": [["facebook", "google", "referido"][i % 3] for i in range(filas)],
+        "Status": [["nuevo", "contactado"][i % 2] for i in range(filas)],
+        "Name": [f"{NOMBRES[i % len(NOMBRES)]} {NOMBRES[(i * 7) % len(NOMBRES)]}" for i in range(filas)],
+        "Phone": ["(201) 234-5678"] * filas,
+    })
+
+
+def test_nombres_con_ciudad_antes():
+    assert seleccionarCols.buscar_columna_nombres(_leads()) == "Name"
+
+
+def test_nombres_sin_encabezados():
+    df = _leads()
+    df.columns = [f"Column{i}" for i in range(1, df.shape[1] + 1)]
+    perfil = seleccionarCols.perfilar_columnas(df)
+    assert seleccionarCols.mejor_columna(perfil, "nombre") == "Column5"
+    # Ciudad, fuente y estatus tienen pocos valores distintos; el estado tiene códigos y nombres de estados
+    assert {columna for columna, _ in perfil["nombre"]} == {"Column5"}
+
+
+def test_nombres_prefiere_el_encabezado():
+    df = pd.DataFrame({
+        "Ciudad": [f"Ciudad {NOMBRES[i % len(NOMBRES)]} {NOMBRES[i // len(NOMBRES)]}" for i in range(200)],
+        "Nombre": [NOMBRES[i % len(NOMBRES)] for i in range(200)],
+    })
+    assert seleccionarCols.buscar_columna_nombres(df) == "Nombre"
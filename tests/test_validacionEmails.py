@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import validacionEmails
+from seleccionarCols import TIPO_TEXTO, normalizar_emails
+from validacionEmails import corregir_dominios, dominios_email, indice_correcciones, validar_emails
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def motor(request, monkeypatch):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(validacionEmails, "pa", None)
+    return request.param
+
+
+@pytest.mark.parametrize("email, esperado", [
+    ("  Ana@GMIAL.com ", "ana@gmail.com"),
+    ("luis@yahoo,com", "luis@yahoo.com"),
+    ("eva@hotmail.con", "eva@hotmail.com"),
+    ("bob@gmai.com", "bob@gmail.com"),
+    ("zoe@outlok.com", "zoe@outlook.com"),
+    ("maría.lópez@prodigy.net.mx", "maría.lópez@prodigy.net.mx"),
+    ("first.last+tag@empresa.com", "first.last+tag@empresa.com"),
+])
+def test_corrige_y_normaliza(motor, email, esperado):
+    emails, _, rechazados = validar_emails(pd.Series([email], dtype=TIPO_TEXTO))
+    assert emails.tolist() == [esperado]
+    assert rechazados == 0
+
+
+@pytest.mark.parametrize("email", [
+    "sin-arroba.com", "dos@@gmail.com", "a@b@gmail.com", "@gmail.com", "ana@", "ana@gmail",
+    "ana..b@gmail.com", ".ana@gmail.com", "ana@-empresa.com", "ana @gmail.com", "ana@empresa.c0m",
+])
+def test_rechaza_invalidos(motor, email):
+    emails, corregidos, rechazados = validar_emails(pd.Series([email], dtype=TIPO_TEXTO))
+    assert emails.isna().all()
+    assert (corregidos, rechazados) == (0, 1)
+
+
+def test_cuenta_corregidos_y_rechazados_sin_contar_vacios(motor):
+    serie = pd.Series(["ana@gmial.com", "", None, np.nan, "   ", "mal", "ok@gmail.com", "x@yahoo,com"], dtype=TIPO_TEXTO)
+    emails, corregidos, rechazados = validar_emails(serie)
+    assert emails.notna().tolist() == [True, False, False, False, False, False, True, True]
+    assert (corregidos, rechazados) == (2, 1)
+    assert emails.index.equals(serie.index)
+
+
+def test_normalizar_emails_suma_en_el_resumen():
+    resumen = {"emails_corregidos": 1, "emails_rechazados": 0}
+    emails = normalizar_emails(pd.Series(["A@GMIAL.COM", "no-es-email", 5], dtype=object), resumen=resumen)
+    assert emails.dtype == TIPO_TEXTO
+    assert emails.tolist()[0] == "a@gmail.com"
+    assert resumen == {"emails_corregidos": 2, "emails_rechazados": 2}
+
+
+def test_dominios_comunes_y_ambiguos_no_se_corrigen():
+    indice = indice_correcciones()
+    assert "gmail.com" not in indice and "ymail.com" not in indice
+    # ymail.com y gmail.com están a un error de tipeo entre sí, y ninguno se cambia por el otro
+    corregidos, cambiados, validos = corregir_dominios(["ymail.com", "gmail.com", "gmial.com", "empresa.com"])
+    assert corregidos == ["ymail.com", "gmail.com", "gmail.com", "empresa.com"]
+    assert cambiados.tolist() == [False, False, True, False]
+    assert validos.all()
+
+
+def test_dominios_email(motor):
+    dominios = dominios_email(pd.Series(["Ana@Gmail.com", None, "sin-arroba", "b@yahoo.com"], dtype=TIPO_TEXTO))
+    assert dominios.tolist()[0] == "gmail.com"
+    assert dominios.isna().tolist() == [False, True, True, False]
@@ -0,0 +1,65 @@
+import queue
+import threading
+
+
+class ProcesoCancelado(Exception):
+    """
+    Se lanza cuando el usuario cancela el procesamiento entre dos bloques.
+    """
+
+
+class Trabajo:
+    """
+    Ejecuta una función en un hilo de fondo para que la ventana siga respondiendo.
+    El hilo nunca toca la interfaz: envía su progreso y su resultado por una cola
+    que la ventana revisa periódicamente con root.after.
+
+    La función recibe el propio trabajo como primer argumento, para poder informar
+    el progreso (trabajo.informar) y revisar la cancelación (trabajo.cancelar).
+    """
+
+    def __init__(self, funcion, *args, **kwargs):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.cola = queue.Queue()
+        self.cancelar = threading.Event()
+        self.hilo = threading.Thread(target=self._ejecutar, daemon=True)
+
+    def iniciar(self):
+        self.hilo.start()
+        return self
+
+    def informar(self, datos):
+        """
+        Envía a la ventana un diccionario con el progreso del trabajo.
+        """
+        self.cola.put(("progreso", datos))
+
+    def revisar_cancelacion(self):
+        """
+        Lanza ProcesoCancelado si el usuario pidió cancelar el trabajo.
+        """
+        if self.cancelar.is_set():
+            raise ProcesoCancelado()
+
+    def _ejecutar(self):
+        try:
+            resultado = self.funcion(self, *self.args, **self.kwargs)
+            self.cola.put(("terminado", resultado))
+        except ProcesoCancelado:
+            self.cola.put(("cancelado", None))
+        except Exception as e:
+            self.cola.put(("error", e))
+
+    def mensajes(self):
+        """
+        Devuelve los mensajes pendientes en la cola, sin esperar.
+
+        :return: Generador de tuplas (tipo, datos).
+        """
+        while True:
+            try:
+                yield self.cola.get_nowait()
+            except queue.Empty:
+                return
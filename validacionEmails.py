@@ -0,0 +1,160 @@
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow es opcional: sin él se usan las operaciones de texto de pandas
+    pa = None
+
+# Dominios de correo más usados en los leads. Los errores de tipeo a un carácter de distancia de uno
+# de ellos (gmial.com, hotmail.con, yahoo,com) se corrigen. Se dejan fuera los dominios muy cortos
+# (me.com, att.net, ...) porque a un carácter de ellos hay muchos dominios reales
+DOMINIOS_COMUNES = (
+    "gmail.com", "yahoo.com", "hotmail.com", "aol.com", "outlook.com", "icloud.com", "live.com",
+    "comcast.net", "verizon.net", "sbcglobal.net", "bellsouth.net", "charter.net", "earthlink.net",
+    "optonline.net", "frontier.com", "windstream.net", "ymail.com", "rocketmail.com", "protonmail.com",
+    "yahoo.com.mx", "hotmail.es", "outlook.es", "live.com.mx", "prodigy.net.mx",
+)
+
+# Caracteres que se prueban al generar los errores de tipeo (la coma por el punto es un error frecuente)
+CARACTERES_TIPEO = "abcdefghijklmnopqrstuvwxyz0123456789.-,"
+
+# Parte local (antes de la '@') y dominio de una dirección válida, ya en minúsculas.
+# La parte local admite letras acentuadas (como PATRON_NOMBRE en seleccionarCols)
+PATRON_USUARIO = r"^[a-z0-9à-öø-ÿ!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9à-öø-ÿ!#$%&'*+/=?^_`{|}~-]+)*$"
+PATRON_DOMINIO = re.compile(r"(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}")
+
+
+def _variantes_tipeo(dominio):
+    """
+    Cadenas a un error de tipeo del dominio: un carácter borrado, cambiado o agregado,
+    o dos caracteres vecinos intercambiados.
+    """
+    cortes = [(dominio[:i], dominio[i:]) for i in range(len(dominio) + 1)]
+    variantes = {a + b[1:] for a, b in cortes if b}
+    variantes |= {a + b[1] + b[0] + b[2:] for a, b in cortes if len(b) > 1}
+    variantes |= {a + c + b[1:] for a, b in cortes if b for c in CARACTERES_TIPEO}
+    variantes |= {a + c + b for a, b in cortes for c in CARACTERES_TIPEO}
+    variantes.discard(dominio)
+    return variantes
+
+
+@functools.lru_cache(maxsize=None)
+def indice_correcciones():
+    """
+    Índice precalculado {dominio mal escrito: dominio correcto} con todas las variantes de tipeo
+    de DOMINIOS_COMUNES. Las variantes que están a un error de dos dominios comunes distintos
+    no se corrigen, y los dominios comunes nunca se cambian por otro.
+    """
+    indice = {}
+    ambiguas = set()
+    for dominio in DOMINIOS_COMUNES:
+        for variante in _variantes_tipeo(dominio):
+            if indice.setdefault(variante, dominio) != dominio:
+                ambiguas.add(variante)
+    for variante in ambiguas | set(DOMINIOS_COMUNES):
+        indice.pop(variante, None)
+    return indice
+
+
+def corregir_dominios(dominios):
+    """
+    Corrige una lista de dominios distintos (las categorías, no las filas) y los valida.
+
+    :param dominios: Lista de dominios en minúsculas.
+    :return: Tupla (dominios corregidos, arreglo booleano de corregidos, arreglo booleano de válidos).
+    """
+    indice = indice_correcciones()
+    corregidos = [indice.get(dominio, dominio) for dominio in dominios]
+    cambiados = np.fromiter((a != b for a, b in zip(dominios, corregidos)), dtype=bool, count=len(dominios))
+    validos = np.fromiter(
+        (PATRON_DOMINIO.fullmatch(dominio) is not None for dominio in corregidos), dtype=bool, count=len(dominios)
+    )
+    return corregidos, cambiados, validos
+
+
+def _separar_emails(textos):
+    """
+    Separa las direcciones con exactamente una '@' en usuario y dominio.
+
+    :param textos: Serie de textos en minúsculas.
+    :return: Tupla (posiciones de las filas con una '@', usuarios, dominios), con usuarios y dominios
+             como Series de texto alineadas con esas posiciones.
+    """
+    if pa is not None:
+        arreglo = pa.array(textos, from_pandas=True)
+        if isinstance(arreglo, pa.ChunkedArray):
+            arreglo = arreglo.combine_chunks()
+        partes = pc.split_pattern(arreglo, "@")
+        una_arroba = pc.fill_null(pc.equal(pc.list_value_length(partes), 2), False).to_numpy(zero_copy_only=False)
+        posiciones = np.flatnonzero(una_arroba)
+        if len(posiciones) < len(una_arroba):
+            partes = partes.take(pa.array(posiciones))
+        usuarios = pd.Series(pd.arrays.ArrowStringArray(pc.list_element(partes, 0)))
+        dominios = pd.Series(pd.arrays.ArrowStringArray(pc.list_element(partes, 1)))
+        return posiciones, usuarios, dominios
+
+    posiciones = np.flatnonzero((textos.str.count("@") == 1).fillna(False).to_numpy(dtype=bool))
+    if len(posiciones) == 0:
+        # partition sobre una serie vacía devuelve un DataFrame sin columnas
+        vacia = pd.Series([], dtype=textos.dtype)
+        return posiciones, vacia, vacia.copy()
+    partes = textos.iloc[posiciones].str.partition("@")
+    return posiciones, partes[0].reset_index(drop=True), partes[2].reset_index(drop=True)
+
+
+def validar_emails(serie):
+    """
+    Valida y normaliza una serie de emails en una pasada vectorizada: quita espacios, pasa a minúsculas,
+    corrige los dominios mal escritos de DOMINIOS_COMUNES y descarta las direcciones inválidas.
+    Los dominios se corrigen y validan una sola vez por dominio distinto (sobre las categorías)
+    y el resultado se lleva a las filas con los códigos de la categoría.
+
+    :param serie: Serie de texto (TIPO_TEXTO) con los emails originales.
+    :return: Tupla (serie de texto con los emails válidos y nulos en el resto, emails corregidos,
+             emails rechazados). Los vacíos no cuentan como rechazados.
+    """
+    textos = serie.str.strip().str.lower()
+    con_valor = (textos.notna() & (textos != "")).to_numpy(dtype=bool)
+
+    posiciones, usuarios, dominios = _separar_emails(textos)
+    categorias = pd.Categorical(dominios)
+    corregidos, cambiados, dominio_valido = corregir_dominios(list(categorias.categories))
+
+    # Código -1 (dominio vacío o nulo) cae en la posición extra, inválida
+    codigos = categorias.codes
+    dominio_valido = np.append(dominio_valido, False)[codigos]
+    cambiado = np.append(cambiados, False)[codigos]
+    validos = dominio_valido & usuarios.str.match(PATRON_USUARIO).fillna(False).to_numpy(dtype=bool)
+
+    es_valido = np.zeros(len(textos), dtype=bool)
+    es_valido[posiciones[validos]] = True
+    resultado = textos.where(es_valido)
+
+    # Reconstruir solo las direcciones con el dominio corregido
+    corregir = validos & cambiado
+    if corregir.any():
+        nuevos_dominios = pd.Series(corregidos, dtype=usuarios.dtype).take(codigos[corregir])
+        nuevos = usuarios[corregir].reset_index(drop=True) + "@" + nuevos_dominios.reset_index(drop=True)
+        resultado.iloc[posiciones[corregir]] = nuevos.array
+
+    return resultado, int(corregir.sum()), int((con_valor & ~es_valido).sum())
+
+
+def dominios_email(serie):
+    """
+    Dominio de cada email (lo que sigue a la '@'), como categoría.
+
+    :param serie: Serie de texto (TIPO_TEXTO) con los emails (por ejemplo, la columna 'email' ya validada).
+    :return: Serie categórica con el dominio en minúsculas; nula donde no hay una dirección con '@'.
+    """
+    textos = serie.str.lower()
+    posiciones, _, dominios = _separar_emails(textos)
+    codigos = np.full(len(textos), -1, dtype=np.int32)
+    categorias = pd.Categorical(dominios)
+    codigos[posiciones] = categorias.codes
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=categorias.categories), index=serie.index)